@@ -0,0 +1,278 @@
+"""
+Response cache for deterministic AI generations.
+
+Quiz, research and recommendation prompts are fully templated and run at a low
+temperature, so identical requests can share one completion. Entries are keyed
+on the normalized prompt, system prompt, model and sampling parameters.
+
+- Memory tier: LRU over an OrderedDict, bounded by entry count and total bytes
+- Per-namespace TTLs (one namespace per endpoint)
+- Optional SQLite disk tier that survives restarts; its reads and writes run in
+  a worker thread so they never block the event loop
+- Hit/miss counters per namespace (see stats())
+
+SingleFlight complements the cache for requests that arrive while the first
+identical one is still running: concurrent callers share one in-flight call.
+
+Configuration (environment variables):
+    AI_CACHE_ENABLED       1/0 (default 1)
+    AI_CACHE_MAX_ENTRIES   memory tier entry limit (default 1024)
+    AI_CACHE_MAX_BYTES     memory tier size limit (default 32 MiB)
+    AI_CACHE_DISK_PATH     SQLite file for the disk tier (default: disabled)
+    AI_CACHE_TTL_<NAME>    TTL in seconds for a namespace, e.g. AI_CACHE_TTL_QUIZ
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "1") == "1"
+MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "1024"))
+MAX_BYTES = int(os.getenv("AI_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+DISK_PATH = os.getenv("AI_CACHE_DISK_PATH")
+
+# Default TTLs (seconds) per endpoint namespace
+DEFAULT_TTLS = {
+    "quiz": 24 * 3600,
+    "research": 6 * 3600,
+    "recommendations": 24 * 3600,
+}
+DEFAULT_TTL = 3600
+
+_WHITESPACE = re.compile(r"\s+")
+T = TypeVar("T")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace and case so trivially different prompts share a key"""
+    return _WHITESPACE.sub(" ", prompt).strip().casefold()
+
+
+def make_key(namespace: str, prompt: str, system_prompt: str, model: str, **params) -> str:
+    """Stable cache key for a completion request"""
+    payload = json.dumps(
+        [namespace, normalize_prompt(prompt), normalize_prompt(system_prompt), model, sorted(params.items())],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class _DiskTier:
+    """SQLite-backed key/value store for cache entries, safe to call from worker threads"""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_cache ("
+            " key TEXT PRIMARY KEY, namespace TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str, now: float) -> Optional[Tuple[str, str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT namespace, value, expires_at FROM ai_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= now:
+                self._conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+                return None
+            return row
+
+    def set(self, key: str, namespace: str, value: str, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, namespace, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, namespace, value, expires_at),
+            )
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM ai_cache WHERE expires_at <= ?", (now,)).rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_cache")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """Bounded LRU cache with per-namespace TTLs and an optional disk tier"""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES,
+                 ttls: Optional[Dict[str, float]] = None, disk_path: Optional[str] = DISK_PATH):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        for namespace in DEFAULT_TTLS:
+            env_ttl = os.getenv(f"AI_CACHE_TTL_{namespace.upper()}")
+            if env_ttl:
+                self.ttls[namespace] = float(env_ttl)
+        self.ttls.update(ttls or {})
+        self._entries: "OrderedDict[str, Tuple[str, str, float]]" = OrderedDict()
+        self._bytes = 0
+        self._disk = _DiskTier(disk_path) if disk_path else None
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def ttl_for(self, namespace: str) -> float:
+        return self.ttls.get(namespace, DEFAULT_TTL)
+
+    def _count(self, namespace: str, counter: str):
+        counters = self._counters.setdefault(namespace, {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0})
+        counters[counter] += 1
+
+    def _store(self, key: str, namespace: str, value: str, expires_at: float):
+        """Insert into the memory tier and evict least-recently-used entries over the limits"""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[1])
+        self._entries[key] = (namespace, value, expires_at)
+        self._bytes += len(value)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (evicted_namespace, evicted_value, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted_value)
+            self._count(evicted_namespace, "evictions")
+
+    async def get(self, namespace: str, key: str) -> Optional[str]:
+        """
+        Return a cached value, or None on a miss (expired entries count as
+        misses). Memory hits return without leaving the event loop; the disk
+        tier is only read, in a worker thread, on a memory miss.
+        """
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[2] > now:
+                self._entries.move_to_end(key)
+                self._count(namespace, "hits")
+                return entry[1]
+            del self._entries[key]
+            self._bytes -= len(entry[1])
+        if self._disk is not None:
+            row = await asyncio.to_thread(self._disk.get, key, now)
+            if row is not None:
+                self._store(key, row[0], row[1], row[2])
+                self._count(namespace, "disk_hits")
+                return row[1]
+        self._count(namespace, "misses")
+        return None
+
+    async def set(self, namespace: str, key: str, value: str):
+        """Cache a value under the namespace's TTL (the disk write runs in a worker thread)"""
+        expires_at = time.time() + self.ttl_for(namespace)
+        self._store(key, namespace, value, expires_at)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.set, key, namespace, value, expires_at)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self._counters.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.purge_expired(time.time())
+            self._disk.close()
+            self._disk = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per namespace plus current memory usage"""
+        namespaces = {}
+        for namespace, counters in self._counters.items():
+            lookups = counters["hits"] + counters["disk_hits"] + counters["misses"]
+            namespaces[namespace] = {
+                **counters,
+                "hit_rate": round((counters["hits"] + counters["disk_hits"]) / lookups, 4) if lookups else 0.0,
+            }
+        return {
+            "enabled": CACHE_ENABLED,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "disk_tier": self._disk is not None,
+            "namespaces": namespaces,
+        }
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one shared task.
+
+    The first caller for a key starts `fn()` as a task; callers arriving while
+    it runs await the same task. Every waiter gets the same result or the same
+    exception, and the key is released as soon as the task finishes, so a
+    failure is never remembered. A waiter that is cancelled (e.g. its client
+    disconnected) leaves the shared task running for the others; when the last
+    waiter is cancelled the shared task is cancelled too, so upstream work
+    nobody waits for stops and frees its concurrency slot.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, _Flight] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = self._inflight[key] = _Flight(asyncio.ensure_future(fn()))
+            flight.task.add_done_callback(lambda done: self._release(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        task = flight.task
+        flight.waiters += 1
+        try:
+            # Shielded so one waiter's cancellation doesn't cancel the others' call
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not task.done():
+                # Last waiter gone: new callers start a fresh call rather than join this one
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+                task.cancel()
+                self.cancelled += 1
+                await asyncio.gather(task, return_exceptions=True)
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _release(self, key: str, task: "asyncio.Task"):
+        flight = self._inflight.get(key)
+        if flight is not None and flight.task is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._inflight), "calls": self.calls, "coalesced": self.coalesced,
+                "cancelled": self.cancelled}
+
+
+response_cache = ResponseCache()
+inflight_calls = SingleFlight()
@@ -6,75 +6,273 @@ AI Service module - connects to OpenAI (or compatible) to provide:
 - Research assistance
 - Course & certification recommendations
 
-Set environment variable OPENAI_API_KEY before running.
+Set environment variable OPENAI_API_KEY before running. Completions go through
+the shared async client in app.llm_client (pooled connections, concurrency cap,
+timeouts); set AI_PROVIDER=fake to run against a local fake provider.
+Deterministic generations (quiz, research, recommendations) are served from
+the response cache in app.ai_cache when an identical request was seen recently;
+tutor questions are matched against near-duplicates in app.semantic_cache.
+Calls that do reach the provider are admitted by app.llm_scheduler, which
+puts tutor chats ahead of quiz, recommendation and research generation.
 """
 
-import os
+import asyncio
 import json
-from typing import List, Dict
-import openai
+import os
+import re
+import time
+from typing import AsyncIterator, Callable, List, Dict, Optional
 from pydantic import BaseModel
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # change if unavailable
+from app import metrics
+from app.ai_cache import CACHE_ENABLED, inflight_calls, make_key, response_cache
+from app.semantic_cache import SEMANTIC_CACHE_ENABLED, tutor_cache
+from app.llm_client import OPENAI_API_KEY, OPENAI_MODEL, get_llm_client, shutdown_llm_client
+from app.llm_scheduler import estimate_tokens, get_llm_scheduler
+
+
+AI_ERROR_PREFIX = "[AI service error: "
+
+
+class QuizGenerationError(Exception):
+    """The provider's reply held no usable quiz questions (strict generation only)"""
+
+
+def _is_json(reply: str) -> bool:
+    try:
+        json.loads(reply)
+    except ValueError:
+        return False
+    return True
 
-if not OPENAI_API_KEY:
-    # openai library will still be imported, but we avoid raising here so tests can run.
-    pass
-else:
-    openai.api_key = OPENAI_API_KEY
 
-def _call_openai_system(user_prompt: str, system_prompt: str = "You are a helpful educational assistant.") -> str:
+async def _call_openai_system(user_prompt: str, system_prompt: str = "You are a helpful educational assistant.",
+                              max_tokens: int = 800, temperature: float = 0.2,
+                              cache_namespace: Optional[str] = None, session_type: Optional[str] = None,
+                              cache_if: Optional[Callable[[str], bool]] = None) -> str:
     """
-    Call OpenAI Chat Completions synchronously and return assistant text.
+    Call the chat completion provider asynchronously and return assistant text.
+    Without OPENAI_API_KEY the placeholder provider returns a deterministic message.
+
+    With `cache_namespace` set, successful replies (those passing `cache_if`,
+    when given) are cached under that namespace's TTL and identical requests
+    are answered from the cache.
+    Identical requests that arrive while one is already in flight share its
+    upstream call (single-flight) whether or not they are cacheable.
+    The upstream call waits for admission under `session_type`'s priority.
     """
-    if not OPENAI_API_KEY:
-        # Fallback: return a deterministic placeholder when API key is not configured.
-        return ("[OPENAI_API_KEY not set. To enable real AI responses, set OPENAI_API_KEY in the environment.]\n\n"
-                + user_prompt[:100])
+    client = get_llm_client()
+    model = getattr(client.provider, "model", client.provider.name)
+    key = make_key(cache_namespace or "uncached", user_prompt, system_prompt, model,
+                   max_tokens=max_tokens, temperature=temperature)
+    use_cache = bool(cache_namespace) and CACHE_ENABLED
+    if use_cache:
+        cached = await response_cache.get(cache_namespace, key)
+        if cached is not None:
+            return cached
+
+    async def complete():
+        estimated = estimate_tokens(system_prompt, user_prompt) + max_tokens
+        async with get_llm_scheduler().slot(session_type, estimated) as usage:
+            with metrics.time_llm_call(session_type):
+                reply = await client.complete(user_prompt, system_prompt, max_tokens=max_tokens,
+                                              temperature=temperature)
+            usage.tokens = estimated - max_tokens + estimate_tokens(reply)
+        if use_cache and (cache_if is None or cache_if(reply)):
+            await response_cache.set(cache_namespace, key, reply)
+        return reply
+
     try:
-        resp = openai.ChatCompletion.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=800,
-            temperature=0.2,
-        )
-        return resp.choices[0].message.content.strip()
+        return await inflight_calls.do(key, complete)
+    except asyncio.TimeoutError:
+        return f"{AI_ERROR_PREFIX}no response within {client.timeout:g}s]"
     except Exception as e:
-        return f"[AI service error: {str(e)}]"
+        return f"{AI_ERROR_PREFIX}{str(e)}]"
+
+
+def cache_stats() -> Dict:
+    """Hit/miss counters and size of the AI response and tutor caches"""
+    return {
+        **response_cache.stats(),
+        "tutor_semantic": tutor_cache.stats(),
+        "single_flight": inflight_calls.stats(),
+    }
+
+
+def _cache_metrics():
+    """Collector for /metrics: AI cache and single-flight counters"""
+    response = response_cache.stats()["namespaces"]
+    tutor = tutor_cache.stats()
+    single_flight = inflight_calls.stats()
+    lookups = [({"cache": "response", "namespace": namespace, "result": result}, counters[result])
+               for namespace, counters in response.items() for result in ("hits", "disk_hits", "misses")]
+    lookups += [({"cache": "tutor_semantic", "namespace": "tutor", "result": result}, tutor[result])
+                for result in ("hits", "misses")]
+    hit_ratio = [({"cache": "response", "namespace": namespace}, counters["hit_rate"])
+                 for namespace, counters in response.items()]
+    hit_ratio.append(({"cache": "tutor_semantic", "namespace": "tutor"}, tutor["hit_rate"]))
+    return [
+        ("ai_cache_lookups_total", "counter", "AI cache lookups by result", lookups),
+        ("ai_cache_hit_ratio", "gauge", "AI cache hits / lookups since start", hit_ratio),
+        ("ai_single_flight_calls_total", "counter", "Upstream calls started by the single-flight group",
+         [({}, single_flight["calls"])]),
+        ("ai_single_flight_coalesced_total", "counter", "Requests that shared an in-flight upstream call",
+         [({}, single_flight["coalesced"])]),
+        ("ai_single_flight_cancelled_total", "counter", "Upstream calls cancelled after every waiter went away",
+         [({}, single_flight["cancelled"])]),
+        ("llm_requests_in_flight", "gauge", "LLM calls holding a client concurrency slot",
+         [({}, get_llm_client().in_flight)]),
+    ]
+
+
+metrics.registry.register_collector(_cache_metrics)
+
+
+async def shutdown():
+    """Release AI service resources (called from the app lifespan)"""
+    await shutdown_llm_client()
 
 # ----------------------------
 # Tutor
 # ----------------------------
-def generate_ai_tutor_response(student_id: int, message: str) -> Dict:
-    """
-    Generate an AI tutor response for the given message.
-    Returns a dict with keys: 'answer' and 'notes'
-    """
-    prompt = f"""
-You are an AI tutor for a student (id={student_id}). Answer the question concisely, include short explanation,
+TUTOR_SYSTEM_PROMPT = "You are a friendly expert tutor that explains clearly."
+
+
+def _tutor_prompt(message: str, course_title: Optional[str] = None) -> str:
+    course_context = f" in the course \"{course_title}\"" if course_title else ""
+    return f"""
+You are an AI tutor for a student{course_context}. Answer the question concisely, include short explanation,
 and provide 2 recommended next-steps (like reading links or exercises). Use bullet points for next-steps.
 
 Question:
 {message}
 """
-    answer = _call_openai_system(prompt, system_prompt="You are a friendly expert tutor that explains clearly.")
+
+
+async def generate_ai_tutor_response(student_id: int, message: str, course_id: Optional[int] = None) -> Dict:
+    """
+    Generate an AI tutor response for the given message.
+    Returns a dict with keys: 'answer' and 'notes'
+
+    A near-duplicate of a question already asked in the same course context
+    (by any student) is served from the semantic tutor cache.
+    """
+    if SEMANTIC_CACHE_ENABLED:
+        hit = tutor_cache.lookup(course_id, message)
+        if hit is not None:
+            return {"answer": hit.answer, "notes": f"Served from AI tutor cache (similarity {hit.similarity:.2f})"}
+
+    started = time.perf_counter()
+    answer = await _call_openai_system(_tutor_prompt(message), system_prompt=TUTOR_SYSTEM_PROMPT,
+                                       session_type="tutor")
+    if SEMANTIC_CACHE_ENABLED and not answer.startswith(AI_ERROR_PREFIX):
+        tutor_cache.add(course_id, message, answer, latency=time.perf_counter() - started)
     return {"answer": answer, "notes": "Generated by AI tutor"}
 
+
+async def stream_ai_tutor_response(student_id: int, message: str, course_id: Optional[int] = None,
+                                   course_title: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Stream an AI tutor answer chunk by chunk as the provider produces it.
+    Cached near-duplicates are yielded in one chunk; a provider failure is
+    yielded as an error message, like generate_ai_tutor_response().
+    """
+    if SEMANTIC_CACHE_ENABLED:
+        hit = tutor_cache.lookup(course_id, message)
+        if hit is not None:
+            yield hit.answer
+            return
+
+    client = get_llm_client()
+    prompt = _tutor_prompt(message, course_title)
+    estimated = estimate_tokens(TUTOR_SYSTEM_PROMPT, prompt) + 800
+    started = time.perf_counter()
+    parts = []
+    try:
+        async with get_llm_scheduler().slot("tutor", estimated) as usage:
+            with metrics.time_llm_call("tutor"):
+                async for chunk in client.stream(prompt, TUTOR_SYSTEM_PROMPT):
+                    parts.append(chunk)
+                    yield chunk
+            usage.tokens = estimated - 800 + estimate_tokens(*parts)
+    except asyncio.TimeoutError:
+        yield f"{AI_ERROR_PREFIX}no response within {client.timeout:g}s]"
+        return
+    except Exception as e:
+        yield f"{AI_ERROR_PREFIX}{str(e)}]"
+        return
+    if SEMANTIC_CACHE_ENABLED:
+        tutor_cache.add(course_id, message, "".join(parts), latency=time.perf_counter() - started)
+
 # ----------------------------
 # Quiz generation
 # ----------------------------
-def generate_quiz_questions(topic: str, difficulty: str = "medium", num_questions: int = 5) -> List[Dict]:
+# Quizzes larger than this are generated as concurrent sub-requests of at most
+# this many questions each, so latency tracks the chunk size, not the quiz size.
+QUIZ_CHUNK_SIZE = int(os.getenv("AI_QUIZ_CHUNK_SIZE", "5"))
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _question_key(question: Dict) -> str:
+    return _NON_WORD.sub(" ", str(question.get("question", "")).casefold()).strip()
+
+
+def _dedupe_questions(questions: List[Dict]) -> List[Dict]:
+    """Drop malformed entries and questions whose text repeats an earlier one after normalization"""
+    seen, kept = set(), []
+    for question in questions:
+        if not isinstance(question, dict):
+            continue
+        key = _question_key(question)
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(question)
+    return kept
+
+
+async def generate_quiz_questions(topic: str, difficulty: str = "medium", num_questions: int = 5,
+                                  variant: int = 0, strict: bool = False) -> List[Dict]:
     """
     Generate a quiz for the given topic. Returns a list of questions where each
     question is a dict: {question, options: [..], correct_answer, explanation}
+
+    Quizzes longer than QUIZ_CHUNK_SIZE are split into concurrent sub-requests,
+    each asked to cover a different part of the topic; the merged questions are
+    de-duplicated before returning, so a quiz may come back slightly short.
+
+    A non-zero `variant` asks for an alternative set of questions (and gets its
+    own cache entry), e.g. for the pre-generated quiz bank. With `strict`, a
+    reply that is not a JSON array (provider error, placeholder provider)
+    raises QuizGenerationError instead of returning a fallback question, for
+    callers that store the quiz.
     """
+    if num_questions <= QUIZ_CHUNK_SIZE:
+        return await _generate_quiz_chunk(topic, difficulty, num_questions, variant=variant, strict=strict)
+
+    parts = -(-num_questions // QUIZ_CHUNK_SIZE)
+    sizes = [num_questions // parts + (1 if i < num_questions % parts else 0) for i in range(parts)]
+    chunks = await asyncio.gather(*[
+        _generate_quiz_chunk(topic, difficulty, size, part=i + 1, parts=parts, variant=variant, strict=strict)
+        for i, size in enumerate(sizes)
+    ])
+    return _dedupe_questions([q for chunk in chunks for q in chunk])[:num_questions]
+
+
+async def _generate_quiz_chunk(topic: str, difficulty: str, num_questions: int,
+                               part: int = 1, parts: int = 1, variant: int = 0, strict: bool = False) -> List[Dict]:
+    """Generate one batch of quiz questions (part `part` of `parts`)"""
+    focus = ""
+    if parts > 1:
+        focus = (f"This is part {part} of {parts} of a larger quiz. Split the topic into {parts} distinct "
+                 f"sub-areas and only ask about sub-area {part}, so questions do not overlap with other parts.\n")
+    if variant:
+        focus += (f"This is alternative version {variant} of this quiz: ask different questions "
+                  f"than a typical first version would.\n")
     prompt = f"""
 Create {num_questions} {difficulty} difficulty multiple-choice questions (4 options each) about the topic: "{topic}".
-Return the output as JSON array where each element has keys:
+{focus}Return the output as JSON array where each element has keys:
 - question (string)
 - options (array of 4 strings)
 - correct_answer (one of the option strings)
@@ -82,13 +280,16 @@ Return the output as JSON array where each element has keys:
 
 Do not include any extra commentary outside the JSON.
 """
-    reply = _call_openai_system(prompt, system_prompt="You are a JSON-output question generator.")
+    reply = await _call_openai_system(prompt, system_prompt="You are a JSON-output question generator.",
+                                      cache_namespace="quiz", session_type="quiz", cache_if=_is_json)
     # Try to parse JSON from reply; if fails, do a simple best-effort extraction
     try:
         data = json.loads(reply)
         if isinstance(data, list):
             return data
     except Exception:
+        if strict:
+            raise QuizGenerationError(f"quiz reply for {topic!r} is not JSON: {reply[:100]!r}") from None
         # Fallback: wrap the whole reply as a single question
         return [{
             "question": f"Auto-generated fallback question about {topic}",
@@ -96,12 +297,14 @@ Do not include any extra commentary outside the JSON.
             "correct_answer": "A",
             "explanation": "Fallback explanation - enable OPENAI_API_KEY for full features."
         }]
+    if strict:
+        raise QuizGenerationError(f"quiz reply for {topic!r} is not a JSON array")
     return []
 
 # ----------------------------
 # Research assistant
 # ----------------------------
-def generate_research_assistance(research_description: str, help_type: str = "literature review") -> Dict:
+async def generate_research_assistance(research_description: str, help_type: str = "literature review") -> Dict:
     """
     Provide suggested outline, keywords, brief advice and references (URLs or paper titles).
     """
@@ -115,7 +318,8 @@ Produce a JSON object with keys:
 
 Return strictly JSON.
 """
-    reply = _call_openai_system(prompt, system_prompt="You are a helpful research assistant who replies in JSON.")
+    reply = await _call_openai_system(prompt, system_prompt="You are a helpful research assistant who replies in JSON.",
+                                      cache_namespace="research", session_type="research", cache_if=_is_json)
     try:
         data = json.loads(reply)
         return data
@@ -130,7 +334,7 @@ Return strictly JSON.
 # ----------------------------
 # Course & certification recommendations
 # ----------------------------
-def generate_course_recommendations(goal: str, level: str = "beginner") -> Dict:
+async def generate_course_recommendations(goal: str, level: str = "beginner") -> Dict:
     """
     Recommend courses and certifications for a student's career goal.
     Returns dict with keys: goal, recommendations (list of {title, provider, why, url?})
@@ -146,7 +350,9 @@ Provide 6 recommendations (courses or certifications), each with:
 
 Return JSON: {{ "goal": "...", "recommendations": [ ... ] }}
 """
-    reply = _call_openai_system(prompt, system_prompt="You are a pragmatic career course recommender.")
+    reply = await _call_openai_system(prompt, system_prompt="You are a pragmatic career course recommender.",
+                                      cache_namespace="recommendations", session_type="recommendations",
+                                      cache_if=_is_json)
     try:
         data = json.loads(reply)
         return data
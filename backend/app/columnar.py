@@ -0,0 +1,193 @@
+"""
+Append-only columnar tables backed by NumPy arrays.
+
+An optional storage engine for the high-volume event tables in app.db
+(study activities and quiz results). Each column is a typed array that grows
+by amortized doubling, so a row costs a few bytes per column instead of a
+Python dict, and filters/aggregates run vectorized over the arrays.
+
+Filtering conventions shared by both tables:
+- `student_id` and `course_id` are int32 columns (course_id 0 means "none")
+- `date` is an int32 column holding `date.toordinal()` values
+"""
+
+import numbers
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Union, Any
+
+import numpy as np
+
+
+DateLike = Union[date, numbers.Integral, None]
+
+
+def _to_ordinal(value: DateLike) -> Optional[int]:
+    """Convert a date (or an ordinal, including NumPy integers) to an ordinal"""
+    if value is None:
+        return None
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    return value.toordinal()
+
+
+class ColumnarTable:
+    """
+    Append-only table with one typed NumPy array per column.
+
+    Rows are addressed by position (0-based, in insertion order). Arrays are
+    over-allocated and doubled when full, so appends are amortized O(1).
+    """
+
+    def __init__(self, schema: Dict[str, Any], capacity: int = 1024):
+        self.schema = {name: np.dtype(dtype) for name, dtype in schema.items()}
+        self._size = 0
+        self._capacity = max(int(capacity), 1)
+        self._columns = {
+            name: np.zeros(self._capacity, dtype=dtype) for name, dtype in self.schema.items()
+        }
+
+    @classmethod
+    def from_columns(cls, schema: Dict[str, Any], columns: Dict[str, np.ndarray], capacity: int = 1024) -> "ColumnarTable":
+        """Build a table holding copies of equal-length column arrays (e.g. restored from a snapshot)"""
+        table = cls(schema, capacity=max([capacity] + [len(values) for values in columns.values()]))
+        table.extend(**columns)
+        return table
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the filled part of all columns"""
+        return sum(dtype.itemsize for dtype in self.schema.values()) * self._size
+
+    def _reserve(self, extra: int):
+        """Make room for `extra` more rows, doubling capacity as needed"""
+        needed = self._size + extra
+        if needed <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        self._capacity = capacity
+
+    def append(self, **values) -> int:
+        """Append one row and return its position. Missing columns default to 0."""
+        self._reserve(1)
+        position = self._size
+        for name, value in values.items():
+            self._columns[name][position] = value
+        self._size += 1
+        return position
+
+    def extend(self, **columns: Sequence) -> range:
+        """Append many rows at once from equal-length sequences; returns their positions"""
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns passed to extend() must have the same length")
+        count = lengths.pop() if lengths else 0
+        self._reserve(count)
+        start = self._size
+        for name, values in columns.items():
+            self._columns[name][start:start + count] = values
+        self._size += count
+        return range(start, start + count)
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of the filled part of a column"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def set_value(self, name: str, position: int, value):
+        """Overwrite a single cell (used for corrections, not as a general update path)"""
+        if not 0 <= position < self._size:
+            raise IndexError(position)
+        self._columns[name][position] = value
+
+    # ----------------------------
+    # Filtering
+    # ----------------------------
+    def select(self, student_id: Optional[int] = None, course_id: Optional[int] = None,
+               start: DateLike = None, end: DateLike = None,
+               positions: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Return the positions of rows matching all given filters.
+
+        `start`/`end` are inclusive date bounds. If `positions` is given (e.g. from
+        a per-student index) only those rows are considered, which avoids a full
+        column scan.
+        """
+        if positions is not None:
+            candidates = np.asarray(positions, dtype=np.int64)
+            mask = np.ones(len(candidates), dtype=bool)
+
+            def col(name):
+                return self._columns[name][candidates]
+        else:
+            candidates = None
+            mask = np.ones(self._size, dtype=bool)
+
+            def col(name):
+                return self._columns[name][:self._size]
+
+        if student_id is not None:
+            mask &= col('student_id') == student_id
+        if course_id is not None:
+            mask &= col('course_id') == course_id
+        start, end = _to_ordinal(start), _to_ordinal(end)
+        if start is not None or end is not None:
+            dates = col('date')
+            if start is not None:
+                mask &= dates >= start
+            if end is not None:
+                mask &= dates <= end
+
+        if candidates is None:
+            return np.flatnonzero(mask)
+        return candidates[mask]
+
+    # ----------------------------
+    # Aggregates
+    # ----------------------------
+    def count(self, **filters) -> int:
+        """Number of rows matching the filters"""
+        return int(len(self.select(**filters)))
+
+    def sum(self, column: str, **filters) -> float:
+        """Sum of a column over the matching rows"""
+        return self._columns[column][self.select(**filters)].sum().item()
+
+    def mean(self, column: str, **filters) -> float:
+        """Mean of a column over the matching rows (0.0 if none match)"""
+        selected = self.select(**filters)
+        if len(selected) == 0:
+            return 0.0
+        return float(self._columns[column][selected].mean())
+
+    def sum_by(self, column: str, key: str = 'student_id', **filters) -> Dict[int, float]:
+        """Sum a column grouped by a key column, e.g. minutes per student"""
+        selected = self.select(**filters)
+        keys, inverse = np.unique(self._columns[key][selected], return_inverse=True)
+        totals = np.bincount(inverse, weights=self._columns[column][selected], minlength=len(keys))
+        return dict(zip(keys.tolist(), totals.tolist()))
+
+    def count_by(self, key: str = 'student_id', **filters) -> Dict[int, int]:
+        """Count matching rows grouped by a key column"""
+        selected = self.select(**filters)
+        keys, counts = np.unique(self._columns[key][selected], return_counts=True)
+        return dict(zip(keys.tolist(), counts.tolist()))
+
+    # ----------------------------
+    # Materialization
+    # ----------------------------
+    def rows(self, positions: Sequence[int]) -> List[Dict[str, Any]]:
+        """Materialize rows at the given positions as dicts of Python scalars"""
+        positions = np.asarray(positions, dtype=np.int64)
+        names = list(self.schema)
+        values = [self._columns[name][positions].tolist() for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
@@ -1,16 +1,147 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
+"""
+Database engine and sessions for the SQLite app (main_sqlite).
+
+The engine is built from DatabaseSettings (environment variables) and a named
+performance profile. Every new connection gets the profile's pragmas:
+
+    profile  echo  journal  synchronous  cache    mmap     busy_timeout  pool
+    dev      on    WAL      NORMAL       16 MiB   0        5 s           5 + 10
+    prod     off   WAL      NORMAL       64 MiB   256 MiB  5 s           10 + 20
+    bench    off   WAL      OFF          256 MiB  1 GiB    10 s          20 + 40
+
+File databases use a connection pool of the profile's size (aiosqlite would
+otherwise open a new connection per session). WAL lets readers run alongside a
+writer; synchronous=NORMAL is durable across application crashes in WAL mode
+(a power loss can drop the last commits), OFF is for throwaway benchmark
+databases only.
+
+GET handlers use get_read_db(): sessions from a second, read-only engine
+(mode=ro, PRAGMA query_only) with its own pool of the same size, so reads
+never wait for a connection held by a write. In WAL mode they also never wait
+for the write lock. Writes and read-then-write handlers use get_db().
+
+Configuration (environment variables):
+    DATABASE_URL        SQLAlchemy URL (default sqlite+aiosqlite:///./learning_platform.db)
+    DATABASE_PROFILE    dev, prod or bench (default prod)
+    DATABASE_ECHO, DATABASE_JOURNAL_MODE, DATABASE_SYNCHRONOUS,
+    DATABASE_CACHE_SIZE (pages, or KiB if negative), DATABASE_MMAP_SIZE (bytes),
+    DATABASE_TEMP_STORE, DATABASE_BUSY_TIMEOUT (ms), DATABASE_POOL_SIZE,
+    DATABASE_MAX_OVERFLOW
+                        override single values of the profile
+"""
+
+import os
+from dataclasses import dataclass, fields, replace
+from typing import Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy import event, make_url
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base as async_declarative_base
 
-SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./learning_platform.db"
+from app.migrations import upgrade
 
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-    echo=True,
-    future=True
-)
+
+@dataclass(frozen=True)
+class EngineProfile:
+    echo: bool
+    journal_mode: str
+    synchronous: str
+    cache_size: int
+    mmap_size: int
+    temp_store: str
+    busy_timeout: int
+    pool_size: int
+    max_overflow: int
+
+
+PROFILES = {
+    "dev": EngineProfile(echo=True, journal_mode="WAL", synchronous="NORMAL", cache_size=-16_384, mmap_size=0,
+                         temp_store="MEMORY", busy_timeout=5_000, pool_size=5, max_overflow=10),
+    "prod": EngineProfile(echo=False, journal_mode="WAL", synchronous="NORMAL", cache_size=-65_536,
+                          mmap_size=256 * 1024 ** 2, temp_store="MEMORY", busy_timeout=5_000, pool_size=10,
+                          max_overflow=20),
+    "bench": EngineProfile(echo=False, journal_mode="WAL", synchronous="OFF", cache_size=-262_144,
+                           mmap_size=1024 ** 3, temp_store="MEMORY", busy_timeout=10_000, pool_size=20,
+                           max_overflow=40),
+}
+
+
+class DatabaseSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="DATABASE_")
+
+    url: str = "sqlite+aiosqlite:///./learning_platform.db"
+    profile: Literal["dev", "prod", "bench"] = "prod"
+    # Overrides of single profile values
+    echo: Optional[bool] = None
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    cache_size: Optional[int] = None
+    mmap_size: Optional[int] = None
+    temp_store: Optional[str] = None
+    busy_timeout: Optional[int] = None
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+
+    def engine_profile(self) -> EngineProfile:
+        overrides = {f.name: getattr(self, f.name) for f in fields(EngineProfile) if getattr(self, f.name) is not None}
+        return replace(PROFILES[self.profile], **overrides)
+
+
+def is_memory_database(url: str) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def create_database_engine(settings: DatabaseSettings, read_only: bool = False) -> AsyncEngine:
+    """
+    Async engine for `settings.url` with the profile's pool sizing and per-connection pragmas.
+
+    read_only opens SQLite files with mode=ro and PRAGMA query_only, in a pool of
+    their own; journal mode and synchronous are left to the read-write engine.
+    """
+    profile = settings.engine_profile()
+    url = make_url(settings.url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    pool_options = {"pool_size": profile.pool_size, "max_overflow": profile.max_overflow}
+    if is_sqlite:
+        if is_memory_database(settings.url):
+            # In-memory SQLite uses a single shared connection (no pool to size)
+            pool_options = {}
+        else:
+            # aiosqlite defaults to NullPool (a new connection, and pragmas, per session)
+            pool_options["poolclass"] = AsyncAdaptedQueuePool
+            if read_only:
+                url = url.set(database=f"file:{os.path.abspath(url.database)}",
+                              query={**url.query, "mode": "ro", "uri": "true"})
+    engine = create_async_engine(url, echo=profile.echo, future=True, **pool_options)
+
+    if is_sqlite:
+        @event.listens_for(engine.sync_engine, "connect")
+        def set_pragmas(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            if read_only:
+                cursor.execute("PRAGMA query_only = ON")
+            else:
+                cursor.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+                cursor.execute(f"PRAGMA synchronous = {profile.synchronous}")
+            cursor.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+            cursor.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+            cursor.execute(f"PRAGMA temp_store = {profile.temp_store}")
+            cursor.execute(f"PRAGMA busy_timeout = {int(profile.busy_timeout)}")
+            cursor.close()
+
+    return engine
+
+
+settings = DatabaseSettings()
+SQLALCHEMY_DATABASE_URL = settings.url
+
+engine = create_database_engine(settings)
+# An in-memory database exists only on the read-write engine's connection
+read_engine = engine if is_memory_database(settings.url) else create_database_engine(settings, read_only=True)
 
 AsyncSessionLocal = sessionmaker(
     engine,
@@ -18,6 +149,12 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False
 )
 
+ReadSessionLocal = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
 Base = async_declarative_base()
 
 async def get_db():
@@ -27,6 +164,16 @@ async def get_db():
         finally:
             await session.close()
 
+async def get_read_db():
+    """Session on the read-only pool, for GET handlers that never write"""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # Bring tables created by an older version up to the current schema
+        await conn.run_sync(upgrade)
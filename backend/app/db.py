@@ -6,10 +6,19 @@ or connected to Supabase.
 This module provides simple CRUD operations and stores data in Python dictionaries.
 """
 
+from array import array
+from bisect import bisect_left, bisect_right
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
+import math
+import os
 import random
 
+import numpy as np
+
+from app.columnar import ColumnarTable
+from app.session_log import session_logger, session_record
+
 
 # ============================================
 # IN-MEMORY DATA STORAGE
@@ -21,26 +30,97 @@ enrollments: Dict[int, Dict[str, Any]] = {}
 quiz_results: Dict[int, Dict[str, Any]] = {}
 study_activities: Dict[int, Dict[str, Any]] = {}
 recommendations: Dict[int, Dict[str, Any]] = {}
-ai_session_logs: Dict[int, Dict[str, Any]] = {}
 career_paths: Dict[int, Dict[str, Any]] = {}
+notifications: Dict[int, Dict[str, Any]] = {}
+
+# Table name -> storage dict, used by the generic insert/reset helpers
+tables: Dict[str, Dict[int, Dict[str, Any]]] = {
+    'students': students,
+    'courses': courses,
+    'enrollments': enrollments,
+    'quiz_results': quiz_results,
+    'study_activities': study_activities,
+    'recommendations': recommendations,
+    'career_paths': career_paths,
+    'notifications': notifications
+}
 
 # Auto-increment counters
-next_id = {
-    'students': 1,
-    'courses': 1,
-    'enrollments': 1,
-    'quiz_results': 1,
-    'study_activities': 1,
-    'recommendations': 1,
-    'ai_session_logs': 1,
-    'career_paths': 1
+next_id = {name: 1 for name in tables}
+
+# Per-student secondary indexes: table name -> student_id -> row ids
+# (in insertion order). Every insert goes through _insert(), which keeps
+# these in step with the tables, so per-student lookups only touch the
+# rows belonging to that student instead of scanning the whole table.
+# Row ids and date ordinals are kept in typed int32 arrays (_int_array()):
+# 4 bytes per entry instead of an 8-byte list slot plus a 28-byte int object,
+# which would cost several times the columnar row itself.
+student_index: Dict[str, Dict[int, array]] = {
+    'enrollments': {},
+    'quiz_results': {},
+    'study_activities': {},
+    'recommendations': {},
+    'notifications': {}
 }
 
+# Study activities are additionally kept in date order per student:
+# student_index['study_activities'][student_id] is sorted by activity date and
+# activity_dates[student_id] holds the matching date ordinals, so a date
+# window is two bisects plus a slice (see get_study_activities_range()).
+activity_dates: Dict[int, array] = {}
+
+# Running per-student dashboard aggregates, updated by every write path so the
+# dashboard stats never need a pass over raw rows:
+#   courses_enrolled, courses_completed, quiz_score_sum, quiz_count,
+#   minutes_by_day: date ordinal -> minutes, for the last STATS_WINDOW_DAYS days
+student_stats: Dict[int, Dict[str, Any]] = {}
+STATS_WINDOW_DAYS = 30
+
+# When enabled, get_student_stats() recomputes every answer from raw rows and
+# raises if the maintained aggregate disagrees. Meant for tests and debugging.
+CHECK_STATS_CONSISTENCY = os.getenv("LEARNING_DB_CHECK_STATS", "0") == "1"
+
+# Storage engine for the high-volume event tables: "dict" (default) keeps one
+# Python dict per row, "columnar" keeps study activities and quiz results in
+# NumPy-backed ColumnarTables (see enable_columnar_storage()).
+STORAGE_ENGINE = os.getenv("LEARNING_DB_ENGINE", "dict")
+
+# Table name -> ColumnarTable, for tables currently stored column-wise.
+# Row id N lives at position N - 1.
+columnar_tables: Dict[str, ColumnarTable] = {}
+
+COLUMNAR_SCHEMAS = {
+    'study_activities': {
+        'student_id': np.int32,
+        'course_id': np.int32,   # 0 = no course
+        'date': np.int32,        # date ordinal
+        'minutes': np.int32
+    },
+    'quiz_results': {
+        'student_id': np.int32,
+        'course_id': np.int32,
+        'date': np.int32,        # date ordinal, for range filters
+        'score': np.float32,
+        'timestamp': np.float64,  # full datetime, seconds since the epoch
+        'difficulty': np.int8    # index into quiz_difficulty_levels
+    }
+}
+
+quiz_difficulty_levels: List[str] = ['Easy', 'Medium', 'Hard']
+
+# Seed for the randomized sample data, so every worker process seeds the same rows
+SEED = int(os.getenv("LEARNING_DB_SEED", "42"))
+
 
 # ============================================
 # HELPER FUNCTIONS
 # ============================================
 
+def _int_array(values=()) -> array:
+    """int32 array (typecode 'i') from an iterable of ints, or from bytes holding native-endian int32 values"""
+    return array('i', values)
+
+
 def get_next_id(entity: str) -> int:
     """Get next auto-increment ID for an entity"""
     id_value = next_id[entity]
@@ -48,6 +128,339 @@ def get_next_id(entity: str) -> int:
     return id_value
 
 
+def _insert(table: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Assign the next ID to a record, store it and update the student index"""
+    row_id = get_next_id(table)
+    row = {'id': row_id, **record}
+    columns = columnar_tables.get(table)
+    if columns is not None:
+        columns.append(**_encode_columns(table, row))
+    else:
+        tables[table][row_id] = row
+    index = student_index.get(table)
+    if table == 'study_activities':
+        _index_activity(row['student_id'], row['date'].toordinal(), row_id)
+    elif index is not None:
+        index.setdefault(row['student_id'], _int_array()).append(row_id)
+    _update_stats(table, row)
+    return row
+
+
+def bulk_insert(table: str, records: List[Dict[str, Any]]) -> range:
+    """
+    Insert many records at once, ending in the same state as _insert() on each
+    in turn but updating the indexes and aggregates once per student instead
+    of once per row. Returns the new row ids.
+    """
+    row_ids = range(next_id[table], next_id[table] + len(records))
+    next_id[table] = row_ids.stop
+    rows = [{'id': row_id, **record} for row_id, record in zip(row_ids, records)]
+    columns = columnar_tables.get(table)
+    if columns is not None:
+        encoded = [_encode_columns(table, row) for row in rows]
+        columns.extend(**{name: [values[name] for values in encoded] for name in COLUMNAR_SCHEMAS[table]})
+    else:
+        tables[table].update(zip(row_ids, rows))
+
+    if table == 'study_activities':
+        today = date.today().toordinal()
+        touched = set()
+        for row in rows:
+            student_id, ordinal = row['student_id'], row['date'].toordinal()
+            student_index[table].setdefault(student_id, _int_array()).append(row['id'])
+            activity_dates.setdefault(student_id, _int_array()).append(ordinal)
+            touched.add(student_id)
+            if ordinal >= today - STATS_WINDOW_DAYS:
+                minutes_by_day = _stats_for(student_id)['minutes_by_day']
+                minutes_by_day[ordinal] = minutes_by_day.get(ordinal, 0) + row['minutes_studied']
+        # Restore (date, insertion) order, as _index_activity() keeps it
+        for student_id in touched:
+            dates = activity_dates[student_id]
+            if any(a > b for a, b in zip(dates, dates[1:])):
+                pairs = sorted(zip(dates, student_index[table][student_id]))
+                activity_dates[student_id] = _int_array(ordinal for ordinal, _ in pairs)
+                student_index[table][student_id] = _int_array(row_id for _, row_id in pairs)
+            if student_id in student_stats:
+                _prune_minutes(student_stats[student_id]['minutes_by_day'], today)
+        return row_ids
+
+    index = student_index.get(table)
+    for row in rows:
+        if index is not None:
+            index.setdefault(row['student_id'], _int_array()).append(row['id'])
+        _update_stats(table, row)
+    return row_ids
+
+
+def _index_activity(student_id: int, ordinal: int, row_id: int):
+    """Insert a study activity into the student's date-ordered index"""
+    row_ids = student_index['study_activities'].setdefault(student_id, _int_array())
+    dates = activity_dates.setdefault(student_id, _int_array())
+    # Activities usually arrive in date order, so this is normally an append
+    position = bisect_right(dates, ordinal)
+    dates.insert(position, ordinal)
+    row_ids.insert(position, row_id)
+
+
+def _activity_ids_in_range(student_id: int, start: Optional[date], end: Optional[date]) -> Sequence[int]:
+    """Row ids of a student's activities dated within [start, end] (inclusive)"""
+    row_ids = student_index['study_activities'].get(student_id)
+    if not row_ids:
+        return []
+    dates = activity_dates[student_id]
+    lo = bisect_left(dates, start.toordinal()) if start is not None else 0
+    hi = bisect_right(dates, end.toordinal()) if end is not None else len(dates)
+    return row_ids[lo:hi]
+
+
+def _student_rows(table: str, student_id: int) -> List[Dict[str, Any]]:
+    """Get the rows of an indexed table that belong to a student"""
+    return _rows_by_id(table, student_index[table].get(student_id, ()))
+
+
+def _rows_by_id(table: str, row_ids) -> List[Dict[str, Any]]:
+    """Get rows by id, whichever storage engine holds the table"""
+    if table in columnar_tables:
+        return _decode_rows(table, row_ids)
+    rows = tables[table]
+    return [rows[row_id] for row_id in row_ids]
+
+
+def count_rows(table: str) -> int:
+    """Number of rows in a table, whichever storage engine holds it"""
+    columns = columnar_tables.get(table)
+    return len(columns) if columns is not None else len(tables[table])
+
+
+def reset_database():
+    """Remove all rows, indexes and ID counters"""
+    for name, rows in tables.items():
+        rows.clear()
+        next_id[name] = 1
+    for index in student_index.values():
+        index.clear()
+    activity_dates.clear()
+    student_stats.clear()
+    for name in columnar_tables:
+        columnar_tables[name] = ColumnarTable(COLUMNAR_SCHEMAS[name])
+
+
+# ============================================
+# COLUMNAR STORAGE ENGINE
+# ============================================
+
+def _encode_columns(table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a row dict into ColumnarTable values"""
+    if table == 'study_activities':
+        return {
+            'student_id': row['student_id'],
+            'course_id': row['course_id'] or 0,
+            'date': row['date'].toordinal(),
+            'minutes': row['minutes_studied']
+        }
+    taken_at = row['date']
+    if row['difficulty_level'] not in quiz_difficulty_levels:
+        quiz_difficulty_levels.append(row['difficulty_level'])
+    return {
+        'student_id': row['student_id'],
+        'course_id': row['course_id'],
+        'date': taken_at.toordinal(),
+        'score': row['score_percent'],
+        'timestamp': taken_at.timestamp(),
+        'difficulty': quiz_difficulty_levels.index(row['difficulty_level'])
+    }
+
+
+def _decode_rows(table: str, row_ids) -> List[Dict[str, Any]]:
+    """Materialize rows of a columnar table as the usual row dicts"""
+    values = columnar_tables[table].rows([row_id - 1 for row_id in row_ids])
+    if table == 'study_activities':
+        return [{
+            'id': row_id,
+            'student_id': v['student_id'],
+            'date': date.fromordinal(v['date']),
+            'minutes_studied': v['minutes'],
+            'course_id': v['course_id'] or None
+        } for row_id, v in zip(row_ids, values)]
+    return [{
+        'id': row_id,
+        'student_id': v['student_id'],
+        'course_id': v['course_id'],
+        'score_percent': round(v['score'], 2),
+        'date': datetime.fromtimestamp(v['timestamp']),
+        'difficulty_level': quiz_difficulty_levels[v['difficulty']]
+    } for row_id, v in zip(row_ids, values)]
+
+
+def enable_columnar_storage(capacity: int = 1024):
+    """
+    Switch study activities and quiz results to columnar storage.
+    Existing rows are moved out of the dicts into the column arrays.
+    """
+    for name, schema in COLUMNAR_SCHEMAS.items():
+        if name in columnar_tables:
+            continue
+        columns = ColumnarTable(schema, capacity=max(capacity, len(tables[name])))
+        for row_id in sorted(tables[name]):
+            position = columns.append(**_encode_columns(name, tables[name][row_id]))
+            assert position == row_id - 1, "columnar storage requires contiguous row ids"
+        tables[name].clear()
+        columnar_tables[name] = columns
+
+
+def disable_columnar_storage():
+    """
+    Switch columnar tables back to row dicts (the inverse of
+    enable_columnar_storage()).
+    """
+    for name in list(columnar_tables):
+        row_ids = range(1, len(columnar_tables[name]) + 1)
+        tables[name].update(zip(row_ids, _decode_rows(name, row_ids)))
+        del columnar_tables[name]
+
+
+def get_student_study_minutes(student_id: int, days: int = 30) -> int:
+    """Total minutes studied by a student over the last `days` days"""
+    row_ids = _activity_ids_in_range(student_id, date.today() - timedelta(days=days), None)
+    columns = columnar_tables.get('study_activities')
+    if columns is not None:
+        return int(columns.sum('minutes', positions=np.asarray(row_ids, dtype=np.int64) - 1))
+    return sum(study_activities[row_id]['minutes_studied'] for row_id in row_ids)
+
+
+def get_student_average_quiz_score(student_id: int) -> float:
+    """Average quiz score for a student (0.0 without results)"""
+    columns = columnar_tables.get('quiz_results')
+    if columns is not None:
+        positions = np.asarray(student_index['quiz_results'].get(student_id, ()), dtype=np.int64) - 1
+        return columns.mean('score', positions=positions)
+    results = get_student_quiz_results(student_id)
+    if not results:
+        return 0.0
+    return sum(q['score_percent'] for q in results) / len(results)
+
+
+# ============================================
+# INCREMENTAL DASHBOARD AGGREGATES
+# ============================================
+
+def _stats_for(student_id: int) -> Dict[str, Any]:
+    """Get (creating if needed) the running aggregate for a student"""
+    stats = student_stats.get(student_id)
+    if stats is None:
+        stats = student_stats[student_id] = {
+            'courses_enrolled': 0,
+            'courses_completed': 0,
+            'quiz_score_sum': 0.0,
+            'quiz_count': 0,
+            'minutes_by_day': {}
+        }
+    return stats
+
+
+def _prune_minutes(minutes_by_day: Dict[int, int], today: int):
+    """Drop per-day buckets that have left the rolling window"""
+    cutoff = today - STATS_WINDOW_DAYS
+    for ordinal in [o for o in minutes_by_day if o < cutoff]:
+        del minutes_by_day[ordinal]
+
+
+def _update_stats(table: str, row: Dict[str, Any]):
+    """Fold a newly inserted row into the student's running aggregate"""
+    if table == 'enrollments':
+        stats = _stats_for(row['student_id'])
+        stats['courses_enrolled'] += 1
+        if row['completion_status'] == 'Completed':
+            stats['courses_completed'] += 1
+    elif table == 'quiz_results':
+        stats = _stats_for(row['student_id'])
+        stats['quiz_score_sum'] += row['score_percent']
+        stats['quiz_count'] += 1
+    elif table == 'study_activities':
+        today = date.today().toordinal()
+        ordinal = row['date'].toordinal()
+        if ordinal >= today - STATS_WINDOW_DAYS:
+            minutes_by_day = _stats_for(row['student_id'])['minutes_by_day']
+            minutes_by_day[ordinal] = minutes_by_day.get(ordinal, 0) + row['minutes_studied']
+            _prune_minutes(minutes_by_day, today)
+
+
+def update_enrollment(enrollment_id: int, progress_percent: Optional[float] = None,
+                      completion_status: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Update an enrollment's progress/status, keeping the aggregates in step"""
+    enrollment = enrollments.get(enrollment_id)
+    if enrollment is None:
+        return None
+    if progress_percent is not None:
+        enrollment['progress_percent'] = progress_percent
+    if completion_status is not None and completion_status != enrollment['completion_status']:
+        stats = _stats_for(enrollment['student_id'])
+        if enrollment['completion_status'] == 'Completed':
+            stats['courses_completed'] -= 1
+        if completion_status == 'Completed':
+            stats['courses_completed'] += 1
+        enrollment['completion_status'] = completion_status
+    enrollment['last_accessed'] = datetime.now()
+    return enrollment
+
+
+def _maintained_stats(student_id: int) -> Dict[str, Any]:
+    """Dashboard stats from the running aggregate (O(1) in the student's history)"""
+    stats = _stats_for(student_id)
+    today = date.today().toordinal()
+    _prune_minutes(stats['minutes_by_day'], today)
+    return {
+        'courses_enrolled': stats['courses_enrolled'],
+        'courses_completed': stats['courses_completed'],
+        'average_score': stats['quiz_score_sum'] / stats['quiz_count'] if stats['quiz_count'] else 0.0,
+        'total_study_minutes': sum(stats['minutes_by_day'].values())
+    }
+
+
+def recompute_student_stats(student_id: int) -> Dict[str, Any]:
+    """Dashboard stats recomputed from raw rows (the slow reference path)"""
+    student_enrollments = get_student_enrollments(student_id)
+    return {
+        'courses_enrolled': len(student_enrollments),
+        'courses_completed': sum(1 for e in student_enrollments if e['completion_status'] == 'Completed'),
+        'average_score': get_student_average_quiz_score(student_id),
+        'total_study_minutes': get_student_study_minutes(student_id, days=STATS_WINDOW_DAYS)
+    }
+
+
+def verify_student_stats(student_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Compare maintained aggregates against a full recompute.
+    Returns {student_id: {field: (maintained, recomputed)}} for every mismatch.
+    """
+    if student_ids is None:
+        student_ids = set(students) | set(student_stats)
+    mismatches = {}
+    for student_id in student_ids:
+        maintained = _maintained_stats(student_id)
+        expected = recompute_student_stats(student_id)
+        diff = {
+            field: (maintained[field], expected[field])
+            for field in expected
+            if not math.isclose(maintained[field], expected[field], rel_tol=1e-6, abs_tol=1e-3)
+        }
+        if diff:
+            mismatches[student_id] = diff
+    return mismatches
+
+
+def get_student_stats(student_id: int) -> Dict[str, Any]:
+    """
+    Dashboard statistics for a student: courses enrolled/completed, average
+    quiz score and minutes studied over the last STATS_WINDOW_DAYS days.
+    """
+    if CHECK_STATS_CONSISTENCY:
+        mismatches = verify_student_stats([student_id])
+        if mismatches:
+            raise AssertionError(f"Dashboard aggregate out of sync for student {student_id}: {mismatches[student_id]}")
+    return _maintained_stats(student_id)
+
+
 def get_student_by_id(student_id: int) -> Optional[Dict[str, Any]]:
     """Get student by ID"""
     return students.get(student_id)
@@ -60,26 +473,31 @@ def get_course_by_id(course_id: int) -> Optional[Dict[str, Any]]:
 
 def get_student_enrollments(student_id: int) -> List[Dict[str, Any]]:
     """Get all enrollments for a student"""
-    return [e for e in enrollments.values() if e['student_id'] == student_id]
+    return _student_rows('enrollments', student_id)
 
 
 def get_student_quiz_results(student_id: int) -> List[Dict[str, Any]]:
     """Get all quiz results for a student"""
-    return [q for q in quiz_results.values() if q['student_id'] == student_id]
+    return _student_rows('quiz_results', student_id)
 
 
 def get_student_study_activities(student_id: int, days: int = 7) -> List[Dict[str, Any]]:
-    """Get recent study activities for a student"""
-    cutoff_date = date.today() - timedelta(days=days)
-    return [
-        a for a in study_activities.values()
-        if a['student_id'] == student_id and a['date'] >= cutoff_date
-    ]
+    """Get recent study activities for a student, oldest first"""
+    return get_study_activities_range(student_id, start=date.today() - timedelta(days=days))
+
+
+def get_study_activities_range(student_id: int, start: Optional[date] = None,
+                               end: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Get a student's study activities dated between start and end (inclusive),
+    oldest first. Either bound may be omitted for an open-ended window.
+    """
+    return _rows_by_id('study_activities', _activity_ids_in_range(student_id, start, end))
 
 
 def get_student_recommendations(student_id: int) -> List[Dict[str, Any]]:
     """Get all recommendations for a student"""
-    return [r for r in recommendations.values() if r['student_id'] == student_id]
+    return _student_rows('recommendations', student_id)
 
 
 def get_all_courses(active_only: bool = True) -> List[Dict[str, Any]]:
@@ -104,17 +522,55 @@ def get_all_career_paths() -> List[Dict[str, Any]]:
 
 def log_ai_session(student_id: int, session_type: str, input_summary: str, response_summary: str) -> Dict[str, Any]:
     """Log an AI interaction"""
-    log_id = get_next_id('ai_session_logs')
-    log = {
-        'id': log_id,
+    return add_ai_session(student_id, session_type, input_summary, response_summary)
+
+
+def add_enrollment(student_id: int, course_id: int, progress_percent: float, completion_status: str,
+                   last_accessed: datetime, average_quiz_score: Optional[float] = None) -> Dict[str, Any]:
+    """Store an enrollment"""
+    return _insert('enrollments', {
         'student_id': student_id,
-        'session_type': session_type,
-        'input_summary': input_summary,
-        'response_summary': response_summary,
-        'created_at': datetime.now()
-    }
-    ai_session_logs[log_id] = log
-    return log
+        'course_id': course_id,
+        'progress_percent': progress_percent,
+        'completion_status': completion_status,
+        'last_accessed': last_accessed,
+        'average_quiz_score': average_quiz_score
+    })
+
+
+def add_quiz_result(student_id: int, course_id: int, score_percent: float, taken_at: datetime,
+                    difficulty_level: str) -> Dict[str, Any]:
+    """Store a quiz result"""
+    return _insert('quiz_results', {
+        'student_id': student_id,
+        'course_id': course_id,
+        'score_percent': score_percent,
+        'date': taken_at,
+        'difficulty_level': difficulty_level
+    })
+
+
+def add_study_activity(student_id: int, study_date: date, minutes_studied: int,
+                       course_id: Optional[int] = None) -> Dict[str, Any]:
+    """Store a study activity"""
+    return _insert('study_activities', {
+        'student_id': student_id,
+        'date': study_date,
+        'minutes_studied': minutes_studied,
+        'course_id': course_id
+    })
+
+
+def add_recommendation(student_id: int, rec_type: str, title: str, reason: str,
+                       created_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """Store a recommendation"""
+    return _insert('recommendations', {
+        'student_id': student_id,
+        'type': rec_type,
+        'title': title,
+        'reason': reason,
+        'created_at': created_at or datetime.now()
+    })
 
 
 # ============================================
@@ -291,88 +747,21 @@ def seed_courses():
 
 def seed_enrollments():
     """Create sample enrollments"""
-    # Student 1 (Alice) - Data Science focus
-    enrollments[get_next_id('enrollments')] = {
-        'id': next_id['enrollments'] - 1,
-        'student_id': 1,
-        'course_id': 1,  # Python Programming
-        'progress_percent': 100.0,
-        'completion_status': 'Completed',
-        'last_accessed': datetime.now() - timedelta(days=30),
-        'average_quiz_score': 92.5
-    }
-
-    enrollments[get_next_id('enrollments')] = {
-        'id': next_id['enrollments'] - 1,
-        'student_id': 1,
-        'course_id': 2,  # Machine Learning
-        'progress_percent': 75.0,
-        'completion_status': 'In progress',
-        'last_accessed': datetime.now() - timedelta(hours=2),
-        'average_quiz_score': 88.0
-    }
+    now = datetime.now()
 
-    enrollments[get_next_id('enrollments')] = {
-        'id': next_id['enrollments'] - 1,
-        'student_id': 1,
-        'course_id': 9,  # Data Visualization
-        'progress_percent': 45.0,
-        'completion_status': 'In progress',
-        'last_accessed': datetime.now() - timedelta(days=1),
-        'average_quiz_score': 85.0
-    }
+    # Student 1 (Alice) - Data Science focus
+    add_enrollment(1, 1, 100.0, 'Completed', now - timedelta(days=30), 92.5)   # Python Programming
+    add_enrollment(1, 2, 75.0, 'In progress', now - timedelta(hours=2), 88.0)  # Machine Learning
+    add_enrollment(1, 9, 45.0, 'In progress', now - timedelta(days=1), 85.0)   # Data Visualization
 
     # Student 2 (Bob) - ML Engineer focus
-    enrollments[get_next_id('enrollments')] = {
-        'id': next_id['enrollments'] - 1,
-        'student_id': 2,
-        'course_id': 2,  # Machine Learning
-        'progress_percent': 90.0,
-        'completion_status': 'In progress',
-        'last_accessed': datetime.now() - timedelta(hours=5),
-        'average_quiz_score': 94.0
-    }
-
-    enrollments[get_next_id('enrollments')] = {
-        'id': next_id['enrollments'] - 1,
-        'student_id': 2,
-        'course_id': 3,  # Deep Learning
-        'progress_percent': 60.0,
-        'completion_status': 'In progress',
-        'last_accessed': datetime.now() - timedelta(hours=12),
-        'average_quiz_score': 90.0
-    }
-
-    enrollments[get_next_id('enrollments')] = {
-        'id': next_id['enrollments'] - 1,
-        'student_id': 2,
-        'course_id': 8,  # NLP
-        'progress_percent': 30.0,
-        'completion_status': 'In progress',
-        'last_accessed': datetime.now() - timedelta(days=2),
-        'average_quiz_score': 87.0
-    }
+    add_enrollment(2, 2, 90.0, 'In progress', now - timedelta(hours=5), 94.0)   # Machine Learning
+    add_enrollment(2, 3, 60.0, 'In progress', now - timedelta(hours=12), 90.0)  # Deep Learning
+    add_enrollment(2, 8, 30.0, 'In progress', now - timedelta(days=2), 87.0)    # NLP
 
     # Student 3 (Carol) - Business Analyst focus
-    enrollments[get_next_id('enrollments')] = {
-        'id': next_id['enrollments'] - 1,
-        'student_id': 3,
-        'course_id': 5,  # SQL
-        'progress_percent': 100.0,
-        'completion_status': 'Completed',
-        'last_accessed': datetime.now() - timedelta(days=7),
-        'average_quiz_score': 95.0
-    }
-
-    enrollments[get_next_id('enrollments')] = {
-        'id': next_id['enrollments'] - 1,
-        'student_id': 3,
-        'course_id': 9,  # Data Visualization
-        'progress_percent': 80.0,
-        'completion_status': 'In progress',
-        'last_accessed': datetime.now() - timedelta(hours=3),
-        'average_quiz_score': 91.0
-    }
+    add_enrollment(3, 5, 100.0, 'Completed', now - timedelta(days=7), 95.0)    # SQL
+    add_enrollment(3, 9, 80.0, 'In progress', now - timedelta(hours=3), 91.0)  # Data Visualization
 
 
 def seed_quiz_results():
@@ -388,38 +777,32 @@ def seed_quiz_results():
     ]
 
     for quiz in quiz_data:
-        quiz_results[get_next_id('quiz_results')] = {
-            'id': next_id['quiz_results'] - 1,
-            'student_id': quiz['student_id'],
-            'course_id': quiz['course_id'],
-            'score_percent': quiz['score'],
-            'date': datetime.now() - timedelta(days=quiz['days_ago']),
-            'difficulty_level': quiz['difficulty']
-        }
+        add_quiz_result(
+            student_id=quiz['student_id'],
+            course_id=quiz['course_id'],
+            score_percent=quiz['score'],
+            taken_at=datetime.now() - timedelta(days=quiz['days_ago']),
+            difficulty_level=quiz['difficulty']
+        )
 
 
 def seed_study_activities():
     """Create sample study activities"""
+    rng = random.Random(SEED)
     # Generate study activities for the past 7 days
     for student_id in [1, 2, 3]:
         for days_ago in range(7):
             study_date = date.today() - timedelta(days=days_ago)
-            minutes = random.randint(30, 180)
+            minutes = rng.randint(30, 180)
 
             # Get a random enrolled course for this student
             student_enrollments = get_student_enrollments(student_id)
             if student_enrollments:
-                course_id = random.choice(student_enrollments)['course_id']
+                course_id = rng.choice(student_enrollments)['course_id']
             else:
                 course_id = None
 
-            study_activities[get_next_id('study_activities')] = {
-                'id': next_id['study_activities'] - 1,
-                'student_id': student_id,
-                'date': study_date,
-                'minutes_studied': minutes,
-                'course_id': course_id
-            }
+            add_study_activity(student_id, study_date, minutes, course_id)
 
 
 def seed_recommendations():
@@ -451,15 +834,15 @@ def seed_recommendations():
         },
     ]
 
+    rng = random.Random(SEED)
     for rec in recs:
-        recommendations[get_next_id('recommendations')] = {
-            'id': next_id['recommendations'] - 1,
-            'student_id': rec['student_id'],
-            'type': rec['type'],
-            'title': rec['title'],
-            'reason': rec['reason'],
-            'created_at': datetime.now() - timedelta(days=random.randint(1, 7))
-        }
+        add_recommendation(
+            student_id=rec['student_id'],
+            rec_type=rec['type'],
+            title=rec['title'],
+            reason=rec['reason'],
+            created_at=datetime.now() - timedelta(days=rng.randint(1, 7))
+        )
 
 
 def seed_career_paths():
@@ -539,6 +922,9 @@ def seed_career_paths():
 
 def initialize_database():
     """Initialize the in-memory database with seed data"""
+    if STORAGE_ENGINE == "columnar":
+        enable_columnar_storage()
+
     seed_students()
     seed_courses()
     seed_enrollments()
@@ -551,8 +937,8 @@ def initialize_database():
     print(f"  - {len(students)} students")
     print(f"  - {len(courses)} courses")
     print(f"  - {len(enrollments)} enrollments")
-    print(f"  - {len(quiz_results)} quiz results")
-    print(f"  - {len(study_activities)} study activities")
+    print(f"  - {count_rows('quiz_results')} quiz results")
+    print(f"  - {count_rows('study_activities')} study activities")
     print(f"  - {len(recommendations)} recommendations")
     print(f"  - {len(career_paths)} career paths")
 
@@ -561,35 +947,21 @@ def initialize_database():
 # SIMPLE PERSIST FUNCTIONS FOR AI SESSIONS & NOTIFICATIONS
 # ============================================
 def add_ai_session(student_id: int, session_type: str, input_summary: str, response_summary: str) -> Dict:
-    """Store a simple AI session log"""
-    sid = get_next_id('ai_session_logs')
-    ai_session_logs[sid] = {
-        'id': sid,
-        'student_id': student_id,
-        'session_type': session_type,
-        'input_summary': input_summary,
-        'response_summary': response_summary,
-        'created_at': datetime.now()
-    }
-    return ai_session_logs[sid]
-
+    """Queue an AI session log for write-behind persistence (see app/session_log.py)"""
+    record = session_record(student_id, session_type, input_summary, response_summary)
+    session_logger.enqueue(record)
+    return record
 
-# Notifications storage (re-using 'study_activities' dict for simplicity)
-notifications: Dict[int, Dict[str, Any]] = {}
-next_id['notifications'] = next_id.get('notifications', max(next_id.values())+1)
 
 def add_notification(student_id: int, title: str, message: str, due_date: Optional[date] = None) -> Dict:
-    nid = get_next_id('notifications')
-    notifications[nid] = {
-        'id': nid,
+    return _insert('notifications', {
         'student_id': student_id,
         'title': title,
         'message': message,
         'due_date': due_date,
         'created_at': datetime.now(),
         'is_read': False
-    }
-    return notifications[nid]
+    })
 
 def get_notifications_for_student(student_id: int) -> List[Dict[str, Any]]:
-    return [n for n in notifications.values() if n['student_id'] == student_id]
+    return _student_rows('notifications', student_id)
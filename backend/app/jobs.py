@@ -0,0 +1,166 @@
+"""
+In-process background job queue for long AI generations.
+
+Quiz and research generation can take many seconds. In job mode the request is
+answered immediately with a job id; a bounded pool of asyncio workers runs the
+generation and the result is kept for a while so the client can poll for it.
+
+- Priority queue (lower number runs first; FIFO within a priority)
+- Queue depth limit: submit() raises QueueFull instead of growing without bound
+- Finished jobs are retained for a fixed time, then forgotten
+
+Configuration (environment variables):
+    AI_JOB_WORKERS            concurrent jobs per process (default 4)
+    AI_JOB_MAX_QUEUE          max queued (not yet running) jobs (default 100)
+    AI_JOB_RETENTION_SECONDS  how long finished results are kept (default 3600)
+"""
+
+import asyncio
+import itertools
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+WORKERS = int(os.getenv("AI_JOB_WORKERS", "4"))
+MAX_QUEUE = int(os.getenv("AI_JOB_MAX_QUEUE", "100"))
+RETENTION_SECONDS = float(os.getenv("AI_JOB_RETENTION_SECONDS", "3600"))
+
+PRIORITIES = {"high": 0, "normal": 5, "low": 9}
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds max_depth waiting jobs"""
+
+
+@dataclass
+class Job:
+    """One unit of background work and its outcome"""
+    id: str
+    kind: str
+    priority: int
+    fn: Callable[[], Awaitable[Any]] = field(repr=False)
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+
+class JobQueue:
+    """Priority queue drained by a fixed pool of asyncio worker tasks"""
+
+    def __init__(self, workers: int = WORKERS, max_depth: int = MAX_QUEUE,
+                 retention: float = RETENTION_SECONDS):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.retention = retention
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: Dict[str, Job] = {}
+        self._sequence = itertools.count()
+        self.submitted = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the worker pool (idempotent; needs a running event loop)"""
+        if self._tasks:
+            return
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers; jobs still running are cancelled with them"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, kind: str, fn: Callable[[], Awaitable[Any]], priority: int = PRIORITIES["normal"]) -> Job:
+        """Queue `fn()` to run in the background and return its Job"""
+        self.start()
+        self._purge_expired()
+        if self._queue.qsize() >= self.max_depth:
+            self.rejected += 1
+            raise QueueFull(f"job queue is full ({self.max_depth} waiting)")
+        job = Job(id=uuid.uuid4().hex, kind=kind, priority=priority, fn=fn)
+        self._jobs[job.id] = job
+        self._queue.put_nowait((priority, next(self._sequence), job.id))
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job; finished jobs past their retention are gone"""
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at <= cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is not None:
+                await self._run(job)
+            self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = await job.fn()
+            job.status = SUCCEEDED
+            self.succeeded += 1
+        except asyncio.CancelledError:
+            job.status, job.error = FAILED, "cancelled"
+            self.failed += 1
+            raise
+        except HTTPException as e:
+            job.status, job.error = FAILED, str(e.detail)
+            self.failed += 1
+        except Exception as e:
+            job.status, job.error = FAILED, str(e)
+            self.failed += 1
+        finally:
+            job.finished_at = time.time()
+            job.fn = None
+
+    def stats(self) -> Dict[str, Any]:
+        by_status: Dict[str, int] = {}
+        for job in self._jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "workers": len(self._tasks),
+            "max_depth": self.max_depth,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "retention_seconds": self.retention,
+            "jobs": by_status,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+
+job_queue = JobQueue()
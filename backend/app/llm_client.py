@@ -0,0 +1,280 @@
+"""
+Async LLM client used by app.ai_service.
+
+- One shared provider per process, reusing a keep-alive HTTP connection pool
+- A global cap on concurrent completions (asyncio.Semaphore)
+- Per-call timeouts, and cancellation when the HTTP client disconnects
+- Token streaming (LLMClient.stream) for Server-Sent-Events endpoints
+
+Providers:
+- "openai": OpenAI Chat Completions via openai.AsyncOpenAI on a pooled httpx client
+- "fake": local canned responses with configurable latency, for tests and benchmarks
+- "placeholder": deterministic text used when OPENAI_API_KEY is not configured
+
+Configuration (environment variables):
+    AI_PROVIDER              openai | fake | placeholder (default: openai if a key is set)
+    OPENAI_MAX_CONCURRENCY   max in-flight completions per process (default 16)
+    OPENAI_MAX_CONNECTIONS   HTTP connection pool size (default 32)
+    OPENAI_TIMEOUT_SECONDS   per-call timeout (default 30)
+    FAKE_LLM_LATENCY_SECONDS simulated latency of the fake provider (default 0.05)
+    FAKE_LLM_TOKEN_LATENCY_SECONDS  delay between streamed fake tokens (default 0)
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from fastapi import HTTPException, Request
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+AI_PROVIDER = os.getenv("AI_PROVIDER", "openai" if OPENAI_API_KEY else "placeholder")
+MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30"))
+FAKE_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.05"))
+FAKE_TOKEN_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_TOKEN_LATENCY_SECONDS", "0"))
+
+Messages = List[Dict[str, str]]
+T = TypeVar("T")
+
+
+# ----------------------------
+# Providers
+# ----------------------------
+class LLMProvider:
+    """Base class for chat completion backends"""
+
+    name = "base"
+
+    async def complete(self, messages: Messages, max_tokens: int, temperature: float) -> str:
+        raise NotImplementedError
+
+    async def stream(self, messages: Messages, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        """Yield the reply in chunks as it is produced; by default, all at once"""
+        yield await self.complete(messages, max_tokens=max_tokens, temperature=temperature)
+
+    async def aclose(self):
+        """Release network resources"""
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI Chat Completions over a shared, keep-alive connection pool"""
+
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str = OPENAI_MODEL,
+                 max_connections: int = MAX_CONNECTIONS, timeout: float = TIMEOUT_SECONDS):
+        import httpx
+        import openai
+
+        self.model = model
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+        )
+        self._client = openai.AsyncOpenAI(api_key=api_key, http_client=self._http)
+
+    async def complete(self, messages: Messages, max_tokens: int, temperature: float) -> str:
+        resp = await self._client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        return (resp.choices[0].message.content or "").strip()
+
+    async def stream(self, messages: Messages, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        chunks = await self._client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        try:
+            async for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await chunks.close()
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+class FakeProvider(LLMProvider):
+    """
+    Local provider for tests and benchmarks. Sleeps for `latency` seconds and
+    returns `responder(messages)`, or an echo of the user prompt by default.
+    When streaming, `latency` is the time to first token and the reply is
+    yielded word by word, `token_latency` seconds apart.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float = FAKE_LATENCY_SECONDS,
+                 responder: Optional[Callable[[Messages], str]] = None,
+                 token_latency: float = FAKE_TOKEN_LATENCY_SECONDS):
+        self.latency = latency
+        self.responder = responder
+        self.token_latency = token_latency
+        self.calls = 0
+
+    def _reply(self, messages: Messages) -> str:
+        if self.responder is not None:
+            return self.responder(messages)
+        return "[fake LLM response] " + messages[-1]["content"].strip()[:200]
+
+    async def complete(self, messages: Messages, max_tokens: int, temperature: float) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._reply(messages)
+
+    async def stream(self, messages: Messages, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        words = self._reply(messages).split(" ")
+        for i, word in enumerate(words):
+            if i and self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            yield word if i == len(words) - 1 else word + " "
+
+
+class PlaceholderProvider(LLMProvider):
+    """Deterministic placeholder used when OPENAI_API_KEY is not configured"""
+
+    name = "placeholder"
+
+    async def complete(self, messages: Messages, max_tokens: int, temperature: float) -> str:
+        return ("[OPENAI_API_KEY not set. To enable real AI responses, set OPENAI_API_KEY in the environment.]\n\n"
+                + messages[-1]["content"][:100])
+
+
+def _default_provider() -> LLMProvider:
+    if AI_PROVIDER == "fake":
+        return FakeProvider()
+    if AI_PROVIDER == "openai" and OPENAI_API_KEY:
+        return OpenAIProvider(OPENAI_API_KEY)
+    return PlaceholderProvider()
+
+
+# ----------------------------
+# Client
+# ----------------------------
+class LLMClient:
+    """Concurrency-limited, timeout-aware front end to an LLMProvider"""
+
+    def __init__(self, provider: LLMProvider, max_concurrency: int = MAX_CONCURRENCY,
+                 timeout: float = TIMEOUT_SECONDS):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.in_flight = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def complete(self, user_prompt: str, system_prompt: str, max_tokens: int = 800,
+                       temperature: float = 0.2, timeout: Optional[float] = None) -> str:
+        """
+        Run one chat completion. Waits for a free slot under the concurrency cap,
+        then raises asyncio.TimeoutError if the provider takes longer than `timeout`.
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                return await asyncio.wait_for(
+                    self.provider.complete(messages, max_tokens=max_tokens, temperature=temperature),
+                    timeout or self.timeout,
+                )
+            finally:
+                self.in_flight -= 1
+
+    async def stream(self, user_prompt: str, system_prompt: str, max_tokens: int = 800,
+                     temperature: float = 0.2, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Stream one chat completion. Holds a concurrency slot until the stream
+        ends or is closed; raises asyncio.TimeoutError if the provider goes
+        quiet for longer than `timeout` between chunks.
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        async with self._semaphore:
+            self.in_flight += 1
+            chunks = self.provider.stream(messages, max_tokens=max_tokens, temperature=temperature)
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout or self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    yield chunk
+            finally:
+                self.in_flight -= 1
+                await chunks.aclose()
+
+    async def aclose(self):
+        await self.provider.aclose()
+
+
+_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """Get the process-wide client, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = LLMClient(_default_provider())
+    return _client
+
+
+def configure_llm_client(provider: Optional[LLMProvider] = None, max_concurrency: int = MAX_CONCURRENCY,
+                         timeout: float = TIMEOUT_SECONDS) -> LLMClient:
+    """Replace the process-wide client, e.g. with a FakeProvider in tests"""
+    global _client
+    _client = LLMClient(provider or _default_provider(), max_concurrency=max_concurrency, timeout=timeout)
+    return _client
+
+
+async def shutdown_llm_client():
+    """Close the shared connection pool (called from the app lifespan)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# ----------------------------
+# Request helpers
+# ----------------------------
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Format one Server-Sent-Events message with a JSON payload"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T], poll_interval: float = 0.25) -> T:
+    """
+    Await `awaitable` while watching the HTTP connection. If the client goes
+    away first, the work is cancelled (freeing its concurrency slot) and a 499
+    HTTPException is raised.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+            # Wait for the cancellation to land so the concurrency slot is released
+            await asyncio.gather(task, return_exceptions=True)
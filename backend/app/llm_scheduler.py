@@ -0,0 +1,235 @@
+"""
+Priority- and budget-aware admission for outbound LLM calls.
+
+Every completion waits here for a slot before it reaches the provider. Waiting
+calls are admitted strictly by priority class (FIFO within a class), so an
+interactive tutor chat never queues behind a burst of long research prompts;
+lower classes only get capacity the higher ones leave unused.
+
+A call is admitted when all of these hold:
+- a concurrency slot is free (the LLM client's cap by default)
+- the requests-per-minute bucket has a request left
+- the tokens-per-minute bucket covers the call's estimated tokens
+  (prompt length / 4 + max_tokens; unused tokens are refunded on completion)
+
+Configuration (environment variables):
+    LLM_PRIORITY_ORDER   session types from highest to lowest priority
+                         (default tutor,quiz,recommendations,research)
+    LLM_RPM_LIMIT        requests per minute, 0 = unlimited (default 0)
+    LLM_TPM_LIMIT        tokens per minute, 0 = unlimited (default 0)
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import statistics
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from app.llm_client import get_llm_client
+
+PRIORITY_ORDER = [c.strip() for c in os.getenv("LLM_PRIORITY_ORDER", "tutor,quiz,recommendations,research").split(",")
+                  if c.strip()]
+RPM_LIMIT = float(os.getenv("LLM_RPM_LIMIT", "0"))
+TPM_LIMIT = float(os.getenv("LLM_TPM_LIMIT", "0"))
+
+# Recent queue waits kept per class for percentiles
+WAIT_SAMPLES = 1024
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token count (about 4 characters per token)"""
+    return sum(len(text) for text in texts) // 4 + 1
+
+
+class TokenBucket:
+    """Per-minute budget refilled continuously; a limit of 0 means unlimited"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.capacity / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)"""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) * 60 / self.capacity)
+
+    def take(self, amount: float):
+        if self.capacity:
+            self.tokens -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        if self.capacity and amount > 0:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _ClassStats:
+    def __init__(self):
+        self.queued = 0
+        self.admitted = 0
+        self.cancelled = 0
+        self.waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    def snapshot(self) -> Dict[str, Any]:
+        waits = sorted(self.waits)
+
+        def pct(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1e3, 2) if waits else 0.0
+
+        return {
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "cancelled": self.cancelled,
+            "wait_ms": {
+                "mean": round(statistics.fmean(waits) * 1e3, 2) if waits else 0.0,
+                "p50": pct(0.50),
+                "p95": pct(0.95),
+                "p99": pct(0.99),
+                "max": round(waits[-1] * 1e3, 2) if waits else 0.0,
+            },
+        }
+
+
+class LLMScheduler:
+    """Admits LLM calls by priority class under concurrency, RPM and TPM limits"""
+
+    def __init__(self, priority_order: List[str] = PRIORITY_ORDER, rpm: float = RPM_LIMIT, tpm: float = TPM_LIMIT,
+                 max_concurrency: Optional[int] = None):
+        self.priority_order = list(priority_order)
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future, str, int]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats: Dict[str, _ClassStats] = {}
+
+    def priority(self, session_type: Optional[str]) -> int:
+        """Lower is more urgent; unknown session types rank below every known class"""
+        try:
+            return self.priority_order.index(session_type)
+        except ValueError:
+            return len(self.priority_order)
+
+    def _class_stats(self, session_type: Optional[str]) -> _ClassStats:
+        return self._stats.setdefault(session_type or "other", _ClassStats())
+
+    def _concurrency_limit(self) -> int:
+        if self.max_concurrency is not None:
+            return self.max_concurrency
+        return get_llm_client().max_concurrency
+
+    def _bind_loop(self):
+        # Futures and timers belong to one event loop; start clean on a new one
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._waiters = []
+            self._timer = None
+            self.in_flight = 0
+
+    def _dispatch(self):
+        """Admit waiters from the head of the queue while capacity allows"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        limit = self._concurrency_limit()
+        while self._waiters and self.in_flight < limit:
+            _, _, future, _, tokens = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            delay = max(self.rpm.wait_time(1), self.tpm.wait_time(tokens))
+            if delay > 0:
+                self._timer = self._loop.call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self.rpm.take(1)
+            self.tpm.take(tokens)
+            self.in_flight += 1
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, session_type: Optional[str], estimated_tokens: int = 0) -> AsyncIterator["_Usage"]:
+        """
+        Wait for admission, then hold a slot for the duration of the block.
+        Set `usage.tokens` inside the block to refund an over-estimate.
+        """
+        self._bind_loop()
+        stats = self._class_stats(session_type)
+        future = self._loop.create_future()
+        heapq.heappush(self._waiters, (self.priority(session_type), next(self._sequence), future, session_type,
+                                       estimated_tokens))
+        stats.queued += 1
+        queued_at = time.perf_counter()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the caller went away: hand the slot back
+                self.in_flight -= 1
+                self._dispatch()
+            stats.cancelled += 1
+            raise
+        finally:
+            stats.queued -= 1
+        stats.admitted += 1
+        stats.waits.append(time.perf_counter() - queued_at)
+        usage = _Usage(estimated_tokens)
+        try:
+            yield usage
+        finally:
+            self.in_flight -= 1
+            self.tpm.give_back(estimated_tokens - usage.tokens)
+            self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "priority_order": self.priority_order,
+            "rpm_limit": self.rpm.capacity,
+            "tpm_limit": self.tpm.capacity,
+            "in_flight": self.in_flight,
+            "queued": sum(1 for waiter in self._waiters if not waiter[2].done()),
+            "classes": {name: stats.snapshot() for name, stats in self._stats.items()},
+        }
+
+
+class _Usage:
+    """Tokens actually used by an admitted call (defaults to the estimate)"""
+
+    def __init__(self, tokens: int):
+        self.tokens = tokens
+
+
+_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get the process-wide scheduler, creating it on first use"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler()
+    return _scheduler
+
+
+def configure_llm_scheduler(**kwargs) -> LLMScheduler:
+    """Replace the process-wide scheduler, e.g. with tighter limits in benchmarks"""
+    global _scheduler
+    _scheduler = LLMScheduler(**kwargs)
+    return _scheduler
@@ -0,0 +1,84 @@
+"""
+Request-scoped batched loaders for the SQLite routers (DataLoader style).
+
+A handler that needs related rows for many parents collects their ids and asks
+the loader once, instead of querying inside its loop:
+
+    courses = await loaders.courses.load_many(e.course_id for e in enrollments)
+
+The loader fetches every id it has not seen yet in one
+`SELECT ... WHERE id IN (...)` and memoizes the results, misses included, for
+the rest of the request, so repeated and later lookups cost no query. The
+number of statements per request stays constant whatever the row count
+(app.sql_profiler flags handlers that regress).
+
+Handlers get a fresh Loaders per request, sharing the request's session:
+
+    async def handler(..., loaders: Loaders = Depends(get_loaders)):
+        course = await loaders.courses.load(course_id)
+
+GET handlers take get_read_loaders instead, bound to the read-only session.
+"""
+
+from typing import Any, Dict, Generic, Iterable, List, Optional, Type, TypeVar
+
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models_sqlite as models
+from app.database import get_db, get_read_db
+
+# Ids per IN list, well below SQLite's bound-parameter limit
+MAX_BATCH = 500
+
+Model = TypeVar("Model")
+
+
+class BatchLoader(Generic[Model]):
+    """Rows of one model by primary key, fetched in batches and memoized"""
+
+    def __init__(self, db: AsyncSession, model: Type[Model]):
+        self.db = db
+        self.model = model
+        self.key = model.__mapper__.primary_key[0]
+        self._rows: Dict[Any, Optional[Model]] = {}
+
+    async def load_many(self, ids: Iterable[Any]) -> List[Optional[Model]]:
+        """The row for each id, in order (None where it does not exist)"""
+        ids = list(ids)
+        missing = [i for i in dict.fromkeys(ids) if i is not None and i not in self._rows]
+        for start in range(0, len(missing), MAX_BATCH):
+            batch = missing[start:start + MAX_BATCH]
+            result = await self.db.execute(select(self.model).where(self.key.in_(batch)))
+            found = {getattr(row, self.key.key): row for row in result.scalars()}
+            for i in batch:
+                self._rows[i] = found.get(i)
+        return [self._rows.get(i) for i in ids]
+
+    async def load(self, id: Any) -> Optional[Model]:
+        return (await self.load_many([id]))[0]
+
+    def prime(self, rows: Iterable[Model]):
+        """Memoize rows the handler already has"""
+        for row in rows:
+            self._rows[getattr(row, self.key.key)] = row
+
+
+class Loaders:
+    """One loader per model looked up by id in the SQLite routers"""
+
+    def __init__(self, db: AsyncSession):
+        self.courses: BatchLoader[models.Course] = BatchLoader(db, models.Course)
+        self.users: BatchLoader[models.User] = BatchLoader(db, models.User)
+        self.quizzes: BatchLoader[models.Quiz] = BatchLoader(db, models.Quiz)
+
+
+async def get_loaders(db: AsyncSession = Depends(get_db)) -> Loaders:
+    """FastAPI dependency: loaders bound to the request's session (get_db is cached per request)"""
+    return Loaders(db)
+
+
+async def get_read_loaders(db: AsyncSession = Depends(get_read_db)) -> Loaders:
+    """FastAPI dependency: loaders bound to the request's read-only session"""
+    return Loaders(db)
@@ -12,7 +12,8 @@ from datetime import datetime
 from contextlib import asynccontextmanager
 
 from app.models import HealthResponse
-from app import db
+from app import db, ai_service, jobs, metrics, snapshot
+from app.session_log import session_logger
 from app.routers import students, dashboard, courses, ai, careers, notifications
 
 
@@ -30,7 +31,9 @@ async def lifespan(app: FastAPI):
     print("\n" + "="*50)
     print("🚀 Starting AI-Integrated Learning Platform API")
     print("="*50)
-    db.initialize_database()
+    snapshot.load_or_initialize()
+    jobs.job_queue.start()
+    session_logger.start()
     print("✅ Server ready!")
     print("="*50 + "\n")
 
@@ -38,6 +41,10 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     print("\n👋 Shutting down server...")
+    await jobs.job_queue.stop()
+    await session_logger.stop()
+    await ai_service.shutdown()
+    snapshot.save_on_shutdown()
 
 
 # ============================================
@@ -91,6 +98,14 @@ app.add_middleware(
 )
 
 
+# ============================================
+# METRICS
+# ============================================
+
+# Per-route request metrics and GET /metrics (Prometheus)
+metrics.instrument(app)
+
+
 # ============================================
 # INCLUDE ROUTERS
 # ============================================
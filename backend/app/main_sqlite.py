@@ -1,14 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from datetime import datetime
 
-from app.database import init_db
+from app.database import engine, read_engine, init_db
+from app import ai_service, metrics, sql_profiler
+from app.quiz_bank import quiz_bank
 from app.routers import users, courses_sqlite, enrollments, ai_sqlite, dashboard_sqlite
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    quiz_bank.start()
     yield
+    await quiz_bank.stop()
+    await ai_service.shutdown()
 
 app = FastAPI(
     title="Learning Platform API",
@@ -25,6 +31,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+metrics.instrument(app)
+sql_profiler.instrument(app, engine, read_engine)
+
 app.include_router(users.router)
 app.include_router(courses_sqlite.router)
 app.include_router(enrollments.router)
@@ -45,5 +54,5 @@ async def health_check():
     return {
         "status": "healthy",
         "database": "SQLite",
-        "timestamp": "2024-11-27"
+        "timestamp": datetime.now().isoformat()
     }
@@ -0,0 +1,243 @@
+"""
+Runtime metrics for both apps, exposed in the Prometheus text format.
+
+MetricsMiddleware is a pure ASGI middleware (no BaseHTTPMiddleware task or
+body buffering) that records, per route template and method:
+- http_requests_total{method,route,status}
+- http_request_duration_seconds histogram (until the last body chunk is sent)
+- http_response_size_bytes histogram
+- http_requests_in_flight gauge
+
+Requests that match no route are recorded as route="unmatched", so random
+paths cannot grow the label set. ai_service times every upstream LLM call
+(llm_request_duration_seconds{session_type,outcome}), and modules with their
+own counters (AI response caches, quiz bank) register collectors that are read
+when /metrics is scraped, so they cost nothing per request.
+
+The middleware adds 10-13 µs per request on a single slow vCPU, against about
+90 µs for a FastAPI route that does nothing (benchmarks/bench_metrics.py);
+rendering /metrics takes ~20 ms with 200 routes.
+
+Configuration (environment variables):
+    METRICS_ENABLED   1/0 (default 1); 0 skips the middleware and /metrics
+
+Usage:
+    metrics.instrument(app)          # middleware + GET /metrics
+    with metrics.time_llm_call("tutor"):
+        reply = await client.complete(...)
+"""
+
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "unmatched"
+
+# Bucket upper bounds (inclusive, like Prometheus' `le`)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# (name, type, help, [(labels, value), ...]) as returned by collectors
+Labels = Dict[str, Any]
+MetricFamily = Tuple[str, str, str, List[Tuple[Labels, float]]]
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts are per bucket and made cumulative when rendered"""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Process-wide request, LLM and collector metrics"""
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.response_size: Dict[Tuple[str, str], Histogram] = {}
+        self.in_flight = 0
+        self.llm_latency: Dict[Tuple[str, str], Histogram] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, size: int):
+        key = (method, route)
+        latency = self.latency.get(key)
+        if latency is None:
+            latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.response_size[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(seconds)
+        self.response_size[key].observe(size)
+        counter = (method, route, status)
+        self.requests[counter] = self.requests.get(counter, 0) + 1
+
+    def observe_llm_call(self, session_type: Optional[str], outcome: str, seconds: float):
+        key = (session_type or "other", outcome)
+        histogram = self.llm_latency.get(key)
+        if histogram is None:
+            histogram = self.llm_latency[key] = Histogram(LLM_LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        """Add a function returning metric families; it is called on every scrape"""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def reset(self):
+        """Drop recorded request and LLM samples (collectors stay registered)"""
+        self.requests.clear()
+        self.latency.clear()
+        self.response_size.clear()
+        self.llm_latency.clear()
+
+    # ----------------------------
+    # Exposition
+    # ----------------------------
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        _family(lines, "http_requests_total", "counter", "HTTP requests by route and status",
+                [({"method": m, "route": r, "status": s}, n) for (m, r, s), n in sorted(self.requests.items())])
+        _family(lines, "http_requests_in_flight", "gauge", "HTTP requests being handled",
+                [({}, self.in_flight)])
+        _histograms(lines, "http_request_duration_seconds", "HTTP request latency by route",
+                    {(("method", m), ("route", r)): h for (m, r), h in self.latency.items()})
+        _histograms(lines, "http_response_size_bytes", "HTTP response body size by route",
+                    {(("method", m), ("route", r)): h for (m, r), h in self.response_size.items()})
+        _histograms(lines, "llm_request_duration_seconds", "Upstream LLM call latency by session type and outcome",
+                    {(("session_type", t), ("outcome", o)): h for (t, o), h in self.llm_latency.items()})
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                _family(lines, name, kind, help_text, samples)
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels: Iterable[Tuple[str, Any]]) -> str:
+    text = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + text + "}" if text else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _family(lines: List[str], name: str, kind: str, help_text: str, samples: List[Tuple[Labels, float]]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels.items())} {_number(value)}")
+
+
+def _histograms(lines: List[str], name: str, help_text: str,
+                histograms: Dict[Tuple[Tuple[str, str], ...], Histogram]):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+
+registry = MetricsRegistry()
+
+
+# ----------------------------
+# ASGI middleware
+# ----------------------------
+class MetricsMiddleware:
+    """Record count, latency and response size of every HTTP request by route template"""
+
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500  # if the app raises before responding
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            seconds = time.perf_counter() - started
+            registry.in_flight -= 1
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            registry.observe_request(scope["method"], getattr(route, "path", UNMATCHED_ROUTE), status, seconds, size)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+def instrument(app):
+    """Add the metrics middleware and GET /metrics to a FastAPI app (no-op when METRICS_ENABLED=0)"""
+    if not METRICS_ENABLED:
+        return
+    app.add_middleware(MetricsMiddleware)
+    # An API route (not a plain Starlette one) so /metrics itself is recorded under its path
+    app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+
+
+# ----------------------------
+# Upstream LLM calls
+# ----------------------------
+@contextmanager
+def time_llm_call(session_type: Optional[str]) -> Iterator[None]:
+    """Time the enclosed provider call; outcome is ok, timeout, cancelled or error"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        raise
+    except (asyncio.CancelledError, GeneratorExit):
+        # GeneratorExit: a streaming caller stopped reading
+        outcome = "cancelled"
+        raise
+    finally:
+        registry.observe_llm_call(session_type, outcome, time.perf_counter() - started)
@@ -0,0 +1,219 @@
+"""
+Versioned schema migrations for the SQLite database (learning_platform.db).
+
+Base.metadata.create_all() only creates missing tables, so columns and
+indexes added to app/models_sqlite.py later never reach an existing database.
+Each migration here has a version number and runs once, in order; the
+database's version is kept in PRAGMA user_version, and all pending migrations
+run in one transaction. init_db() runs create_all() and then upgrade(), so
+every migration must also be a no-op on tables create_all() just built
+(IF NOT EXISTS, column checks); fresh and upgraded databases end up with the
+same schema.
+
+To change the schema, edit models_sqlite.py and append a Migration that brings
+existing databases to the same state. Migrations use literal SQL so they keep
+meaning the same thing when the models move on. A migration never deletes or
+rewrites data on its own: if existing rows stop it (e.g. duplicates under a
+new unique index) it raises MigrationError naming them, nothing is applied,
+and the rows have to be fixed by hand before the app starts.
+
+`explain` prints EXPLAIN QUERY PLAN for the SQLite routers' hot queries, to
+check that each is served by an index ("SEARCH ... USING INDEX", "COVERING
+INDEX") rather than a full "SCAN".
+
+Usage (from the backend/ directory):
+    python -m app.migrations status
+    python -m app.migrations upgrade --db /tmp/bench.db
+    python -m app.migrations explain --db /tmp/bench.db
+"""
+
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional, Set, Tuple
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+
+class MigrationError(Exception):
+    """Existing data prevents a migration; nothing was applied"""
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _columns(conn: Connection, table: str) -> Set[str]:
+    return {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table}")')}
+
+
+# ----------------------------
+# Migrations
+# ----------------------------
+def _quiz_bank_key(conn: Connection):
+    # Previously applied on every start by quiz_bank.ensure_schema()
+    columns = _columns(conn, "quizzes")
+    for name, ddl in (("topic", "VARCHAR"), ("num_questions", "INTEGER")):
+        if name not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE quizzes ADD COLUMN {name} {ddl}")
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_quizzes_bank_key ON quizzes (course_id, topic, difficulty, num_questions)"
+    )
+
+
+def _hot_query_indexes(conn: Connection):
+    # The unique index can't be built over duplicate enrollments. Which copy
+    # to keep (their progress, status and dates differ) is not ours to decide
+    duplicates = conn.exec_driver_sql(
+        "SELECT user_id, course_id, count(*) FROM enrollments GROUP BY user_id, course_id HAVING count(*) > 1 "
+        "ORDER BY user_id, course_id"
+    ).all()
+    if duplicates:
+        shown = ", ".join(f"(user_id={user_id}, course_id={course_id}) x{count}"
+                          for user_id, course_id, count in duplicates[:20])
+        more = f" and {len(duplicates) - 20} more" if len(duplicates) > 20 else ""
+        raise MigrationError(
+            f"cannot add ux_enrollments_user_course: {len(duplicates)} (user_id, course_id) pair(s) are "
+            f"enrolled more than once: {shown}{more}. Delete or merge the extra enrollments rows, then start again"
+        )
+
+    # ix_courses_category_active leads with category, so it serves the
+    # category-only lookups ix_courses_category did; keeping both would only
+    # cost a second index update on every course write
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_courses_category")
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_courses_category_active ON courses (category, is_active)",
+        "CREATE INDEX IF NOT EXISTS ix_course_modules_course_order ON course_modules (course_id, order_index)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_enrollments_user_course ON enrollments (user_id, course_id)",
+        "CREATE INDEX IF NOT EXISTS ix_enrollments_user_activity "
+        "ON enrollments (user_id, last_accessed, status, progress)",
+        "CREATE INDEX IF NOT EXISTS ix_quiz_attempts_user_score ON quiz_attempts (user_id, score)",
+        "CREATE INDEX IF NOT EXISTS ix_ai_tutor_sessions_user_course ON ai_tutor_sessions (user_id, course_id)",
+    ):
+        conn.exec_driver_sql(statement)
+    conn.exec_driver_sql("ANALYZE")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "quiz bank key columns and index", _quiz_bank_key),
+    Migration(2, "composite and covering indexes for hot queries, unique enrollments", _hot_query_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ----------------------------
+# Runner
+# ----------------------------
+def current_version(conn: Connection) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def upgrade(conn: Connection) -> List[int]:
+    """Apply pending migrations inside the caller's transaction; returns the versions applied"""
+    version = current_version(conn)
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version > version:
+            logger.info("Applying migration %d: %s", migration.version, migration.description)
+            migration.apply(conn)
+            applied.append(migration.version)
+    if applied:
+        conn.exec_driver_sql(f"PRAGMA user_version = {applied[-1]}")
+    return applied
+
+
+# ----------------------------
+# Query plans
+# ----------------------------
+def hot_queries() -> List[Tuple[str, object]]:
+    """(name, statement) of the SQLite routers' frequent queries, with sample values"""
+    from app import models_sqlite as models
+    from app.routers.dashboard_sqlite import dashboard_stats_query
+
+    return [
+        ("login: user by email",
+         select(models.User).where(models.User.email == "student1@synthetic.edu")),
+        ("enroll: existing enrollment check",
+         select(models.Enrollment).where(models.Enrollment.user_id == 1).where(models.Enrollment.course_id == 1)),
+        ("enrollments of a user",
+         select(models.Enrollment).where(models.Enrollment.user_id == 1)),
+        ("study activity: recent enrollments",
+         select(models.Enrollment).where(models.Enrollment.user_id == 1)
+         .where(models.Enrollment.last_accessed >= datetime(2024, 1, 1) - timedelta(days=30))),
+        ("dashboard stats",
+         dashboard_stats_query(1, date(2024, 1, 1))),
+        ("loaders: courses by id",
+         select(models.Course).where(models.Course.id.in_([1, 2, 3]))),
+        ("tutor: session of a user and course",
+         select(models.AITutorSession).where(models.AITutorSession.user_id == 1)
+         .where(models.AITutorSession.course_id == 1)),
+        ("course modules in order",
+         select(models.CourseModule).where(models.CourseModule.course_id == 1)
+         .order_by(models.CourseModule.order_index)),
+        ("active courses by category",
+         select(models.Course).where(models.Course.category == "AI").where(models.Course.is_active == True)),
+        ("quiz bank: quizzes of a key",
+         select(models.Quiz.id).where(models.Quiz.course_id == 1).where(models.Quiz.topic == "SQL")
+         .where(models.Quiz.difficulty == "medium").where(models.Quiz.num_questions == 5).order_by(models.Quiz.id)),
+        ("quizzes of a course",
+         select(models.Quiz).where(models.Quiz.course_id == 1)),
+    ]
+
+
+def explain(conn: Connection) -> List[Tuple[str, List[str]]]:
+    """(name, plan lines) for each hot query; nested steps are indented"""
+    report = []
+    for name, statement in hot_queries():
+        sql = str(statement.compile(conn, compile_kwargs={"literal_binds": True}))
+        depth = {0: -1}
+        lines = []
+        for step_id, parent, _, detail in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"):
+            depth[step_id] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[step_id] + detail)
+        report.append((name, lines))
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    from app import models_sqlite  # noqa: F401  (registers the tables on Base.metadata)
+    from app.database import SQLALCHEMY_DATABASE_URL, Base
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["status", "upgrade", "explain"])
+    parser.add_argument("--db", help="SQLite file (default: the app's learning_platform.db)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    engine = create_engine(f"sqlite:///{args.db}" if args.db else SQLALCHEMY_DATABASE_URL.replace("+aiosqlite", ""))
+    try:
+        with engine.begin() as conn:
+            if args.command == "status":
+                version = current_version(conn)
+                for migration in MIGRATIONS:
+                    state = "applied" if migration.version <= version else "pending"
+                    print(f"{migration.version:>3}  {state:<8} {migration.description}")
+            elif args.command == "upgrade":
+                Base.metadata.create_all(conn)
+                applied = upgrade(conn)
+                print(f"upgraded to version {LATEST_VERSION}" if applied else f"already at version {LATEST_VERSION}")
+            else:
+                for name, lines in explain(conn):
+                    print(name)
+                    for line in lines:
+                        print(f"    {line}")
+    except MigrationError as e:
+        raise SystemExit(f"migrations: {e}")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
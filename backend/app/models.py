@@ -4,7 +4,7 @@ These models define the structure of data flowing through the API.
 """
 
 from datetime import datetime, date
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field, EmailStr
 
 
@@ -160,6 +160,7 @@ class AiTutorRequest(BaseModel):
     """Request for AI tutor"""
     student_id: int
     message: str = Field(..., min_length=1, max_length=2000)
+    course_id: Optional[int] = None
 
 
 class AiTutorResponse(BaseModel):
@@ -221,6 +222,30 @@ class ResearchAssistantResponse(BaseModel):
     generated_at: datetime
 
 
+# ============================================
+# AI JOB MODELS
+# ============================================
+
+class JobSubmitResponse(BaseModel):
+    """Accepted background job"""
+    job_id: str
+    status: str
+    status_url: str
+
+
+class JobStatusResponse(BaseModel):
+    """Background job status; result is set once the job has succeeded"""
+    job_id: str
+    kind: str
+    status: str
+    priority: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
 # ============================================
 # CAREER MODELS
 # ============================================
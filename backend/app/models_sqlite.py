@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -25,7 +25,7 @@ class Course(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
     description = Column(Text)
-    category = Column(String, index=True)
+    category = Column(String)
     difficulty_level = Column(String, default="beginner")
     duration_weeks = Column(Integer, default=8)
     instructor = Column(String)
@@ -37,6 +37,11 @@ class Course(Base):
     modules = relationship("CourseModule", back_populates="course")
     quizzes = relationship("Quiz", back_populates="course")
 
+    __table_args__ = (
+        # Category listing (also serves category-only lookups)
+        Index("ix_courses_category_active", "category", "is_active"),
+    )
+
 class CourseModule(Base):
     __tablename__ = "course_modules"
 
@@ -52,6 +57,10 @@ class CourseModule(Base):
 
     course = relationship("Course", back_populates="modules")
 
+    __table_args__ = (
+        Index("ix_course_modules_course_order", "course_id", "order_index"),
+    )
+
 class Enrollment(Base):
     __tablename__ = "enrollments"
 
@@ -67,6 +76,13 @@ class Enrollment(Base):
     user = relationship("User", back_populates="enrollments")
     course = relationship("Course", back_populates="enrollments")
 
+    __table_args__ = (
+        # One enrollment per user and course; also the user's enrollment list
+        Index("ux_enrollments_user_course", "user_id", "course_id", unique=True),
+        # Covers the dashboard aggregates and the study-activity date range
+        Index("ix_enrollments_user_activity", "user_id", "last_accessed", "status", "progress"),
+    )
+
 class Quiz(Base):
     __tablename__ = "quizzes"
 
@@ -78,10 +94,17 @@ class Quiz(Base):
     difficulty = Column(String, default="medium")
     created_by = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Quiz bank key (see app/quiz_bank.py); NULL topic for hand-made quizzes
+    topic = Column(String, nullable=True)
+    num_questions = Column(Integer, nullable=True)
 
     course = relationship("Course", back_populates="quizzes")
     attempts = relationship("QuizAttempt", back_populates="quiz")
 
+    __table_args__ = (
+        Index("ix_quizzes_bank_key", "course_id", "topic", "difficulty", "num_questions"),
+    )
+
 class QuizAttempt(Base):
     __tablename__ = "quiz_attempts"
 
@@ -95,6 +118,11 @@ class QuizAttempt(Base):
     user = relationship("User", back_populates="quiz_attempts")
     quiz = relationship("Quiz", back_populates="attempts")
 
+    __table_args__ = (
+        # Covers the dashboard's average score per user
+        Index("ix_quiz_attempts_user_score", "user_id", "score"),
+    )
+
 class AITutorSession(Base):
     __tablename__ = "ai_tutor_sessions"
 
@@ -107,6 +135,10 @@ class AITutorSession(Base):
 
     user = relationship("User", back_populates="ai_sessions")
 
+    __table_args__ = (
+        Index("ix_ai_tutor_sessions_user_course", "user_id", "course_id"),
+    )
+
 class CareerPath(Base):
     __tablename__ = "career_paths"
 
@@ -0,0 +1,361 @@
+"""
+Pre-generated quiz bank for the SQLite app.
+
+Generating a quiz in the request path costs an LLM call per request. The bank
+keeps several ready-made quizzes per key (course, topic, difficulty, number of
+questions) in the `quizzes` table, marked by a non-NULL `topic` and found
+through the `ix_quizzes_bank_key` index.
+
+- draw(): round-robin over the key's quizzes, so consecutive students get
+  different versions; with the key's ids cached in memory a draw is one
+  primary-key read
+- A key with fewer than QUIZ_BANK_LOW_WATER quizzes is refilled to
+  QUIZ_BANK_SIZE in the background, by one refill task per key at a time, so
+  each generated quiz is a distinct variant
+- On a cold key the request waits up to QUIZ_BANK_COLD_WAIT seconds for the
+  key's refill to bank its first quiz. If it can't (no API key, provider
+  error, timeout), the request gets a template quiz stored outside the bank,
+  as before the bank existed, and the key is retried after
+  QUIZ_BANK_RETRY_SECONDS
+- Only quizzes whose every question came from a parseable LLM reply are
+  banked; fallback and error output is never stored
+- Optionally, a warm-up pass fills the bank for every course module title x
+  difficulty at startup and then every QUIZ_BANK_WARMUP_INTERVAL seconds.
+  It costs modules x difficulties x QUIZ_BANK_SIZE LLM calls per process,
+  so it is off by default
+
+Configuration (environment variables):
+    QUIZ_BANK_SIZE             quizzes kept per key (default 5)
+    QUIZ_BANK_LOW_WATER        refill when a key has fewer quizzes than this (default 2)
+    QUIZ_BANK_QUESTIONS        questions per warmed-up quiz (default 5)
+    QUIZ_BANK_DIFFICULTIES     comma-separated difficulties to warm up (default easy,medium,hard)
+    QUIZ_BANK_WARMUP_INTERVAL  seconds between warm-up passes, 0 disables (default 0)
+    QUIZ_BANK_RELOAD_SECONDS   how long a process trusts its cached ids for a key (default 300)
+    QUIZ_BANK_COLD_WAIT        seconds a request waits for a cold key's first quiz (default 10)
+    QUIZ_BANK_RETRY_SECONDS    seconds before a key whose generation failed is tried again (default 60)
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import ai_service, metrics
+from app import models_sqlite as models
+from app.database import AsyncSessionLocal
+
+BANK_SIZE = int(os.getenv("QUIZ_BANK_SIZE", "5"))
+LOW_WATER = int(os.getenv("QUIZ_BANK_LOW_WATER", "2"))
+BANK_QUESTIONS = int(os.getenv("QUIZ_BANK_QUESTIONS", "5"))
+DIFFICULTIES = [d.strip() for d in os.getenv("QUIZ_BANK_DIFFICULTIES", "easy,medium,hard").split(",") if d.strip()]
+WARMUP_INTERVAL = float(os.getenv("QUIZ_BANK_WARMUP_INTERVAL", "0"))
+RELOAD_SECONDS = float(os.getenv("QUIZ_BANK_RELOAD_SECONDS", "300"))
+COLD_WAIT = float(os.getenv("QUIZ_BANK_COLD_WAIT", "10"))
+RETRY_SECONDS = float(os.getenv("QUIZ_BANK_RETRY_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+# (course_id, normalized topic, difficulty, num_questions)
+BankKey = Tuple[int, str, str, int]
+
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(topic.split()).casefold()
+
+
+def bank_key(course_id: int, topic: str, difficulty: str, num_questions: int) -> BankKey:
+    return (course_id, normalize_topic(topic), difficulty.strip().casefold(), num_questions)
+
+
+def template_questions(topic: str, num_questions: int) -> List[Dict[str, Any]]:
+    """Static questions for quizzes served when the bank has none (never banked)"""
+    return [{
+        "question": f"What is the primary concept of {topic}?",
+        "options": [
+            f"Understanding {topic} fundamentals",
+            f"Memorizing {topic} definitions",
+            f"Avoiding {topic} entirely",
+            f"Replacing {topic} methods"
+        ],
+        "correctAnswer": 0,
+        "explanation": f"Understanding {topic} fundamentals is essential for mastery."
+    } for _ in range(num_questions)]
+
+
+async def build_questions(topic: str, difficulty: str, num_questions: int, variant: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate questions in the SQLite app's format ({question, options, correctAnswer, explanation}).
+    Raises ai_service.QuizGenerationError unless the LLM returned `num_questions` usable questions.
+    """
+    questions = []
+    generated = await ai_service.generate_quiz_questions(topic, difficulty, num_questions, variant=variant, strict=True)
+    for q in generated:
+        options = q.get("options")
+        if not q.get("question") or not isinstance(options, list) or len(options) < 2:
+            continue
+        questions.append({
+            "question": q["question"],
+            "options": options,
+            "correctAnswer": options.index(q.get("correct_answer")) if q.get("correct_answer") in options else 0,
+            "explanation": q.get("explanation", "")
+        })
+    if len(questions) < num_questions:
+        raise ai_service.QuizGenerationError(
+            f"{len(questions)} usable question(s) for {topic!r}, {num_questions} needed")
+    return questions[:num_questions]
+
+
+@dataclass
+class _KeyState:
+    """Quiz ids known for one key, and the rotation cursor"""
+    ids: List[int]
+    cursor: int
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class QuizBank:
+    """Rotating, self-refilling pool of stored quizzes per key"""
+
+    def __init__(self, size: int = BANK_SIZE, low_water: int = LOW_WATER, reload_seconds: float = RELOAD_SECONDS,
+                 cold_wait: float = COLD_WAIT, retry_seconds: float = RETRY_SECONDS):
+        self.size = size
+        self.low_water = low_water
+        self.reload_seconds = reload_seconds
+        self.cold_wait = cold_wait
+        self.retry_seconds = retry_seconds
+        self._keys: Dict[BankKey, _KeyState] = {}
+        self._refills: Dict[BankKey, asyncio.Task] = {}
+        # Set whenever a key's refill banks a quiz or ends; cold requests wait on it
+        self._banked: Dict[BankKey, asyncio.Event] = {}
+        self._failed_at: Dict[BankKey, float] = {}
+        self._warmup_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.failed = 0
+        self.templates = 0
+
+    async def _state(self, db: AsyncSession, key: BankKey, reload: bool = False) -> _KeyState:
+        """The key's quiz ids, read through the bank index when not cached or stale"""
+        state = self._keys.get(key)
+        if state is None or reload or time.monotonic() - state.loaded_at > self.reload_seconds:
+            course_id, topic, difficulty, num_questions = key
+            result = await db.execute(
+                select(models.Quiz.id)
+                .where(models.Quiz.course_id == course_id)
+                .where(models.Quiz.topic == topic)
+                .where(models.Quiz.difficulty == difficulty)
+                .where(models.Quiz.num_questions == num_questions)
+                .order_by(models.Quiz.id)
+            )
+            ids = list(result.scalars())
+            # Start each process at a random point so they don't serve in lockstep
+            cursor = state.cursor if state else (random.randrange(len(ids)) if ids else 0)
+            state = _KeyState(ids=ids, cursor=cursor)
+            self._keys[key] = state
+        return state
+
+    async def _next(self, db: AsyncSession, key: BankKey) -> Optional[models.Quiz]:
+        """Next stored quiz of the key in rotation, skipping deleted ones"""
+        state = await self._state(db, key)
+        while state.ids:
+            quiz_id = state.ids[state.cursor % len(state.ids)]
+            state.cursor += 1
+            quiz = await db.get(models.Quiz, quiz_id)
+            if quiz is not None:
+                return quiz
+            state.ids.remove(quiz_id)
+        return None
+
+    async def draw(self, db: AsyncSession, course_id: int, topic: str, difficulty: str,
+                   num_questions: int) -> Optional[models.Quiz]:
+        """Next quiz for the key in rotation, or None if the bank has none yet"""
+        key = bank_key(course_id, topic, difficulty, num_questions)
+        quiz = await self._next(db, key)
+        # Cold keys are refilled by the caller once the course is known to exist
+        if 0 < len(self._keys[key].ids) < self.low_water:
+            self.schedule_refill(key, topic)
+        if quiz is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return quiz
+
+    async def generate(self, db: AsyncSession, course_id: int, topic: str, difficulty: str, num_questions: int,
+                       created_by: Optional[int] = None) -> models.Quiz:
+        """
+        Quiz for a key the bank has none of: the first quiz the key's refill
+        banks within `cold_wait` seconds, else a template quiz stored outside
+        the bank
+        """
+        key = bank_key(course_id, topic, difficulty, num_questions)
+        if self.schedule_refill(key, topic) is not None:
+            try:
+                await asyncio.wait_for(self._banked[key].wait(), self.cold_wait)
+            except asyncio.TimeoutError:
+                pass
+            quiz = await self._next(db, key)
+            if quiz is not None:
+                return quiz
+
+        self.templates += 1
+        quiz = models.Quiz(
+            course_id=course_id,
+            title=f"{topic} - {difficulty.capitalize()} Level Quiz",
+            description=f"Test your knowledge on {topic}",
+            questions=template_questions(topic, num_questions),
+            difficulty=difficulty,
+            created_by=created_by
+        )
+        db.add(quiz)
+        await db.commit()
+        await db.refresh(quiz)
+        return quiz
+
+    async def add(self, db: AsyncSession, course_id: int, topic: str, difficulty: str,
+                  num_questions: int) -> models.Quiz:
+        """
+        Generate one more quiz for the key and store it in the bank. Only call
+        from the key's refill task, so variants are numbered one at a time.
+        Raises ai_service.QuizGenerationError without storing anything when
+        the LLM gives no usable quiz.
+        """
+        key = bank_key(course_id, topic, difficulty, num_questions)
+        state = await self._state(db, key)
+        quiz = models.Quiz(
+            course_id=course_id,
+            title=f"{topic} - {difficulty.capitalize()} Level Quiz",
+            description=f"Test your knowledge on {topic}",
+            questions=await build_questions(topic, difficulty, num_questions, variant=len(state.ids)),
+            difficulty=key[2],
+            topic=key[1],
+            num_questions=num_questions
+        )
+        db.add(quiz)
+        await db.commit()
+        await db.refresh(quiz)
+        if quiz.id not in state.ids:
+            state.ids.append(quiz.id)
+        self.generated += 1
+        return quiz
+
+    def schedule_refill(self, key: BankKey, topic: str) -> Optional[asyncio.Task]:
+        """
+        Top the key up to `size` quizzes in the background (one refill per key
+        at a time); None while the key is backing off after a failed generation
+        """
+        task = self._refills.get(key)
+        if task is None:
+            failed_at = self._failed_at.get(key)
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_seconds:
+                return None
+            self._banked[key] = asyncio.Event()
+            task = asyncio.create_task(self._refill(key, topic))
+            self._refills[key] = task
+            task.add_done_callback(lambda _: self._refills.pop(key, None))
+        return task
+
+    async def _refill(self, key: BankKey, topic: str):
+        course_id, _, difficulty, num_questions = key
+        banked = self._banked[key]
+        try:
+            async with AsyncSessionLocal() as db:
+                await self._state(db, key, reload=True)
+                # add() may swap in a reloaded state once it goes stale, so check the live one
+                while len(self._keys[key].ids) < self.size:
+                    await self.add(db, course_id, topic, difficulty, num_questions)
+                    banked.set()
+            self._failed_at.pop(key, None)
+        except ai_service.QuizGenerationError as e:
+            self.failed += 1
+            self._failed_at[key] = time.monotonic()
+            logger.warning("Quiz bank generation failed for %s, retrying in %gs: %s", key, self.retry_seconds, e)
+        except Exception:
+            self.failed += 1
+            self._failed_at[key] = time.monotonic()
+            logger.exception("Quiz bank refill failed for %s", key)
+        finally:
+            banked.set()
+
+    async def warm_up(self, difficulties: List[str] = DIFFICULTIES, num_questions: int = BANK_QUESTIONS):
+        """Fill the bank for every active course's module titles (or course title) x difficulty"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(models.Course.id, models.Course.title, models.CourseModule.title)
+                .outerjoin(models.CourseModule, models.CourseModule.course_id == models.Course.id)
+                .where(models.Course.is_active == True)
+            )
+            topics = {(course_id, module_title or course_title) for course_id, course_title, module_title in result}
+        # One key at a time: warm-up is background work and must not crowd out live requests
+        for course_id, topic in sorted(topics):
+            for difficulty in difficulties:
+                task = self.schedule_refill(bank_key(course_id, topic, difficulty, num_questions), topic)
+                if task is not None:
+                    await task
+
+    def start(self, interval: float = WARMUP_INTERVAL):
+        """Run warm-up passes in the background every `interval` seconds (0 disables)"""
+        if interval <= 0 or self._warmup_task is not None:
+            return
+
+        async def loop():
+            while True:
+                try:
+                    await self.warm_up()
+                except Exception:
+                    logger.exception("Quiz bank warm-up failed")
+                await asyncio.sleep(interval)
+
+        self._warmup_task = asyncio.create_task(loop())
+
+    async def stop(self):
+        """Cancel warm-up and any refills in progress"""
+        tasks = list(self._refills.values())
+        if self._warmup_task is not None:
+            tasks.append(self._warmup_task)
+            self._warmup_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        draws = self.hits + self.misses
+        return {
+            "keys": len(self._keys),
+            "quizzes": sum(len(state.ids) for state in self._keys.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / draws, 4) if draws else 0.0,
+            "generated": self.generated,
+            "failed": self.failed,
+            "templates": self.templates,
+            "refills_in_progress": len(self._refills),
+        }
+
+
+quiz_bank = QuizBank()
+
+
+def _quiz_bank_metrics():
+    """Collector for /metrics: quiz bank draws and generated quizzes"""
+    stats = quiz_bank.stats()
+    return [
+        ("quiz_bank_draws_total", "counter", "Quiz requests served from the bank (hit) or generated (miss)",
+         [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["misses"])]),
+        ("quiz_bank_hit_ratio", "gauge", "Quiz bank hits / draws since start", [({}, stats["hit_rate"])]),
+        ("quiz_bank_generated_total", "counter", "Quizzes generated into the bank", [({}, stats["generated"])]),
+        ("quiz_bank_failed_refills_total", "counter", "Refills stopped by an unusable or failed LLM reply",
+         [({}, stats["failed"])]),
+        ("quiz_bank_template_quizzes_total", "counter", "Cold requests served a template quiz outside the bank",
+         [({}, stats["templates"])]),
+        ("quiz_bank_quizzes", "gauge", "Quizzes currently banked", [({}, stats["quizzes"])]),
+    ]
+
+
+metrics.registry.register_collector(_quiz_bank_metrics)
@@ -4,32 +4,43 @@ AI-powered feature endpoints.
 Includes AI Tutor, Quiz Generator, Research Assistant, and Recommendations.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime
-from typing import Any
+from typing import Any, Awaitable, Callable
+from pydantic import BaseModel
 from app.models import (
     AiTutorRequest, AiTutorResponse,
     QuizGeneratorRequest, QuizGeneratorResponse,
     ResearchAssistantRequest, ResearchAssistantResponse,
+    JobSubmitResponse, JobStatusResponse,
 )
 from app import db
 from app.ai_service import (
+    AI_ERROR_PREFIX,
     generate_ai_tutor_response,
+    stream_ai_tutor_response,
     generate_quiz_questions,
     generate_research_assistance,
-    generate_course_recommendations
+    generate_course_recommendations,
+    cache_stats
 )
+from app.jobs import PRIORITIES, QueueFull, job_queue
+from app.llm_client import cancel_on_disconnect, sse_event
+from app.llm_scheduler import get_llm_scheduler
 
 router = APIRouter(prefix="/ai", tags=["AI Features"])
 
 
 @router.post("/tutor", response_model=AiTutorResponse)
-async def ai_tutor(request: AiTutorRequest):
+async def ai_tutor(request: AiTutorRequest, http_request: Request):
     """
     Get help from the AI tutor.
     """
     try:
-        ai_out = generate_ai_tutor_response(request.student_id, request.message)
+        ai_out = await cancel_on_disconnect(
+            http_request, generate_ai_tutor_response(request.student_id, request.message, request.course_id)
+        )
         # persist session briefly
         db.add_ai_session(
             student_id=request.student_id,
@@ -43,78 +54,197 @@ async def ai_tutor(request: AiTutorRequest):
             ai_response=ai_out.get('answer',''),
             timestamp=datetime.now()
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/quiz-generate", response_model=QuizGeneratorResponse)
-async def quiz_generate(request: QuizGeneratorRequest):
+@router.post("/tutor/stream")
+async def ai_tutor_stream(request: AiTutorRequest):
     """
-    Generate an automatic quiz for the given topic.
+    Stream the AI tutor's answer as Server-Sent Events.
+
+    Each `data:` message carries {"token": "..."}; a final `event: done`
+    message carries the full answer. The session is logged once the stream
+    completes. If the provider fails, an `event: error` message carries the
+    error instead and no session is logged.
     """
-    try:
-        questions = generate_quiz_questions(request.topic, request.difficulty, request.num_questions)
-        # convert to QuizQuestion models list
-        quiz_questions = []
-        for q in questions:
-            # map option index of correct answer if possible
-            correct_index = 0
-            if isinstance(q.get('options'), list) and q.get('correct_answer') in q.get('options'):
-                correct_index = q.get('options').index(q.get('correct_answer'))
-            else:
-                correct_index = 0
-            quiz_questions.append({
-                "question": q.get('question',''),
-                "options": q.get('options',[]),
-                "correct_answer": correct_index,
-                "explanation": q.get('explanation','')
-            })
+    async def events():
+        parts = []
+        async for chunk in stream_ai_tutor_response(request.student_id, request.message, request.course_id):
+            if chunk.startswith(AI_ERROR_PREFIX):
+                yield sse_event({"error": chunk, "timestamp": datetime.now().isoformat()}, event="error")
+                return
+            parts.append(chunk)
+            yield sse_event({"token": chunk})
+        answer = "".join(parts)
         db.add_ai_session(
             student_id=request.student_id,
-            session_type='quiz',
-            input_summary=request.topic[:200],
-            response_summary=f"Generated {len(quiz_questions)} questions"
-        )
-        return QuizGeneratorResponse(
-            student_id=request.student_id,
-            topic=request.topic,
-            difficulty=request.difficulty,
-            questions=quiz_questions,
-            generated_at=datetime.now()
+            session_type='tutor',
+            input_summary=request.message[:200],
+            response_summary=answer[:200]
         )
+        yield sse_event({"answer": answer, "timestamp": datetime.now().isoformat()}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def build_quiz_response(request: QuizGeneratorRequest) -> QuizGeneratorResponse:
+    """Generate a quiz, log the session and build the response (shared by sync and job modes)"""
+    questions = await generate_quiz_questions(request.topic, request.difficulty, request.num_questions)
+    # convert to QuizQuestion models list
+    quiz_questions = []
+    for q in questions:
+        # map option index of correct answer if possible
+        correct_index = 0
+        if isinstance(q.get('options'), list) and q.get('correct_answer') in q.get('options'):
+            correct_index = q.get('options').index(q.get('correct_answer'))
+        else:
+            correct_index = 0
+        quiz_questions.append({
+            "question": q.get('question',''),
+            "options": q.get('options',[]),
+            "correct_answer": correct_index,
+            "explanation": q.get('explanation','')
+        })
+    db.add_ai_session(
+        student_id=request.student_id,
+        session_type='quiz',
+        input_summary=request.topic[:200],
+        response_summary=f"Generated {len(quiz_questions)} questions"
+    )
+    return QuizGeneratorResponse(
+        student_id=request.student_id,
+        topic=request.topic,
+        difficulty=request.difficulty,
+        questions=quiz_questions,
+        generated_at=datetime.now()
+    )
+
+
+async def build_research_response(request: ResearchAssistantRequest) -> ResearchAssistantResponse:
+    """Generate research assistance, log the session and build the response"""
+    assistance = await generate_research_assistance(request.research_description, help_type=request.help_type)
+    db.add_ai_session(
+        student_id=request.student_id,
+        session_type='research',
+        input_summary=f"{request.help_type}: {request.research_description[:100]}",
+        response_summary=f"Provided {request.help_type} assistance"
+    )
+
+    return ResearchAssistantResponse(
+        student_id=request.student_id,
+        help_type=request.help_type,
+        suggested_outline=assistance.get('suggested_outline', []),
+        suggested_keywords=assistance.get('suggested_keywords', []),
+        advice=assistance.get('advice', ''),
+        references=assistance.get('references', []),
+        generated_at=datetime.now()
+    )
+
+
+@router.post("/quiz-generate", response_model=QuizGeneratorResponse)
+async def quiz_generate(request: QuizGeneratorRequest, http_request: Request):
+    """
+    Generate an automatic quiz for the given topic.
+    """
+    try:
+        return await cancel_on_disconnect(http_request, build_quiz_response(request))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/research-assistant", response_model=ResearchAssistantResponse)
-async def research_assistant(request: ResearchAssistantRequest):
+async def research_assistant(request: ResearchAssistantRequest, http_request: Request):
     """
     Get research assistance for thesis/project work.
     """
     try:
-        assistance = generate_research_assistance(request.research_description, help_type=request.help_type)
-        db.add_ai_session(
-            student_id=request.student_id,
-            session_type='research',
-            input_summary=f"{request.help_type}: {request.research_description[:100]}",
-            response_summary=f"Provided {request.help_type} assistance"
-        )
-
-        return ResearchAssistantResponse(
-            student_id=request.student_id,
-            help_type=request.help_type,
-            suggested_outline=assistance.get('suggested_outline', []),
-            suggested_keywords=assistance.get('suggested_keywords', []),
-            advice=assistance.get('advice', ''),
-            references=assistance.get('references', []),
-            generated_at=datetime.now()
-        )
+        return await cancel_on_disconnect(http_request, build_research_response(request))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ----------------------------
+# Background jobs
+# ----------------------------
+def submit_job(kind: str, build: Callable[[], Awaitable[BaseModel]], priority: str) -> JobSubmitResponse:
+    """Queue a generation; a full queue is reported as 503 with Retry-After"""
+    async def run():
+        return (await build()).model_dump(mode="json")
+
+    try:
+        job = job_queue.submit(kind, run, priority=PRIORITIES[priority])
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return JobSubmitResponse(job_id=job.id, status=job.status, status_url=f"{router.prefix}/jobs/{job.id}")
+
+
+@router.post("/jobs/quiz-generate", response_model=JobSubmitResponse, status_code=202)
+async def quiz_generate_job(request: QuizGeneratorRequest,
+                            priority: str = Query("normal", pattern="^(high|normal|low)$")):
+    """
+    Queue quiz generation in the background. Poll GET /ai/jobs/{job_id};
+    the result has the same shape as POST /ai/quiz-generate.
+    """
+    return submit_job("quiz", lambda: build_quiz_response(request), priority)
+
+
+@router.post("/jobs/research-assistant", response_model=JobSubmitResponse, status_code=202)
+async def research_assistant_job(request: ResearchAssistantRequest,
+                                 priority: str = Query("normal", pattern="^(high|normal|low)$")):
+    """
+    Queue research assistance in the background. Poll GET /ai/jobs/{job_id};
+    the result has the same shape as POST /ai/research-assistant.
+    """
+    return submit_job("research", lambda: build_research_response(request), priority)
+
+
+def _timestamp(ts):
+    return datetime.fromtimestamp(ts) if ts is not None else None
+
+
+@router.get("/jobs/stats")
+async def get_job_stats():
+    """
+    Job queue depth, worker count and outcome counters.
+    """
+    return job_queue.stats()
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """
+    Status of a background job, with its result once it has succeeded.
+    Finished jobs are kept for AI_JOB_RETENTION_SECONDS, then return 404.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return JobStatusResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        priority=job.priority,
+        created_at=_timestamp(job.created_at),
+        started_at=_timestamp(job.started_at),
+        finished_at=_timestamp(job.finished_at),
+        result=job.result,
+        error=job.error
+    )
+
+
 @router.post("/recommendations")
-async def recommendations(payload: dict):
+async def recommendations(payload: dict, http_request: Request):
     """
     Provide course and certification recommendations based on student's career goal.
     Expected payload: { "goal": "data engineer", "level": "beginner" }
@@ -124,7 +254,7 @@ async def recommendations(payload: dict):
         level = payload.get("level", "beginner")
         if not goal:
             raise HTTPException(status_code=400, detail="Missing 'goal' in payload")
-        recs = generate_course_recommendations(goal, level)
+        recs = await cancel_on_disconnect(http_request, generate_course_recommendations(goal, level))
         # store minimal session
         db.add_ai_session(
             student_id=payload.get("student_id", 0),
@@ -137,3 +267,19 @@ async def recommendations(payload: dict):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Hit/miss counters per endpoint and current size of the AI response cache.
+    """
+    return cache_stats()
+
+
+@router.get("/scheduler/stats")
+async def get_scheduler_stats():
+    """
+    LLM call admission: budgets, in-flight calls and queue waits per session type.
+    """
+    return get_llm_scheduler().stats()
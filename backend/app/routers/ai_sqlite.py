@@ -1,12 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
 from typing import Optional
 
-from app.database import get_db
+from app.database import get_db, get_read_db, AsyncSessionLocal
+from app.loaders import Loaders, get_loaders
 from app import models_sqlite as models
 from app import schemas
+from app.ai_service import AI_ERROR_PREFIX, stream_ai_tutor_response
+from app.llm_client import sse_event
+from app.quiz_bank import quiz_bank
 
 router = APIRouter(prefix="/api/ai", tags=["ai"])
 
@@ -43,51 +48,85 @@ Would you like me to elaborate on any specific aspect or provide more examples?"
 async def ai_tutor(
     request: schemas.AITutorRequest,
     user_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders)
 ):
-    course_title = None
-    if request.course_id:
-        result = await db.execute(
-            select(models.Course).where(models.Course.id == request.course_id)
-        )
-        course = result.scalar_one_or_none()
-        if course:
-            course_title = course.title
+    course_title = await get_course_title(loaders, request.course_id)
 
     ai_response = generate_ai_response(request.question, course_title)
 
-    conversation_entry = [
-        {"role": "user", "content": request.question, "timestamp": datetime.utcnow().isoformat()},
-        {"role": "assistant", "content": ai_response, "timestamp": datetime.utcnow().isoformat()}
-    ]
-
     if request.course_id:
-        result = await db.execute(
-            select(models.AITutorSession)
-            .where(models.AITutorSession.user_id == user_id)
-            .where(models.AITutorSession.course_id == request.course_id)
-        )
-        session = result.scalar_one_or_none()
-
-        if session:
-            existing_conv = session.conversation or []
-            session.conversation = existing_conv + conversation_entry
-            session.updated_at = datetime.utcnow()
-        else:
-            session = models.AITutorSession(
-                user_id=user_id,
-                course_id=request.course_id,
-                conversation=conversation_entry
-            )
-            db.add(session)
-
-        await db.commit()
+        await save_tutor_exchange(db, user_id, request.course_id, request.question, ai_response)
 
     return schemas.AITutorResponse(
         response=ai_response,
         timestamp=datetime.utcnow()
     )
 
+async def get_course_title(loaders: Loaders, course_id: Optional[int]) -> Optional[str]:
+    if not course_id:
+        return None
+    course = await loaders.courses.load(course_id)
+    return course.title if course else None
+
+async def save_tutor_exchange(db: AsyncSession, user_id: int, course_id: int, question: str, answer: str):
+    conversation_entry = [
+        {"role": "user", "content": question, "timestamp": datetime.utcnow().isoformat()},
+        {"role": "assistant", "content": answer, "timestamp": datetime.utcnow().isoformat()}
+    ]
+
+    result = await db.execute(
+        select(models.AITutorSession)
+        .where(models.AITutorSession.user_id == user_id)
+        .where(models.AITutorSession.course_id == course_id)
+    )
+    session = result.scalar_one_or_none()
+
+    if session:
+        existing_conv = session.conversation or []
+        session.conversation = existing_conv + conversation_entry
+        session.updated_at = datetime.utcnow()
+    else:
+        session = models.AITutorSession(
+            user_id=user_id,
+            course_id=course_id,
+            conversation=conversation_entry
+        )
+        db.add(session)
+
+    await db.commit()
+
+@router.post("/tutor/stream")
+async def ai_tutor_stream(
+    request: schemas.AITutorRequest,
+    user_id: int,
+    loaders: Loaders = Depends(get_loaders)
+):
+    course_title = await get_course_title(loaders, request.course_id)
+
+    async def events():
+        parts = []
+        async for chunk in stream_ai_tutor_response(user_id, request.question, request.course_id, course_title):
+            if chunk.startswith(AI_ERROR_PREFIX):
+                # The provider failed (possibly part-way through): nothing is saved
+                yield sse_event({"error": chunk, "timestamp": datetime.utcnow().isoformat()}, event="error")
+                return
+            parts.append(chunk)
+            yield sse_event({"token": chunk})
+        answer = "".join(parts)
+        # The request-scoped session is closed once streaming starts, so the
+        # completed exchange is saved through a session of its own
+        if request.course_id:
+            async with AsyncSessionLocal() as session:
+                await save_tutor_exchange(session, user_id, request.course_id, request.question, answer)
+        yield sse_event({"answer": answer, "timestamp": datetime.utcnow().isoformat()}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/generate-quiz", response_model=schemas.Quiz)
 async def generate_quiz(
     course_id: int,
@@ -95,59 +134,43 @@ async def generate_quiz(
     difficulty: str,
     num_questions: int,
     user_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders)
 ):
-    result = await db.execute(select(models.Course).where(models.Course.id == course_id))
-    course = result.scalar_one_or_none()
+    # Served from the pre-generated bank when possible (one primary-key read)
+    quiz = await quiz_bank.draw(db, course_id, topic, difficulty, num_questions)
+    if quiz is not None:
+        return quiz
+
+    course = await loaders.courses.load(course_id)
 
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
 
-    questions = []
-    for i in range(num_questions):
-        questions.append({
-            "question": f"What is the primary concept of {topic}?",
-            "options": [
-                f"Understanding {topic} fundamentals",
-                f"Memorizing {topic} definitions",
-                f"Avoiding {topic} entirely",
-                f"Replacing {topic} methods"
-            ],
-            "correctAnswer": 0,
-            "explanation": f"Understanding {topic} fundamentals is essential for mastery."
-        })
-
-    quiz = models.Quiz(
-        course_id=course_id,
-        title=f"{topic} - {difficulty.capitalize()} Level Quiz",
-        description=f"Test your knowledge on {topic}",
-        questions=questions,
-        difficulty=difficulty,
-        created_by=user_id
-    )
-
-    db.add(quiz)
-    await db.commit()
-    await db.refresh(quiz)
-
-    return quiz
+    # Bank miss: wait briefly for the key's background refill to bank a quiz,
+    # else a template quiz outside the bank
+    return await quiz_bank.generate(db, course_id, topic, difficulty, num_questions, created_by=user_id)
 
 @router.get("/quizzes/{course_id}")
-async def get_course_quizzes(course_id: int, db: AsyncSession = Depends(get_db)):
+async def get_course_quizzes(course_id: int, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(
         select(models.Quiz).where(models.Quiz.course_id == course_id)
     )
     quizzes = result.scalars().all()
     return quizzes
 
+@router.get("/quiz-bank/stats")
+async def get_quiz_bank_stats():
+    return quiz_bank.stats()
+
 @router.post("/quiz-attempt")
 async def submit_quiz_attempt(
     attempt: schemas.QuizAttemptCreate,
     user_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    loaders: Loaders = Depends(get_loaders)
 ):
-    result = await db.execute(select(models.Quiz).where(models.Quiz.id == attempt.quiz_id))
-    quiz = result.scalar_one_or_none()
+    quiz = await loaders.quizzes.load(attempt.quiz_id)
 
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
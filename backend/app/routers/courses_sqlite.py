@@ -3,14 +3,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
 
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.loaders import Loaders, get_loaders
 from app import models_sqlite as models
 from app import schemas
 
 router = APIRouter(prefix="/api/courses", tags=["courses"])
 
 @router.get("/", response_model=List[schemas.Course])
-async def get_all_courses(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+async def get_all_courses(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(
         select(models.Course)
         .where(models.Course.is_active == True)
@@ -21,7 +22,7 @@ async def get_all_courses(skip: int = 0, limit: int = 100, db: AsyncSession = De
     return courses
 
 @router.get("/{course_id}", response_model=schemas.Course)
-async def get_course(course_id: int, db: AsyncSession = Depends(get_db)):
+async def get_course(course_id: int, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(models.Course).where(models.Course.id == course_id))
     course = result.scalar_one_or_none()
 
@@ -31,7 +32,7 @@ async def get_course(course_id: int, db: AsyncSession = Depends(get_db)):
     return course
 
 @router.get("/{course_id}/modules", response_model=List[schemas.CourseModule])
-async def get_course_modules(course_id: int, db: AsyncSession = Depends(get_db)):
+async def get_course_modules(course_id: int, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(
         select(models.CourseModule)
         .where(models.CourseModule.course_id == course_id)
@@ -49,9 +50,9 @@ async def create_course(course: schemas.CourseCreate, db: AsyncSession = Depends
     return db_course
 
 @router.post("/modules", response_model=schemas.CourseModule)
-async def create_module(module: schemas.CourseModuleCreate, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(models.Course).where(models.Course.id == module.course_id))
-    course = result.scalar_one_or_none()
+async def create_module(module: schemas.CourseModuleCreate, db: AsyncSession = Depends(get_db),
+                        loaders: Loaders = Depends(get_loaders)):
+    course = await loaders.courses.load(module.course_id)
 
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -63,7 +64,7 @@ async def create_module(module: schemas.CourseModuleCreate, db: AsyncSession = D
     return db_module
 
 @router.get("/category/{category}", response_model=List[schemas.Course])
-async def get_courses_by_category(category: str, db: AsyncSession = Depends(get_db)):
+async def get_courses_by_category(category: str, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(
         select(models.Course)
         .where(models.Course.category == category)
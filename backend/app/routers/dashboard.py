@@ -33,29 +33,13 @@ async def get_student_dashboard(student_id: int):
     if not student:
         raise HTTPException(status_code=404, detail=f"Student with ID {student_id} not found")
 
-    # Get enrollments
-    enrollments = db.get_student_enrollments(student_id)
-
-    # Calculate statistics
-    courses_enrolled = len(enrollments)
-    courses_completed = sum(1 for e in enrollments if e['completion_status'] == 'Completed')
-
-    # Calculate average quiz score
-    quiz_results = db.get_student_quiz_results(student_id)
-    if quiz_results:
-        average_score = sum(q['score_percent'] for q in quiz_results) / len(quiz_results)
-    else:
-        average_score = 0.0
-
-    # Calculate total study minutes
-    study_activities = db.get_student_study_activities(student_id, days=30)
-    total_study_minutes = sum(a['minutes_studied'] for a in study_activities)
-
+    # Statistics come from the running per-student aggregate maintained by db
+    student_stats = db.get_student_stats(student_id)
     stats = DashboardStats(
-        courses_enrolled=courses_enrolled,
-        courses_completed=courses_completed,
-        average_score=round(average_score, 1),
-        total_study_minutes=total_study_minutes
+        courses_enrolled=student_stats['courses_enrolled'],
+        courses_completed=student_stats['courses_completed'],
+        average_score=round(student_stats['average_score'], 1),
+        total_study_minutes=student_stats['total_study_minutes']
     )
 
     # Get weekly study activity (last 7 days)
@@ -80,6 +64,7 @@ async def get_student_dashboard(student_id: int):
     enriched_activities.sort(key=lambda x: x.date)
 
     # Get course progress
+    enrollments = db.get_student_enrollments(student_id)
     course_progress = []
     for enrollment in enrollments:
         course = db.get_course_by_id(enrollment['course_id'])
@@ -91,6 +76,7 @@ async def get_student_dashboard(student_id: int):
             ))
 
     # Get recent quiz results (last 5)
+    quiz_results = db.get_student_quiz_results(student_id)
     recent_quizzes = []
     for result in quiz_results[:5]:
         course = db.get_course_by_id(result['course_id'])
@@ -1,68 +1,61 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from datetime import datetime, timedelta
+from sqlalchemy import case, select, func
+from datetime import date, datetime, timedelta
 from typing import List
 
-from app.database import get_db
+from app.database import get_read_db
+from app.loaders import Loaders, get_read_loaders
 from app import models_sqlite as models
 from app import schemas
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
-@router.get("/{user_id}/stats", response_model=schemas.DashboardStats)
-async def get_dashboard_stats(user_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(models.Enrollment).where(models.Enrollment.user_id == user_id)
-    )
-    enrollments = result.scalars().all()
-
-    total_enrolled = len(enrollments)
-    total_completed = sum(1 for e in enrollments if e.status == "completed")
-
-    result = await db.execute(
-        select(models.QuizAttempt)
-        .where(models.QuizAttempt.user_id == user_id)
-    )
-    quiz_attempts = result.scalars().all()
-
-    avg_quiz_score = (
-        sum(a.score for a in quiz_attempts) / len(quiz_attempts)
-        if quiz_attempts else 0.0
+def dashboard_stats_query(user_id: int, today: date):
+    """
+    Every dashboard figure in one statement: enrollment counts and progress in
+    one pass over the user's enrollments, quiz average and tutor sessions as
+    scalar subqueries, and the streak from the enrollments' last-access days.
+    """
+    enrollment = models.Enrollment
+    attempt = models.QuizAttempt
+    session = models.AITutorSession
+
+    # Streak: the most recent access must be today, the next one yesterday,
+    # and so on; it ends at the first row that breaks the sequence
+    ranked = (
+        select(
+            func.julianday(func.date(enrollment.last_accessed)).label("day"),
+            func.row_number().over(order_by=enrollment.last_accessed.desc()).label("rank")
+        )
+        .where(enrollment.user_id == user_id)
+        .where(enrollment.last_accessed.is_not(None))
+        .subquery()
     )
+    first_gap = func.min(case((func.julianday(today.isoformat()) - ranked.c.day != ranked.c.rank - 1, ranked.c.rank)))
+    streak = select(func.coalesce(first_gap - 1, func.count())).scalar_subquery().correlate(None)
 
-    result = await db.execute(
-        select(func.count(models.AITutorSession.id))
-        .where(models.AITutorSession.user_id == user_id)
-    )
-    ai_interactions = result.scalar() or 0
-
-    recent_activity = []
-    for enrollment in enrollments:
-        if enrollment.last_accessed:
-            recent_activity.append(enrollment.last_accessed)
-
-    recent_activity.sort(reverse=True)
+    return select(
+        func.count(enrollment.id),
+        func.count(enrollment.id).filter(enrollment.status == "completed"),
+        func.coalesce(func.sum(enrollment.progress), 0.0),
+        select(func.avg(attempt.score)).where(attempt.user_id == user_id).scalar_subquery(),
+        select(func.count(session.id)).where(session.user_id == user_id).scalar_subquery(),
+        streak,
+    ).where(enrollment.user_id == user_id)
 
-    current_streak = 0
-    if recent_activity:
-        current_date = datetime.utcnow().date()
-        for i, activity_date in enumerate(recent_activity):
-            activity_day = activity_date.date()
-            expected_day = current_date - timedelta(days=i)
-            if activity_day == expected_day:
-                current_streak += 1
-            else:
-                break
 
-    total_time_hours = sum(e.progress / 100 * 40 for e in enrollments)
+@router.get("/{user_id}/stats", response_model=schemas.DashboardStats)
+async def get_dashboard_stats(user_id: int, db: AsyncSession = Depends(get_read_db)):
+    result = await db.execute(dashboard_stats_query(user_id, datetime.utcnow().date()))
+    total_enrolled, total_completed, total_progress, avg_quiz_score, ai_interactions, current_streak = result.one()
 
     return schemas.DashboardStats(
         total_courses_enrolled=total_enrolled,
         total_courses_completed=total_completed,
-        total_time_spent_hours=round(total_time_hours, 1),
+        total_time_spent_hours=round(total_progress / 100 * 40, 1),
         current_streak_days=current_streak,
-        avg_quiz_score=round(avg_quiz_score, 1),
+        avg_quiz_score=round(avg_quiz_score or 0.0, 1),
         total_ai_tutor_interactions=ai_interactions
     )
 
@@ -70,34 +63,33 @@ async def get_dashboard_stats(user_id: int, db: AsyncSession = Depends(get_db)):
 async def get_study_activity(
     user_id: int,
     days: int = 30,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db),
+    loaders: Loaders = Depends(get_read_loaders)
 ):
     result = await db.execute(
         select(models.Enrollment)
         .where(models.Enrollment.user_id == user_id)
         .where(models.Enrollment.last_accessed >= datetime.utcnow() - timedelta(days=days))
     )
-    enrollments = result.scalars().all()
-
-    activity_by_date = {}
-    for enrollment in enrollments:
-        if enrollment.last_accessed:
-            date_key = enrollment.last_accessed.strftime("%Y-%m-%d")
-            if date_key not in activity_by_date:
-                activity_by_date[date_key] = {
-                    "date": date_key,
-                    "hours_studied": 0.0,
-                    "topics": []
-                }
+    enrollments = [e for e in result.scalars().all() if e.last_accessed]
 
-            activity_by_date[date_key]["hours_studied"] += 1.5
+    # One query for all the enrolled courses
+    courses = await loaders.courses.load_many(e.course_id for e in enrollments)
 
-            result_course = await db.execute(
-                select(models.Course).where(models.Course.id == enrollment.course_id)
-            )
-            course = result_course.scalar_one_or_none()
-            if course:
-                activity_by_date[date_key]["topics"].append(course.title)
+    activity_by_date = {}
+    for enrollment, course in zip(enrollments, courses):
+        date_key = enrollment.last_accessed.strftime("%Y-%m-%d")
+        if date_key not in activity_by_date:
+            activity_by_date[date_key] = {
+                "date": date_key,
+                "hours_studied": 0.0,
+                "topics": []
+            }
+
+        activity_by_date[date_key]["hours_studied"] += 1.5
+
+        if course:
+            activity_by_date[date_key]["topics"].append(course.title)
 
     activities = list(activity_by_date.values())
     activities.sort(key=lambda x: x["date"], reverse=True)
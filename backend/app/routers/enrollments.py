@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from typing import List
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app import models_sqlite as models
 from app import schemas
 
@@ -24,12 +25,17 @@ async def create_enrollment(enrollment: schemas.EnrollmentCreate, db: AsyncSessi
 
     db_enrollment = models.Enrollment(**enrollment.dict())
     db.add(db_enrollment)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request enrolled first (ux_enrollments_user_course)
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Already enrolled in this course")
     await db.refresh(db_enrollment)
     return db_enrollment
 
 @router.get("/user/{user_id}", response_model=List[schemas.Enrollment])
-async def get_user_enrollments(user_id: int, db: AsyncSession = Depends(get_db)):
+async def get_user_enrollments(user_id: int, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(
         select(models.Enrollment).where(models.Enrollment.user_id == user_id)
     )
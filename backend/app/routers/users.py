@@ -5,7 +5,7 @@ from typing import List
 import hashlib
 import secrets
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app import models_sqlite as models
 from app import schemas
 
@@ -67,7 +67,7 @@ async def login_user(credentials: schemas.UserLogin, db: AsyncSession = Depends(
     }
 
 @router.get("/{user_id}", response_model=schemas.User)
-async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(models.User).where(models.User.id == user_id))
     user = result.scalar_one_or_none()
 
@@ -77,7 +77,7 @@ async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
     return user
 
 @router.get("/", response_model=List[schemas.User])
-async def get_all_users(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+async def get_all_users(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(models.User).offset(skip).limit(limit))
     users = result.scalars().all()
     return users
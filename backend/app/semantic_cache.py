@@ -0,0 +1,171 @@
+"""
+Semantic near-duplicate cache for AI tutor answers.
+
+Students ask the same question again in slightly different words. Each
+cached question is embedded as hashed character n-grams, words and word
+bigrams (no external service), L2-normalized and stored as a row of a NumPy
+matrix. A new question is answered from the cache when its cosine similarity to
+a cached question from the same course context is at or above the threshold,
+and the words the two questions share appear in the same order. Bigrams and
+the order check keep reversed questions ("Celsius to Fahrenheit" vs.
+"Fahrenheit to Celsius") apart, which a bag of words scores as identical.
+
+Configuration (environment variables):
+    AI_TUTOR_CACHE_ENABLED      1/0 (default 1)
+    AI_TUTOR_CACHE_THRESHOLD    cosine similarity needed for a hit (default 0.9)
+    AI_TUTOR_CACHE_MAX_ENTRIES  cached questions; least recently used are evicted (default 2048)
+    AI_TUTOR_CACHE_TTL          seconds an answer stays servable (default 7 days)
+"""
+
+import os
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+SEMANTIC_CACHE_ENABLED = os.getenv("AI_TUTOR_CACHE_ENABLED", "1") == "1"
+SIMILARITY_THRESHOLD = float(os.getenv("AI_TUTOR_CACHE_THRESHOLD", "0.9"))
+MAX_ENTRIES = int(os.getenv("AI_TUTOR_CACHE_MAX_ENTRIES", "2048"))
+TTL_SECONDS = float(os.getenv("AI_TUTOR_CACHE_TTL", str(7 * 24 * 3600)))
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# Question phrasing that carries no topic; dropped before vectorizing
+_STOPWORDS = frozenset("""
+a an the and or of in on for to with about into is are was were be been it its this that these those
+what whats which who how why when where does do did can could would should will you your i me my we
+explain describe tell please help understand mean means meaning example examples give show some
+don t s
+""".split())
+# Context id used for questions asked outside any course
+NO_CONTEXT = -1
+# Weight of a word bigram relative to a word or character n-gram
+BIGRAM_WEIGHT = 2.0
+
+
+@dataclass
+class SemanticHit:
+    """A cached answer and how similar its question was"""
+    question: str
+    answer: str
+    similarity: float
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in _NON_WORD.split(text.casefold()) if t and t not in _STOPWORDS]
+
+
+def _same_order(a: List[str], b: List[str]) -> bool:
+    """Whether the words `a` and `b` have in common appear in the same order in both"""
+    shared = set(a) & set(b)
+    return list(dict.fromkeys(t for t in a if t in shared)) == list(dict.fromkeys(t for t in b if t in shared))
+
+
+class SemanticCache:
+    """Fixed-capacity similarity index over past questions, with LRU eviction"""
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, max_entries: int = MAX_ENTRIES,
+                 ttl: float = TTL_SECONDS, dim: int = 1024, ngram: int = 3):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.dim = dim
+        self.ngram = ngram
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._contexts = np.full(max_entries, NO_CONTEXT, dtype=np.int64)
+        self._expires_at = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._questions: List[Optional[str]] = [None] * max_entries
+        self._tokens: List[List[str]] = [[] for _ in range(max_entries)]
+        self._answers: List[Optional[str]] = [None] * max_entries
+        self._latencies = np.zeros(max_entries, dtype=np.float64)
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.latency_saved = 0.0
+
+    def vectorize(self, text: str) -> np.ndarray:
+        """Hashed, signed character n-grams, words and (order-sensitive) word bigrams, L2-normalized"""
+        tokens = _tokens(text)
+        features = [(token, 1.0) for token in tokens]
+        features.extend((f"{a} {b}", BIGRAM_WEIGHT) for a, b in zip(tokens, tokens[1:]))
+        for token in tokens:
+            padded = f" {token} "
+            features.extend((padded[i:i + self.ngram], 1.0) for i in range(len(padded) - self.ngram + 1))
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in features:
+            h = zlib.crc32(feature.encode())
+            vector[h % self.dim] += weight if (h >> 31) & 1 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, context: Optional[int], question: str) -> Optional[SemanticHit]:
+        """Return the most similar cached answer for this context, if above the threshold"""
+        best = None
+        if self._size:
+            now = time.time()
+            context = NO_CONTEXT if context is None else context
+            n = self._size
+            similarities = self._vectors[:n] @ self.vectorize(question)
+            similarities[(self._contexts[:n] != context) | (self._expires_at[:n] <= now)] = -1.0
+            tokens = _tokens(question)
+            # Most similar first; usually only one or two candidates clear the threshold
+            for slot in np.argsort(-similarities):
+                if similarities[slot] < self.threshold:
+                    break
+                if _same_order(tokens, self._tokens[slot]):
+                    self._last_used[slot] = now
+                    self.latency_saved += self._latencies[slot]
+                    best = SemanticHit(self._questions[slot], self._answers[slot], float(similarities[slot]))
+                    break
+        if best is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return best
+
+    def add(self, context: Optional[int], question: str, answer: str, latency: float = 0.0):
+        """Cache an answer; when full, the least recently used entry is replaced"""
+        now = time.time()
+        if self._size < self.max_entries:
+            slot = self._size
+            self._size += 1
+        else:
+            slot = int(np.argmin(self._last_used))
+            self.evictions += 1
+        self._vectors[slot] = self.vectorize(question)
+        self._contexts[slot] = NO_CONTEXT if context is None else context
+        self._expires_at[slot] = now + self.ttl
+        self._last_used[slot] = now
+        self._questions[slot] = question
+        self._tokens[slot] = _tokens(question)
+        self._answers[slot] = answer
+        self._latencies[slot] = latency
+
+    def clear(self):
+        self._size = 0
+        self._questions = [None] * self.max_entries
+        self._tokens = [[] for _ in range(self.max_entries)]
+        self._answers = [None] * self.max_entries
+        self.hits = self.misses = self.evictions = 0
+        self.latency_saved = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": SEMANTIC_CACHE_ENABLED,
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+        }
+
+
+tutor_cache = SemanticCache()
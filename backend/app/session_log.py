@@ -0,0 +1,215 @@
+"""
+Write-behind persistence for AI session logs.
+
+Routes record every AI interaction. Keeping those records in an in-process dict
+grew memory forever and lost them on restart. Now a route's only cost is one
+non-blocking append to a bounded ring buffer; a background task drains the
+buffer in batches to durable storage off the event loop:
+
+- "*.db" / "*.sqlite" / "*.sqlite3" paths: an `ai_session_logs` SQLite table
+- any other path: an append-only NDJSON file (one JSON object per line)
+
+Backpressure: once a full batch is waiting the flusher is woken early. If the
+sink still can't keep up and the buffer fills, the oldest unflushed records are
+dropped and counted (stats()["dropped"]); the request path never blocks.
+On shutdown the flusher is told to stop and awaited, so a write in progress
+completes, then everything still buffered is flushed and the sink closed.
+
+Configuration (environment variables):
+    AI_SESSION_LOG_PATH            file to write to; empty disables persistence
+                                   (default ai_session_logs.ndjson)
+    AI_SESSION_LOG_BUFFER          ring buffer capacity in records (default 10000)
+    AI_SESSION_LOG_BATCH           max records per write (default 500)
+    AI_SESSION_LOG_FLUSH_INTERVAL  seconds between flushes (default 1.0)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+LOG_PATH = os.getenv("AI_SESSION_LOG_PATH", "ai_session_logs.ndjson")
+BUFFER_SIZE = int(os.getenv("AI_SESSION_LOG_BUFFER", "10000"))
+BATCH_SIZE = int(os.getenv("AI_SESSION_LOG_BATCH", "500"))
+FLUSH_INTERVAL = float(os.getenv("AI_SESSION_LOG_FLUSH_INTERVAL", "1.0"))
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+COLUMNS = ("student_id", "session_type", "input_summary", "response_summary", "created_at")
+
+logger = logging.getLogger(__name__)
+
+
+class _FileSink:
+    """Append-only NDJSON file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, records: List[Dict[str, Any]]):
+        lines = "".join(json.dumps(record, default=str) + "\n" for record in records)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    def close(self):
+        pass
+
+
+class _SQLiteSink:
+    """`ai_session_logs` table; one transaction per batch"""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_session_logs ("
+            " id INTEGER PRIMARY KEY, student_id INTEGER, session_type TEXT,"
+            " input_summary TEXT, response_summary TEXT, created_at TEXT)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_ai_session_logs_student ON ai_session_logs (student_id, created_at)"
+        )
+        self._conn.commit()
+
+    def write(self, records: List[Dict[str, Any]]):
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO ai_session_logs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                [tuple(record[column] for column in COLUMNS) for record in records],
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+def _open_sink(path: str):
+    if not path:
+        return None
+    return _SQLiteSink(path) if path.endswith(SQLITE_SUFFIXES) else _FileSink(path)
+
+
+class SessionLogger:
+    """Bounded ring buffer drained in batches by a background flusher task"""
+
+    def __init__(self, path: Optional[str] = LOG_PATH, buffer_size: int = BUFFER_SIZE,
+                 batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._sink = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+        # One writer at a time: the sink (a SQLite connection) is not safe for concurrent use
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    def enqueue(self, record: Dict[str, Any]):
+        """Buffer a record for the next flush; never blocks (drops the oldest when full)"""
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(record)
+        self.enqueued += 1
+        if self._task is None:
+            self._start_if_running()
+        elif len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _start_if_running(self):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.start()
+
+    def start(self):
+        """Open the sink and start the flusher (idempotent; needs a running event loop)"""
+        if self._task is not None:
+            return
+        if self._sink is None:
+            self._sink = _open_sink(self.path)
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything buffered so far, one batch at a time, off the event loop"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            await self._flush()
+
+    async def _flush(self):
+        while self._buffer:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            if self._sink is None:
+                continue
+            try:
+                await asyncio.to_thread(self._sink.write, batch)
+            except Exception:
+                self.failed_flushes += 1
+                logger.exception("Failed to write %d AI session log records", len(batch))
+                # Put the batch back in front for the next attempt, minus its
+                # oldest records if newer ones have filled the buffer meanwhile
+                room = self._buffer.maxlen - len(self._buffer)
+                keep = batch[max(0, len(batch) - room):]
+                self.dropped += len(batch) - len(keep)
+                self._buffer.extendleft(reversed(keep))
+                return
+            self.written += len(batch)
+            self.flushes += 1
+
+    async def stop(self):
+        """Stop the flusher once its current write is done, write out what is left and close the sink"""
+        if self._task is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            # Not cancelled: a batch being written has already left the buffer
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "buffered": len(self._buffer),
+            "buffer_size": self._buffer.maxlen,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+def session_record(student_id: int, session_type: str, input_summary: str, response_summary: str) -> Dict[str, Any]:
+    return {
+        "student_id": student_id,
+        "session_type": session_type,
+        "input_summary": input_summary,
+        "response_summary": response_summary,
+        "created_at": datetime.now().isoformat(),
+    }
+
+
+session_logger = SessionLogger()
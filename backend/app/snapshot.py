@@ -0,0 +1,477 @@
+"""
+Binary snapshot and restore of the in-memory database (app.db).
+
+A snapshot captures every table, the ID counters, the per-student indexes and
+the running dashboard aggregates, so a restore reproduces the store exactly
+without re-seeding or re-indexing.
+
+File layout (little-endian):
+
+    header   magic "LPDBSNAP", format version (u32), metadata length (u64),
+             CRC-32 of everything after the header (u32)
+    metadata JSON: per table the column names, encodings and blob offsets
+    body     column blobs back to back, each aligned to 8 bytes
+
+Tables are stored column-wise. Numbers, dates (days since 1970) and datetimes
+(microseconds since 1970) become typed NumPy arrays, strings become category
+codes, and anything else (e.g. lists of tags) is JSON. Columnar tables (LEARNING_DB_ENGINE=columnar)
+are written as their raw arrays. Restore does one bulk read of the file,
+checks the checksum and wraps the blobs with np.frombuffer, with no per-value
+parsing for the numeric columns.
+
+A snapshot saved under one storage engine is converted to the configured one
+when it is restored. Event tables saved as rows go straight from the row
+file's column blobs into a ColumnarTable, without building row dicts. If a table
+can't be stored column-wise (its row ids aren't 1..n), it stays as rows and a
+warning is logged.
+
+At startup app.main calls load_or_initialize(): with LEARNING_DB_SNAPSHOT set,
+an existing snapshot is restored instead of seeding; otherwise the store is
+seeded and the snapshot written, so every worker process ends up with the same
+data. The store is saved again on shutdown (LEARNING_DB_SNAPSHOT_ON_SHUTDOWN=0
+turns that off; with several workers the last one to exit wins).
+
+Usage (from the backend/ directory):
+    python -m app.snapshot save learning_db.snapshot   # seed and save
+    python -m app.snapshot info learning_db.snapshot
+"""
+
+import gc
+import json
+import logging
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app import db
+from app.columnar import ColumnarTable
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = os.getenv("LEARNING_DB_SNAPSHOT")
+SAVE_ON_SHUTDOWN = os.getenv("LEARNING_DB_SNAPSHOT_ON_SHUTDOWN", "1") == "1"
+
+MAGIC = b"LPDBSNAP"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIQI")
+_ALIGN = 8
+
+# A string column is stored as category codes when it has at most this many distinct values
+MAX_CATEGORIES = 65535
+
+
+class SnapshotError(Exception):
+    """The file is not a usable snapshot (wrong magic, version or checksum)"""
+
+
+# ----------------------------
+# Encoding
+# ----------------------------
+class _Writer:
+    """Collects blobs for the body and records where each one starts"""
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.size = 0
+
+    def add(self, data: bytes) -> Dict[str, int]:
+        blob = {"offset": self.size, "nbytes": len(data)}
+        padding = -len(data) % _ALIGN
+        self.parts.append(data + b"\0" * padding)
+        self.size += len(data) + padding
+        return blob
+
+    def add_array(self, array: np.ndarray) -> Dict[str, Any]:
+        array = np.ascontiguousarray(array)
+        return {**self.add(array.tobytes()), "dtype": array.dtype.str}
+
+
+def _column_kind(values: List[Any]) -> str:
+    kinds = set(map(type, values))
+    kinds.discard(type(None))
+    if not kinds:
+        return "json"
+    if kinds == {bool}:
+        return "bool"
+    if kinds == {int}:
+        return "int"
+    if kinds <= {int, float}:
+        return "float"
+    if kinds == {date}:
+        return "date"
+    if kinds == {datetime}:
+        return "datetime"
+    if kinds == {str} and len(set(values)) <= MAX_CATEGORIES + 1:
+        return "category"
+    return "json"
+
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_MICROSECOND = timedelta(microseconds=1)
+_MICROSECONDS_PER_DAY = 86_400_000_000
+
+# kind -> (stored dtype, value -> stored number, dtype whose tolist() gives the values back)
+_KIND_CODECS = {
+    "bool": (np.bool_, None, None),
+    "int": (np.int64, None, None),
+    "float": (np.float64, None, None),
+    "date": (np.int32, lambda d: d.toordinal() - _EPOCH_ORDINAL, "datetime64[D]"),
+    "datetime": (np.int64, lambda dt: (dt - _EPOCH) // _MICROSECOND, "datetime64[us]"),
+}
+
+
+def _encode_column(writer: _Writer, values: List[Any]) -> Dict[str, Any]:
+    kind = _column_kind(values)
+    column: Dict[str, Any] = {"kind": kind}
+    if kind == "json":
+        column["data"] = writer.add(json.dumps(values, default=str).encode())
+        return column
+    if kind == "category":
+        categories = list(dict.fromkeys(values))
+        codes = {value: code for code, value in enumerate(categories)}
+        # None is stored as a category of its own
+        column["categories"] = categories
+        column["data"] = writer.add_array(np.fromiter(map(codes.__getitem__, values), np.int32, len(values)))
+        return column
+    dtype, encode, _ = _KIND_CODECS[kind]
+    nulls = np.fromiter((v is None for v in values), np.bool_, len(values))
+    if nulls.any():
+        column["nulls"] = writer.add_array(nulls)
+        values = [v for v in values if v is not None]
+    data = np.fromiter(map(encode, values) if encode else values, dtype, len(values))
+    if "nulls" in column:
+        filled = np.zeros(len(nulls), dtype=dtype)
+        filled[~nulls] = data
+        data = filled
+    column["data"] = writer.add_array(data)
+    return column
+
+
+def _column_values(records: List[Dict[str, Any]], name: str) -> List[Any]:
+    try:
+        return list(map(itemgetter(name), records))
+    except KeyError:
+        return [row.get(name) for row in records]
+
+
+def _encode_rows(writer: _Writer, rows: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    records = list(rows.values())
+    names = list(dict.fromkeys(chain.from_iterable(records)))
+    return {
+        "storage": "rows",
+        "count": len(records),
+        "columns": {name: _encode_column(writer, _column_values(records, name)) for name in names},
+    }
+
+
+def _encode_index(writer: _Writer, index: Dict[int, Sequence[int]]) -> Dict[str, Any]:
+    """A student -> row ids index as CSR arrays: students, offsets, flat row ids"""
+    students = list(index)
+    lengths = np.fromiter((len(index[s]) for s in students), dtype=np.int64, count=len(students))
+    flat = np.fromiter((row_id for s in students for row_id in index[s]), dtype=np.int64, count=int(lengths.sum()))
+    return {
+        "students": writer.add_array(np.array(students, dtype=np.int64)),
+        "offsets": writer.add_array(np.concatenate(([0], np.cumsum(lengths)))),
+        "values": writer.add_array(flat),
+    }
+
+
+def dumps() -> bytes:
+    """Serialize the current app.db state to snapshot bytes"""
+    writer = _Writer()
+    tables = {}
+    for name, rows in db.tables.items():
+        columns = db.columnar_tables.get(name)
+        if columns is not None:
+            tables[name] = {
+                "storage": "columnar",
+                "count": len(columns),
+                "columns": {column: writer.add_array(columns.column(column)) for column in columns.schema},
+            }
+        else:
+            tables[name] = _encode_rows(writer, rows)
+
+    activity_index = db.student_index["study_activities"]
+    meta = {
+        "created_at": datetime.now().isoformat(),
+        "storage_engine": "columnar" if db.columnar_tables else "dict",
+        "next_id": db.next_id,
+        "quiz_difficulty_levels": db.quiz_difficulty_levels,
+        "tables": tables,
+        "student_index": {name: _encode_index(writer, index) for name, index in db.student_index.items()},
+        # Parallel to student_index['study_activities'], so only the values are needed
+        "activity_dates": writer.add_array(np.fromiter(
+            (ordinal for s in activity_index for ordinal in db.activity_dates[s]), dtype=np.int32,
+            count=sum(len(ids) for ids in activity_index.values()),
+        )),
+        "student_stats": {
+            str(student_id): {**stats, "minutes_by_day": {str(k): v for k, v in stats["minutes_by_day"].items()}}
+            for student_id, stats in db.student_stats.items()
+        },
+    }
+    meta_bytes = json.dumps(meta, default=str).encode()
+    # Pad with JSON whitespace so the body (and every blob in it) is 8-byte aligned
+    meta_bytes += b" " * (-(_HEADER.size + len(meta_bytes)) % _ALIGN)
+    payload = meta_bytes + b"".join(writer.parts)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(meta_bytes), zlib.crc32(payload))
+    return header + payload
+
+
+def save(path: str) -> int:
+    """Write a snapshot atomically (temp file + rename); returns its size in bytes"""
+    data = dumps()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(data)
+
+
+# ----------------------------
+# Decoding
+# ----------------------------
+def _parse(data: bytes) -> Tuple[Dict[str, Any], memoryview]:
+    if len(data) < _HEADER.size:
+        raise SnapshotError("file too short")
+    magic, version, meta_len, checksum = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("not a learning platform snapshot")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"unsupported snapshot version {version} (expected {FORMAT_VERSION})")
+    payload = memoryview(data)[_HEADER.size:]
+    if zlib.crc32(payload) != checksum:
+        raise SnapshotError("checksum mismatch (file is corrupt or truncated)")
+    meta = json.loads(bytes(payload[:meta_len]))
+    return meta, payload[meta_len:]
+
+
+def _array(body: memoryview, blob: Dict[str, Any]) -> np.ndarray:
+    """Zero-copy view of a blob"""
+    dtype = np.dtype(blob["dtype"])
+    return np.frombuffer(body, dtype=dtype, count=blob["nbytes"] // dtype.itemsize, offset=blob["offset"])
+
+
+def _decode_column(body: memoryview, column: Dict[str, Any]) -> List[Any]:
+    kind = column["kind"]
+    if kind == "json":
+        blob = column["data"]
+        return json.loads(bytes(body[blob["offset"]:blob["offset"] + blob["nbytes"]]))
+    array = _array(body, column["data"])
+    if kind == "category":
+        return list(map(column["categories"].__getitem__, array.tolist()))
+    as_dtype = _KIND_CODECS[kind][2]
+    # tolist() on datetime64[D] / datetime64[us] yields date / datetime objects
+    values = (array.astype(as_dtype) if as_dtype else array).tolist()
+    if "nulls" in column:
+        for position in np.flatnonzero(_array(body, column["nulls"])).tolist():
+            values[position] = None
+    return values
+
+
+def _build_rows(names: List[str], values: List[List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Row dicts from equal-length column value lists. Rows are copies of one
+    dict already holding every key, filled in column by column: as fast as a
+    dict display per row and about twice as fast as dict(zip(...)), which
+    matters at a million rows.
+    """
+    template = dict.fromkeys(names)
+    rows = [template.copy() for _ in range(len(values[0]))]
+    for name, column in zip(names, values):
+        for row, value in zip(rows, column):
+            row[name] = value
+    return rows
+
+
+def _decode_index(body: memoryview, blob: Dict[str, Any]) -> Dict[int, Any]:
+    students = _array(body, blob["students"]).tolist()
+    offsets = _array(body, blob["offsets"]).tolist()
+    values = _array(body, blob["values"]).astype(np.int32).tobytes()
+    return {student: db._int_array(values[4 * offsets[i]:4 * offsets[i + 1]]) for i, student in enumerate(students)}
+
+
+def _numbers(body: memoryview, columns: Dict[str, Any], name: str, *kinds: str,
+             nullable: bool = False) -> np.ndarray:
+    """Stored numbers of a row table's column (nulls read as 0); ValueError if it holds other values"""
+    column = columns[name]
+    if column["kind"] not in kinds or ("nulls" in column and not nullable):
+        raise ValueError(f"column {name!r} holds {column['kind']} values")
+    return _array(body, column["data"])
+
+
+def _columns_from_rows(name: str, body: memoryview, table: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Columnar arrays for an event table saved as rows: db._encode_columns()
+    applied a column at a time, without building the row dicts. Raises
+    KeyError/ValueError when the rows can't be stored column-wise.
+    """
+    schema = db.COLUMNAR_SCHEMAS[name]
+    count = table["count"]
+    if not count:
+        return {column: np.zeros(0, dtype=dtype) for column, dtype in schema.items()}
+    columns = table["columns"]
+    if not np.array_equal(_numbers(body, columns, "id", "int"), np.arange(1, count + 1)):
+        raise ValueError("row ids are not 1..n")
+    if name == "study_activities":
+        return {
+            "student_id": _numbers(body, columns, "student_id", "int"),
+            "course_id": _numbers(body, columns, "course_id", "int", nullable=True),
+            "date": _numbers(body, columns, "date", "date") + _EPOCH_ORDINAL,
+            "minutes": _numbers(body, columns, "minutes_studied", "int"),
+        }
+
+    taken_at = _numbers(body, columns, "date", "datetime")
+    # datetime.timestamp() reads naive datetimes as local time, so each distinct one is converted by it
+    distinct, inverse = np.unique(taken_at, return_inverse=True)
+    timestamps = np.array([dt.timestamp() for dt in distinct.astype("datetime64[us]").tolist()])
+    levels = columns["difficulty_level"]
+    if levels["kind"] != "category" or None in levels["categories"]:
+        raise ValueError(f"column 'difficulty_level' holds {levels['kind']} values")
+    for level in levels["categories"]:
+        if level not in db.quiz_difficulty_levels:
+            db.quiz_difficulty_levels.append(level)
+    difficulty = np.array([db.quiz_difficulty_levels.index(level) for level in levels["categories"]], np.int8)
+    return {
+        "student_id": _numbers(body, columns, "student_id", "int"),
+        "course_id": _numbers(body, columns, "course_id", "int"),
+        "date": taken_at // _MICROSECONDS_PER_DAY + _EPOCH_ORDINAL,
+        "score": _numbers(body, columns, "score_percent", "int", "float"),
+        "timestamp": timestamps[inverse],
+        "difficulty": difficulty[_array(body, levels["data"])],
+    }
+
+
+def loads(data: bytes, engine: Optional[str] = None):
+    """
+    Replace the app.db state with the contents of snapshot bytes. With
+    `engine` ("dict" or "columnar") the event tables are converted to that
+    storage engine; by default they keep the one they were saved with.
+    """
+    meta, body = _parse(data)
+    db.reset_database()
+    db.columnar_tables.clear()
+    db.quiz_difficulty_levels[:] = meta["quiz_difficulty_levels"]
+
+    for name, table in meta["tables"].items():
+        if table["storage"] == "columnar":
+            columns = {column: _array(body, blob) for column, blob in table["columns"].items()}
+            db.columnar_tables[name] = ColumnarTable.from_columns(db.COLUMNAR_SCHEMAS[name], columns)
+            continue
+        if engine == "columnar" and name in db.COLUMNAR_SCHEMAS:
+            try:
+                columns = _columns_from_rows(name, body, table)
+            except (KeyError, ValueError) as e:
+                logger.warning("Restoring snapshot table %s as rows, it can't be stored column-wise: %s", name, e)
+            else:
+                db.columnar_tables[name] = ColumnarTable.from_columns(db.COLUMNAR_SCHEMAS[name], columns)
+                continue
+        names = list(table["columns"])
+        if not names:
+            continue
+        values = [_decode_column(body, table["columns"][column]) for column in names]
+        db.tables[name].update(zip(values[names.index("id")], _build_rows(names, values)))
+
+    db.next_id.update(meta["next_id"])
+    for name, blob in meta["student_index"].items():
+        db.student_index[name].update(_decode_index(body, blob))
+    dates = _array(body, meta["activity_dates"]).astype(np.int32).tobytes()
+    position = 0
+    for student_id, row_ids in db.student_index["study_activities"].items():
+        db.activity_dates[student_id] = db._int_array(dates[4 * position:4 * (position + len(row_ids))])
+        position += len(row_ids)
+
+    today = date.today().toordinal()
+    for student_id, stats in meta["student_stats"].items():
+        minutes_by_day = {int(k): v for k, v in stats["minutes_by_day"].items()}
+        db._prune_minutes(minutes_by_day, today)
+        db.student_stats[int(student_id)] = {**stats, "minutes_by_day": minutes_by_day}
+    if engine == "dict":
+        db.disable_columnar_storage()
+    return meta
+
+
+def restore(path: str, engine: Optional[str] = None) -> Dict[str, Any]:
+    """Load a snapshot file with a single bulk read, into `engine` (see loads()); returns its metadata"""
+    with open(path, "rb") as f:
+        data = f.read()
+    # Millions of new row dicts would otherwise trigger repeated, useless GC passes
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return loads(data, engine)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def load_or_initialize(path: Optional[str] = SNAPSHOT_PATH):
+    """Restore from `path` if it holds a valid snapshot, else seed (and save when a path is set)"""
+    if path and os.path.exists(path):
+        try:
+            started = time.perf_counter()
+            meta = restore(path, db.STORAGE_ENGINE)
+            converted = f" (converted from the {meta['storage_engine']} engine)" \
+                if meta["storage_engine"] != db.STORAGE_ENGINE else ""
+            print(f"✓ Database restored from snapshot {path} in {(time.perf_counter() - started) * 1e3:.0f} ms"
+                  f"{converted}")
+            return
+        except SnapshotError as e:
+            print(f"⚠️  Ignoring snapshot {path}: {e}")
+    db.initialize_database()
+    if path:
+        save(path)
+
+
+def save_on_shutdown(path: Optional[str] = SNAPSHOT_PATH):
+    if path and SAVE_ON_SHUTDOWN:
+        save(path)
+
+
+def info(path: str) -> Dict[str, Any]:
+    """Header and per-table row counts of a snapshot, without loading it"""
+    with open(path, "rb") as f:
+        data = f.read()
+    meta, body = _parse(data)
+    return {
+        "version": FORMAT_VERSION,
+        "bytes": len(data),
+        "created_at": meta["created_at"],
+        "storage_engine": meta["storage_engine"],
+        "rows": {name: table["count"] for name, table in meta["tables"].items()},
+    }
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] not in ("save", "info"):
+        print(__doc__)
+        sys.exit(2)
+    command, path = sys.argv[1:]
+    if command == "save":
+        db.initialize_database()
+        size = save(path)
+        print(f"Wrote {path} ({size:,} bytes)")
+    else:
+        started = time.perf_counter()
+        print(json.dumps(info(path), indent=2))
+        print(f"(read and verified in {(time.perf_counter() - started) * 1e3:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
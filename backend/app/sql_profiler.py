@@ -0,0 +1,245 @@
+"""
+Per-request SQL statement counting and N+1 detection for the SQLite app.
+
+Engine events time every statement executed while a profile is active; the
+profile lives in a context variable, so concurrent requests never mix (the
+greenlets SQLAlchemy's async engine runs statements in share the request
+task's context). SQLProfilerMiddleware opens one profile per HTTP request and
+at the end:
+- records statements, DB time and flagged requests per route template for
+  /metrics (sql_queries_total, sql_query_seconds_total,
+  sql_profiled_requests_total, sql_n_plus_one_requests_total)
+- flags the request as N+1 when one statement shape (the SQL text with IN
+  lists collapsed; values are bound parameters) ran more than
+  SQL_N_PLUS_ONE_THRESHOLD times, logging the statement once per route
+- in debug mode adds X-SQL-Queries, X-SQL-Time-Ms, X-SQL-Max-Repeats and
+  (when flagged) X-SQL-N-Plus-One response headers
+
+Outside requests, e.g. in tests or benchmarks:
+    with sql_profiler.profile() as p:
+        await get_study_activity(user_id, db=session)
+    assert not p.n_plus_one, p.repeated()
+
+Configuration (environment variables):
+    SQL_PROFILER_ENABLED       1/0 (default 1)
+    SQL_PROFILER_HEADERS       1 adds the X-SQL-* headers (default 0, debug only)
+    SQL_N_PLUS_ONE_THRESHOLD   repeats of one statement shape allowed per request (default 3)
+"""
+
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import metrics
+
+PROFILER_ENABLED = os.getenv("SQL_PROFILER_ENABLED", "1") == "1"
+PROFILER_HEADERS = os.getenv("SQL_PROFILER_HEADERS", "0") == "1"
+N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "3"))
+
+logger = logging.getLogger(__name__)
+
+# "IN (?, ?, ?)" -> "IN (?...)", so batched lookups of different sizes share a shape
+_IN_LIST = re.compile(r"\(\?(?:\s*,\s*\?)*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("(?...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryProfile:
+    """Statements executed in one request (or one profile() block)"""
+
+    def __init__(self, threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.threshold = threshold
+        self.queries = 0
+        self.seconds = 0.0
+        # Raw statement text -> executions; shapes are computed once per distinct text
+        self.statements: Dict[str, int] = {}
+
+    def record(self, statement: str, seconds: float):
+        self.queries += 1
+        self.seconds += seconds
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def shapes(self) -> Dict[str, int]:
+        shapes: Dict[str, int] = {}
+        for statement, count in self.statements.items():
+            shape = statement_shape(statement)
+            shapes[shape] = shapes.get(shape, 0) + count
+        return shapes
+
+    @property
+    def max_repeats(self) -> int:
+        return max(self.shapes().values(), default=0)
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """(shape, executions) of the shapes above the threshold, most repeated first"""
+        return sorted(((shape, count) for shape, count in self.shapes().items() if count > self.threshold),
+                      key=lambda item: -item[1])
+
+    @property
+    def n_plus_one(self) -> bool:
+        return bool(self.repeated())
+
+
+_current: ContextVar[Optional[QueryProfile]] = ContextVar("sql_profile", default=None)
+
+
+@contextmanager
+def profile(threshold: int = N_PLUS_ONE_THRESHOLD) -> Iterator[QueryProfile]:
+    """Collect the statements run in this context until the block exits"""
+    query_profile = QueryProfile(threshold)
+    token = _current.set(query_profile)
+    try:
+        yield query_profile
+    finally:
+        _current.reset(token)
+
+
+# ----------------------------
+# Engine hooks
+# ----------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._sql_profiler_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    query_profile = _current.get()
+    started = getattr(context, "_sql_profiler_started", None)
+    if query_profile is not None and started is not None:
+        query_profile.record(statement, time.perf_counter() - started)
+
+
+def install(engine) -> bool:
+    """Attach the statement hooks to an engine (sync or async); False when disabled"""
+    if not PROFILER_ENABLED:
+        return False
+    sync_engine: Engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    return True
+
+
+# ----------------------------
+# Per-route totals (for /metrics)
+# ----------------------------
+class RouteTotals:
+    __slots__ = ("requests", "queries", "seconds", "n_plus_one")
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.seconds = 0.0
+        self.n_plus_one = 0
+
+
+route_totals: Dict[Tuple[str, str], RouteTotals] = {}
+_reported: set = set()
+
+
+def record_request(method: str, route: str, query_profile: QueryProfile):
+    totals = route_totals.get((method, route))
+    if totals is None:
+        totals = route_totals[(method, route)] = RouteTotals()
+    totals.requests += 1
+    totals.queries += query_profile.queries
+    totals.seconds += query_profile.seconds
+    if query_profile.queries > query_profile.threshold:
+        repeated = query_profile.repeated()
+        if repeated:
+            totals.n_plus_one += 1
+            shape, count = repeated[0]
+            if (route, shape) not in _reported:
+                _reported.add((route, shape))
+                logger.warning("Possible N+1 in %s %s: %d executions of %s", method, route, count, shape)
+
+
+def stats() -> Dict[str, Any]:
+    """Per-route statement counts, DB time and N+1 flags since start (or reset())"""
+    return {
+        f"{method} {route}": {
+            "requests": totals.requests,
+            "queries_per_request": round(totals.queries / totals.requests, 2),
+            "db_ms_per_request": round(totals.seconds / totals.requests * 1e3, 3),
+            "n_plus_one_requests": totals.n_plus_one,
+        }
+        for (method, route), totals in sorted(route_totals.items())
+    }
+
+
+def reset():
+    route_totals.clear()
+    _reported.clear()
+
+
+def _sql_metrics():
+    """Collector for /metrics: per-route SQL totals"""
+    def samples(attribute: str):
+        return [({"method": method, "route": route}, getattr(totals, attribute))
+                for (method, route), totals in sorted(route_totals.items())]
+
+    return [
+        ("sql_profiled_requests_total", "counter", "Requests profiled for SQL by route", samples("requests")),
+        ("sql_queries_total", "counter", "SQL statements executed by route", samples("queries")),
+        ("sql_query_seconds_total", "counter", "Time spent executing SQL by route", samples("seconds")),
+        ("sql_n_plus_one_requests_total", "counter",
+         f"Requests that repeated one statement shape more than {N_PLUS_ONE_THRESHOLD} times",
+         samples("n_plus_one")),
+    ]
+
+
+metrics.registry.register_collector(_sql_metrics)
+
+
+# ----------------------------
+# ASGI middleware
+# ----------------------------
+class SQLProfilerMiddleware:
+    """Profile the SQL statements of every HTTP request"""
+
+    def __init__(self, app, headers: bool = PROFILER_HEADERS, threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.headers = headers
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile(self.threshold) as query_profile:
+            if self.headers:
+                async def send_with_headers(message):
+                    if message["type"] == "http.response.start":
+                        # Statements run while streaming the body are not in the headers
+                        headers = list(message.get("headers", []))
+                        headers.append((b"x-sql-queries", str(query_profile.queries).encode()))
+                        headers.append((b"x-sql-time-ms", f"{query_profile.seconds * 1e3:.3f}".encode()))
+                        headers.append((b"x-sql-max-repeats", str(query_profile.max_repeats).encode()))
+                        if query_profile.n_plus_one:
+                            headers.append((b"x-sql-n-plus-one", b"1"))
+                        message = {**message, "headers": headers}
+                    await send(message)
+            else:
+                send_with_headers = send
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                route = scope.get("route")
+                record_request(scope["method"], getattr(route, "path", metrics.UNMATCHED_ROUTE), query_profile)
+
+
+def instrument(app, *engines) -> None:
+    """Hook `engines` and profile every request of `app` (no-op when SQL_PROFILER_ENABLED=0)"""
+    if all([install(engine) for engine in engines]):
+        app.add_middleware(SQLProfilerMiddleware)
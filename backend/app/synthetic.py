@@ -0,0 +1,503 @@
+"""
+Deterministic, production-scale synthetic data for performance testing.
+
+generate() builds students, courses, enrollments, quiz attempts, study
+activities, notifications and AI sessions from a seeded NumPy generator: the
+same seed, size and `now` always give the same dataset. Everything is drawn
+as whole arrays, so 100k students (a few million rows) take seconds.
+
+Distributions:
+- course popularity is Zipf-like (weight 1 / rank^ZIPF_EXPONENT), so a few
+  courses hold most of the enrollments
+- per-student activity is heavy-tailed (lognormal multiplier on every event
+  count): most students are light users, a few are very active
+- activity is bursty: each student's events cluster around a handful of
+  burst days, biased towards recent weeks, at evening-peaked hours
+- quiz scores are a per-student ability plus difficulty and noise
+
+The dataset can fill the in-memory store (app.db), load the SQLite database
+through app.bulk_load, or be written as NDJSON files for
+`python -m app.bulk_load`. The two schemas differ: study activities and
+notifications exist only in the in-memory store, AI sessions only in SQLite
+(ai_tutor_sessions), and SQLite also gets course modules and one stored quiz
+per course and difficulty. Every synthetic user can log in to the SQLite app
+as student<N>@synthetic.edu with the password PASSWORD.
+
+Usage (from the backend/ directory):
+    python -m app.synthetic sqlite --students 100000 --db /tmp/bench.db
+    python -m app.synthetic ndjson --students 10000 --out /tmp/synthetic
+    python -m app.synthetic snapshot --students 10000 --out /tmp/learning.snapshot
+
+A snapshot boots the in-memory app with LEARNING_DB_SNAPSHOT=<path>.
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app import bulk_load, db, snapshot
+
+SEED = 42
+
+# Average events per student (before the per-student activity multiplier)
+ENROLLMENTS_PER_STUDENT = 3.5
+QUIZ_ATTEMPTS_PER_ENROLLMENT = 3.0
+STUDY_SESSIONS_PER_STUDENT = 20.0
+NOTIFICATIONS_PER_STUDENT = 1.5
+AI_SESSIONS_PER_STUDENT = 2.0
+
+ZIPF_EXPONENT = 1.1
+ACTIVITY_SIGMA = 0.8        # spread of the lognormal activity multiplier
+HORIZON_DAYS = 180          # events fall within this many days before `now`
+BURSTS_PER_STUDENT = 4
+BURST_SPREAD_DAYS = 1.5
+COMPLETION_RATE = 0.2
+
+# Every synthetic user's password, stored in routers.users.hash_password's
+# "salt$sha256(password + salt)" format with a fixed salt
+PASSWORD = "password123"
+PASSWORD_SALT = "5e7e7e7e5e7e7e7e5e7e7e7e5e7e7e7e"
+PASSWORD_HASH = f"{PASSWORD_SALT}${hashlib.sha256((PASSWORD + PASSWORD_SALT).encode()).hexdigest()}"
+
+FIRST_NAMES = ["Alice", "Bob", "Carol", "David", "Emma", "Farid", "Grace", "Hiro", "Isla", "Jamal", "Kira",
+               "Liam", "Maya", "Noah", "Olga", "Priya", "Quinn", "Rosa", "Sam", "Tara", "Umar", "Vera", "Wei",
+               "Ximena", "Yusuf", "Zoe"]
+LAST_NAMES = ["Johnson", "Martinez", "Chen", "Kim", "Wilson", "Okafor", "Silva", "Tanaka", "Novak", "Haddad",
+              "Larsen", "Patel", "Rossi", "Nguyen", "Schmidt", "Kowalski", "Ibrahim", "Lopez", "Murphy", "Sato"]
+PROGRAMS = ["MS in Computer Science", "MS in Data Analytics", "MS in Information Systems",
+            "MS in Software Engineering", "MS in Cybersecurity", "BS in Computer Science"]
+LEARNING_STYLES = ["Visual", "Hands-on", "Reading/Writing", "Auditory"]
+# The careers db.seed_career_paths() has roadmaps for
+CAREERS = ["Data Scientist", "ML Engineer", "Full Stack Developer"]
+CATEGORIES = ["Programming", "Data Science", "AI", "Database", "Web Development", "Cloud", "Security"]
+SUBJECTS = ["Python", "Machine Learning", "Deep Learning", "SQL", "React", "AWS", "Networking", "Statistics",
+            "Data Visualization", "Algorithms", "DevOps", "NLP", "Computer Vision", "Cryptography", "Go",
+            "Kubernetes", "Product Analytics", "Linear Algebra", "Distributed Systems", "TypeScript"]
+SUFFIXES = ["Fundamentals", "in Practice", "Advanced Topics", "Bootcamp", "for Professionals", "Essentials"]
+DIFFICULTIES = ["Beginner", "Intermediate", "Advanced"]
+QUIZ_DIFFICULTIES = ["Easy", "Medium", "Hard"]
+QUIZ_DIFFICULTY_WEIGHTS = [0.3, 0.5, 0.2]
+QUIZ_DIFFICULTY_SHIFT = [6.0, 0.0, -8.0]
+SESSION_TYPES = ["tutor", "quiz", "research", "recommendations"]
+SESSION_TYPE_WEIGHTS = [0.6, 0.2, 0.1, 0.1]
+NOTIFICATION_TITLES = ["Assignment due soon", "New module available", "Quiz reminder", "Weekly progress report"]
+MODULES_PER_COURSE = 5
+
+
+@dataclass
+class SyntheticData:
+    """Column arrays per table; times are seconds relative to midnight of `now`'s day (all <= now)"""
+    seed: int
+    now: datetime
+    students: Dict[str, np.ndarray]
+    courses: Dict[str, np.ndarray]
+    enrollments: Dict[str, np.ndarray]
+    quiz_attempts: Dict[str, np.ndarray]
+    study_activities: Dict[str, np.ndarray]
+    notifications: Dict[str, np.ndarray]
+    ai_sessions: Dict[str, np.ndarray]
+
+    @property
+    def midnight(self) -> datetime:
+        return datetime.combine(self.now.date(), datetime.min.time())
+
+    def counts(self) -> Dict[str, int]:
+        return {name: len(next(iter(getattr(self, name).values())))
+                for name in ("students", "courses", "enrollments", "quiz_attempts", "study_activities",
+                             "notifications", "ai_sessions")}
+
+
+# ----------------------------
+# Generation
+# ----------------------------
+def _zipf_weights(n: int) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** ZIPF_EXPONENT
+    return weights / weights.sum()
+
+
+def _per_owner(rng: np.random.Generator, rates: np.ndarray) -> np.ndarray:
+    """Owner index of each event, with a Poisson number of events per owner"""
+    return np.repeat(np.arange(len(rates)), rng.poisson(rates))
+
+
+def _sort_by_time(table: Dict[str, np.ndarray], key: str) -> Dict[str, np.ndarray]:
+    order = np.argsort(table[key], kind="stable")
+    return {name: values[order] for name, values in table.items()}
+
+
+def generate(students: int = 1000, courses: Optional[int] = None, seed: int = SEED,
+             now: Optional[datetime] = None) -> SyntheticData:
+    """Build a dataset of `students` students (and max(10, students // 100) courses by default, up to 1000)"""
+    rng = np.random.default_rng(seed)
+    now = (now or datetime.now()).replace(microsecond=0)
+    now_offset = (now - datetime.combine(now.date(), datetime.min.time())).total_seconds()
+    n = students
+    c = courses or max(10, min(1000, n // 100))
+
+    # Lognormal multiplier with mean 1: heavy-tailed per-student activity
+    activity = rng.lognormal(-ACTIVITY_SIGMA ** 2 / 2, ACTIVITY_SIGMA, n)
+    ability = np.clip(rng.normal(75, 10, n), 30, 98)
+    # Burst days (days before today) per student, biased towards recent weeks
+    bursts = np.minimum(rng.exponential(HORIZON_DAYS / 4, (n, BURSTS_PER_STUDENT)), HORIZON_DAYS - 1)
+
+    def event_times(owners: np.ndarray) -> np.ndarray:
+        """Seconds relative to today's midnight: near one of the owner's bursts, mostly in the evening"""
+        k = len(owners)
+        days = np.rint(bursts[owners, rng.integers(0, BURSTS_PER_STUDENT, k)] + rng.normal(0, BURST_SPREAD_DAYS, k))
+        days = np.clip(days, 0, HORIZON_DAYS - 1)
+        seconds_of_day = (rng.normal(19, 3, k) % 24) * 3600
+        return np.minimum(seconds_of_day - days * 86400, now_offset).round()
+
+    student_table = {
+        "first_name": rng.integers(0, len(FIRST_NAMES), n),
+        "last_name": rng.integers(0, len(LAST_NAMES), n),
+        "program": rng.integers(0, len(PROGRAMS), n),
+        "year": rng.integers(1, 5, n),
+        "gpa": np.round(np.clip(rng.normal(3.2, 0.4, n), 0, 4), 2),
+        "learning_style": rng.integers(0, len(LEARNING_STYLES), n),
+        "target_career": rng.integers(0, len(CAREERS), n),
+        "interests": rng.integers(0, len(CATEGORIES), (n, 3)),
+        "joined": -rng.integers(HORIZON_DAYS, 3 * 365, n) * 86400.0,
+    }
+
+    course_table = {
+        "subject": np.arange(c) % len(SUBJECTS),
+        "suffix": (np.arange(c) // len(SUBJECTS)) % len(SUFFIXES),
+        "category": rng.integers(0, len(CATEGORIES), c),
+        "difficulty": rng.integers(0, len(DIFFICULTIES), c),
+        "duration_weeks": rng.integers(4, 16, c),
+    }
+
+    # Enrollments: Zipf-popular courses, duplicates per student dropped
+    # (every student has at least one enrollment)
+    owners = np.concatenate([np.arange(n), _per_owner(rng, np.full(n, ENROLLMENTS_PER_STUDENT - 1))])
+    keys = np.unique(owners * c + rng.choice(c, len(owners), p=_zipf_weights(c)))
+    enrollment_student, enrollment_course = keys // c, keys % c
+    e = len(keys)
+    completed = rng.random(e) < COMPLETION_RATE
+    enrolled = (student_table["joined"][enrollment_student] * rng.random(e)).round()
+    enrollment_table = {
+        "student": enrollment_student,
+        "course": enrollment_course,
+        "progress": np.where(completed, 100.0, np.round(rng.beta(1.2, 1.5, e) * 99, 1)),
+        "completed": completed,
+        "enrolled": enrolled,
+        "last_accessed": np.maximum(event_times(enrollment_student), enrolled),
+    }
+
+    # Quiz attempts in enrolled courses, scored around the student's ability
+    attempt_enrollment = _per_owner(rng, QUIZ_ATTEMPTS_PER_ENROLLMENT * activity[enrollment_student])
+    attempt_student = enrollment_student[attempt_enrollment]
+    difficulty = rng.choice(len(QUIZ_DIFFICULTIES), len(attempt_student), p=QUIZ_DIFFICULTY_WEIGHTS)
+    noise = rng.normal(0, 8, len(attempt_student))
+    quiz_table = _sort_by_time({
+        "student": attempt_student,
+        "course": enrollment_course[attempt_enrollment],
+        "enrollment": attempt_enrollment,
+        "difficulty": difficulty,
+        "score": np.round(np.clip(ability[attempt_student] + np.take(QUIZ_DIFFICULTY_SHIFT, difficulty) + noise,
+                                  0, 100), 1),
+        "taken": event_times(attempt_student),
+    }, "taken")
+
+    # Study sessions, mostly on one of the student's enrolled courses
+    activity_student = _per_owner(rng, STUDY_SESSIONS_PER_STUDENT * activity)
+    first_enrollment = np.searchsorted(enrollment_student, activity_student)
+    enrollment_count = np.bincount(enrollment_student, minlength=n)[activity_student]
+    picked = first_enrollment + (rng.random(len(activity_student)) * enrollment_count).astype(np.int64)
+    activity_course = np.where(rng.random(len(activity_student)) < 0.9,
+                               enrollment_course[np.minimum(picked, e - 1)] + 1, 0)
+    activity_table = _sort_by_time({
+        "student": activity_student,
+        "course": activity_course,  # course index + 1, 0 = no course
+        "minutes": np.clip(rng.lognormal(np.log(45), 0.6, len(activity_student)), 5, 240).astype(np.int64),
+        "studied": event_times(activity_student),
+    }, "studied")
+
+    notification_student = _per_owner(rng, np.full(n, NOTIFICATIONS_PER_STUDENT))
+    k = len(notification_student)
+    notification_table = _sort_by_time({
+        "student": notification_student,
+        "title": rng.integers(0, len(NOTIFICATION_TITLES), k),
+        "created": event_times(notification_student),
+        "due_in_days": np.where(rng.random(k) < 0.7, rng.integers(1, 30, k), -1),  # -1 = no due date
+        "is_read": rng.random(k) < 0.6,
+    }, "created")
+
+    session_student = _per_owner(rng, AI_SESSIONS_PER_STUDENT * activity)
+    k = len(session_student)
+    first_enrollment = np.searchsorted(enrollment_student, session_student)
+    session_table = _sort_by_time({
+        "student": session_student,
+        "course": np.where(rng.random(k) < 0.8, enrollment_course[np.minimum(first_enrollment, e - 1)] + 1, 0),
+        "type": rng.choice(len(SESSION_TYPES), k, p=SESSION_TYPE_WEIGHTS),
+        "messages": rng.integers(1, 6, k) * 2,
+        "created": event_times(session_student),
+    }, "created")
+
+    return SyntheticData(seed, now, student_table, course_table, enrollment_table, quiz_table, activity_table,
+                         notification_table, session_table)
+
+
+# ----------------------------
+# In-memory store (app.db)
+# ----------------------------
+def _course_title(subject: int, suffix: int) -> str:
+    return f"{SUBJECTS[subject]} {SUFFIXES[suffix]}"
+
+
+def _times(data: SyntheticData, seconds: np.ndarray) -> List[datetime]:
+    midnight = data.midnight
+    return [midnight + timedelta(seconds=s) for s in seconds.tolist()]
+
+
+def populate_memory(data: SyntheticData):
+    """Replace the contents of app.db with the dataset (study activities and quiz results use the active engine)"""
+    # Millions of new row dicts would otherwise trigger repeated, useless GC passes
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        _populate_memory(data)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _populate_memory(data: SyntheticData):
+    db.reset_database()
+    db.columnar_tables.clear()
+    if db.STORAGE_ENGINE == "columnar":
+        db.enable_columnar_storage()
+
+    s = data.students
+    today = data.now.date()
+    for first, last, program, style, career, interests, joined in zip(
+            s["first_name"].tolist(), s["last_name"].tolist(), s["program"].tolist(), s["learning_style"].tolist(),
+            s["target_career"].tolist(), s["interests"].tolist(), (s["joined"] // 86400).astype(int).tolist()):
+        student_id = db.get_next_id('students')
+        db.students[student_id] = {
+            'id': student_id,
+            'name': f"{FIRST_NAMES[first]} {LAST_NAMES[last]}",
+            'email': f"student{student_id}@synthetic.edu",
+            'program': PROGRAMS[program],
+            'interests': list(dict.fromkeys(CATEGORIES[i] for i in interests)),
+            'learning_style': LEARNING_STYLES[style],
+            'target_career': CAREERS[career],
+            'join_date': today + timedelta(days=joined)
+        }
+
+    c = data.courses
+    for subject, suffix, category, difficulty, weeks in zip(
+            c["subject"].tolist(), c["suffix"].tolist(), c["category"].tolist(), c["difficulty"].tolist(),
+            c["duration_weeks"].tolist()):
+        course_id = db.get_next_id('courses')
+        db.courses[course_id] = {
+            'id': course_id,
+            'title': _course_title(subject, suffix),
+            'category': CATEGORIES[category],
+            'difficulty': DIFFICULTIES[difficulty],
+            'duration_hours': float(weeks * 5),
+            'tags': [SUBJECTS[subject], CATEGORIES[category]],
+            'description': f"{SUBJECTS[subject]} for {DIFFICULTIES[difficulty].lower()} learners",
+            'is_active': True
+        }
+
+    q = data.quiz_attempts
+    e = data.enrollments
+    score_sum = np.bincount(q["enrollment"], q["score"], minlength=len(e["student"]))
+    score_count = np.bincount(q["enrollment"], minlength=len(e["student"]))
+    db.bulk_insert('enrollments', [{
+        'student_id': student + 1,
+        'course_id': course + 1,
+        'progress_percent': progress,
+        'completion_status': 'Completed' if completed else 'In progress',
+        'last_accessed': accessed,
+        'average_quiz_score': round(total / count, 1) if count else None
+    } for student, course, progress, completed, accessed, total, count in zip(
+        e["student"].tolist(), e["course"].tolist(), e["progress"].tolist(), e["completed"].tolist(),
+        _times(data, e["last_accessed"]), score_sum.tolist(), score_count.tolist())])
+
+    db.bulk_insert('quiz_results', [{
+        'student_id': student + 1,
+        'course_id': course + 1,
+        'score_percent': score,
+        'date': taken,
+        'difficulty_level': QUIZ_DIFFICULTIES[difficulty]
+    } for student, course, difficulty, score, taken in zip(
+        q["student"].tolist(), q["course"].tolist(), q["difficulty"].tolist(), q["score"].tolist(),
+        _times(data, q["taken"]))])
+
+    a = data.study_activities
+    db.bulk_insert('study_activities', [{
+        'student_id': student + 1,
+        'date': studied.date(),
+        'minutes_studied': minutes,
+        'course_id': course or None
+    } for student, course, minutes, studied in zip(
+        a["student"].tolist(), a["course"].tolist(), a["minutes"].tolist(), _times(data, a["studied"]))])
+
+    notes = data.notifications
+    db.bulk_insert('notifications', [{
+        'student_id': student + 1,
+        'title': NOTIFICATION_TITLES[title],
+        'message': f"{NOTIFICATION_TITLES[title]}.",
+        'due_date': created.date() + timedelta(days=due_in_days) if due_in_days >= 0 else None,
+        'created_at': created,
+        'is_read': is_read
+    } for student, title, created, due_in_days, is_read in zip(
+        notes["student"].tolist(), notes["title"].tolist(), _times(data, notes["created"]),
+        notes["due_in_days"].tolist(), notes["is_read"].tolist())])
+
+    db.seed_career_paths()
+
+
+# ----------------------------
+# SQLite database (models_sqlite)
+# ----------------------------
+def sqlite_tables(data: SyntheticData) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+    """(table name, records) in load order, for app.bulk_load; ids are assigned explicitly"""
+    midnight = data.midnight
+
+    def at(seconds: float) -> datetime:
+        return midnight + timedelta(seconds=seconds)
+
+    def users():
+        s = data.students
+        for i, (first, last, program, year, gpa, joined) in enumerate(zip(
+                s["first_name"].tolist(), s["last_name"].tolist(), s["program"].tolist(), s["year"].tolist(),
+                s["gpa"].tolist(), s["joined"].tolist()), 1):
+            yield {"id": i, "email": f"student{i}@synthetic.edu", "full_name": f"{FIRST_NAMES[first]} {LAST_NAMES[last]}",
+                   "password_hash": PASSWORD_HASH, "program": PROGRAMS[program], "year": year, "gpa": gpa,
+                   "created_at": at(joined)}
+
+    def courses():
+        c = data.courses
+        for i, (subject, suffix, category, difficulty, weeks) in enumerate(zip(
+                c["subject"].tolist(), c["suffix"].tolist(), c["category"].tolist(), c["difficulty"].tolist(),
+                c["duration_weeks"].tolist()), 1):
+            yield {"id": i, "title": _course_title(subject, suffix),
+                   "description": f"{SUBJECTS[subject]} for {DIFFICULTIES[difficulty].lower()} learners",
+                   "category": CATEGORIES[category], "difficulty_level": DIFFICULTIES[difficulty].lower(),
+                   "duration_weeks": weeks, "instructor": f"Instructor {i}", "is_active": True,
+                   "created_at": at(-3 * 365 * 86400)}
+
+    def course_modules():
+        for course in range(1, len(data.courses["subject"]) + 1):
+            for order in range(1, MODULES_PER_COURSE + 1):
+                yield {"course_id": course, "title": f"Module {order}", "description": f"Module {order} overview",
+                       "duration_minutes": 45, "order_index": order, "content": f"Content of module {order}"}
+
+    def enrollments():
+        e = data.enrollments
+        for student, course, progress, completed, enrolled, accessed in zip(
+                e["student"].tolist(), e["course"].tolist(), e["progress"].tolist(), e["completed"].tolist(),
+                e["enrolled"].tolist(), e["last_accessed"].tolist()):
+            yield {"user_id": student + 1, "course_id": course + 1, "progress": progress,
+                   "status": "completed" if completed else "active", "enrolled_at": at(enrolled),
+                   "last_accessed": at(accessed), "completion_date": at(accessed) if completed else None}
+
+    # One stored quiz per course and difficulty; quiz id = course index * 3 + difficulty + 1
+    def quizzes():
+        for course in range(len(data.courses["subject"])):
+            for difficulty, name in enumerate(QUIZ_DIFFICULTIES):
+                yield {"id": course * len(QUIZ_DIFFICULTIES) + difficulty + 1, "course_id": course + 1,
+                       "title": f"Course {course + 1} - {name} Quiz", "description": "Synthetic quiz",
+                       "questions": [{"question": f"Question {i + 1}", "options": ["A", "B", "C", "D"],
+                                      "correctAnswer": 0, "explanation": ""} for i in range(5)],
+                       "difficulty": name.lower()}
+
+    def quiz_attempts():
+        q = data.quiz_attempts
+        answers = [0, 1, 2, 3, 0]
+        for student, course, difficulty, score, taken in zip(
+                q["student"].tolist(), q["course"].tolist(), q["difficulty"].tolist(), q["score"].tolist(),
+                q["taken"].tolist()):
+            yield {"user_id": student + 1, "quiz_id": course * len(QUIZ_DIFFICULTIES) + difficulty + 1,
+                   "score": score, "answers": answers, "completed_at": at(taken)}
+
+    def ai_tutor_sessions():
+        s = data.ai_sessions
+        # The SQLite app keeps one conversation per user and course: keep the first
+        seen = set()
+        for student, course, session_type, messages, created in zip(
+                s["student"].tolist(), s["course"].tolist(), s["type"].tolist(), s["messages"].tolist(),
+                s["created"].tolist()):
+            if course:
+                if (student, course) in seen:
+                    continue
+                seen.add((student, course))
+            conversation = [{"role": "user" if i % 2 == 0 else "assistant",
+                             "content": f"{SESSION_TYPES[session_type]} message {i + 1}"} for i in range(messages)]
+            yield {"user_id": student + 1, "course_id": course or None, "conversation": conversation,
+                   "created_at": at(created), "updated_at": at(created + 60 * messages)}
+
+    yield "users", users()
+    yield "courses", courses()
+    yield "course_modules", course_modules()
+    yield "enrollments", enrollments()
+    yield "quizzes", quizzes()
+    yield "quiz_attempts", quiz_attempts()
+    yield "ai_tutor_sessions", ai_tutor_sessions()
+
+
+def populate_sqlite(data: SyntheticData, url: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Replace the synthetic tables' rows in the SQLite database; returns bulk_load's per-table results"""
+    return bulk_load.load_records(sqlite_tables(data), url or bulk_load.DEFAULT_DB_URL, truncate=True)
+
+
+def write_ndjson(data: SyntheticData, out_dir: str) -> Dict[str, str]:
+    """Write <table>.ndjson files for `python -m app.bulk_load`; returns table -> path"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    for table, records in sqlite_tables(data):
+        paths[table] = os.path.join(out_dir, f"{table}.ndjson")
+        with open(paths[table], "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(record, default=datetime.isoformat) + "\n" for record in records)
+    return paths
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("target", choices=["sqlite", "ndjson", "snapshot"])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--courses", type=int, help="default: students // 100, between 10 and 1000")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--now", type=datetime.fromisoformat,
+                        help="reference time, ISO-8601 (default: now; fix it for byte-identical output)")
+    parser.add_argument("--db", help="SQLite file for the sqlite target (default: the app's learning_platform.db)")
+    parser.add_argument("--out", help="directory for ndjson, file for snapshot")
+    args = parser.parse_args(argv)
+    if args.target != "sqlite" and not args.out:
+        parser.error(f"--out is required for {args.target}")
+
+    started = time.perf_counter()
+    data = generate(args.students, args.courses, args.seed, args.now)
+    print(f"Generated in {time.perf_counter() - started:.2f} s: "
+          + ", ".join(f"{count:,} {name}" for name, count in data.counts().items()))
+
+    started = time.perf_counter()
+    if args.target == "sqlite":
+        results = populate_sqlite(data, f"sqlite:///{args.db}" if args.db else None)
+        for result in results:
+            print(f"  {result['table']:<20} {result['rows']:>10,} rows  {result['rows_per_second']:>10,} rows/s")
+    elif args.target == "ndjson":
+        for path in write_ndjson(data, args.out).values():
+            print(f"  {path}")
+    else:
+        populate_memory(data)
+        print(f"  {db.count_rows('study_activities'):,} study activities in the in-memory store")
+        snapshot.save(args.out)
+        print(f"  {args.out}")
+    print(f"Wrote {args.target} in {time.perf_counter() - started:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
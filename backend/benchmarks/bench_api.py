@@ -0,0 +1,361 @@
+"""
+Benchmark: request throughput and latency of both FastAPI apps.
+
+Drives app.main:app (in-memory store) and app.main_sqlite:app (SQLite)
+in-process through their ASGI interface, with the lifespan running, against
+app.synthetic data at one or more scales. LLM calls go to a FakeProvider with a
+fixed latency. N concurrent clients send a weighted mix of requests for random
+students; per route it reports throughput and p50/p95/p99 latency as JSON, so
+two runs can be diffed with --compare.
+
+Routes in the mix (a route an app doesn't have is skipped for that app):
+    dashboard     GET  /dashboard/{id}                 GET /api/dashboard/{id}/stats
+    enrollments   GET  /students/{id}/enrollments      GET /api/enrollments/user/{id}
+    roadmap       GET  /careers/student/{id}/roadmap
+    activity                                           GET /api/dashboard/{id}/study-activity
+    tutor         POST /ai/tutor                       POST /api/ai/tutor
+    login                                              POST /api/users/login
+    quiz_attempt                                       POST /api/ai/quiz-attempt
+
+The SQLite app runs on a learning_platform.db inside --workdir (a temporary
+directory by default), with the engine profile picked by --db-profile (see
+app.database; default: DATABASE_PROFILE, else prod); the quiz bank warm-up is
+disabled and SQL echo turned off so neither skews the numbers. Its runs also
+carry app.sql_profiler's statements per request, DB time and N+1 flags for
+each route.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_api
+    python -m benchmarks.bench_api --apps sqlite --students 1000 10000 --concurrency 1 16 64 \\
+        --requests 2000 --mix dashboard=5,login=1,quiz_attempt=2 --output after.json
+    python -m benchmarks.bench_api --apps sqlite --db-profile bench --output bench.json
+    python -m benchmarks.bench_api --compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+# Read by app modules at import time. App modules are imported only after
+# main() has changed into the work directory, because SQLAlchemy fixes the
+# absolute path of ./learning_platform.db when app.database is imported.
+os.environ.setdefault("QUIZ_BANK_WARMUP_INTERVAL", "0")
+os.environ.pop("LEARNING_DB_SNAPSHOT", None)
+
+SEED = 42
+DEFAULT_MIX = "dashboard=30,enrollments=20,roadmap=10,activity=10,tutor=10,login=10,quiz_attempt=10"
+
+QUESTIONS = [
+    "Can you explain gradient descent?", "What is a SQL join?", "How does backpropagation work?",
+    "What is overfitting?", "Explain recursion with an example", "What are React hooks?",
+]
+
+
+@dataclass
+class Workload:
+    """What the route builders need to know about the loaded synthetic data"""
+    students: int
+    courses: int
+    quizzes: int
+    password: str
+
+
+# (method, path, query, JSON body)
+Request = Tuple[str, str, str, Optional[Dict[str, Any]]]
+RouteBuilder = Callable[[random.Random, Workload], Request]
+
+
+def _student(rng: random.Random, workload: Workload) -> int:
+    return rng.randint(1, workload.students)
+
+
+def _course(rng: random.Random, workload: Workload) -> int:
+    return rng.randint(1, workload.courses)
+
+
+ROUTES: Dict[str, Dict[str, RouteBuilder]] = {
+    "memory": {
+        "dashboard": lambda rng, w: ("GET", f"/dashboard/{_student(rng, w)}", "", None),
+        "enrollments": lambda rng, w: ("GET", f"/students/{_student(rng, w)}/enrollments", "", None),
+        "roadmap": lambda rng, w: ("GET", f"/careers/student/{_student(rng, w)}/roadmap", "", None),
+        "tutor": lambda rng, w: ("POST", "/ai/tutor", "", {
+            "student_id": _student(rng, w), "message": rng.choice(QUESTIONS), "course_id": _course(rng, w)}),
+    },
+    "sqlite": {
+        "dashboard": lambda rng, w: ("GET", f"/api/dashboard/{_student(rng, w)}/stats", "", None),
+        "enrollments": lambda rng, w: ("GET", f"/api/enrollments/user/{_student(rng, w)}", "", None),
+        "activity": lambda rng, w: ("GET", f"/api/dashboard/{_student(rng, w)}/study-activity", "", None),
+        "tutor": lambda rng, w: ("POST", "/api/ai/tutor", f"user_id={_student(rng, w)}", {
+            "question": rng.choice(QUESTIONS), "course_id": _course(rng, w)}),
+        "login": lambda rng, w: ("POST", "/api/users/login", "", {
+            "email": f"student{_student(rng, w)}@synthetic.edu", "password": w.password}),
+        "quiz_attempt": lambda rng, w: ("POST", "/api/ai/quiz-attempt", f"user_id={_student(rng, w)}", {
+            "quiz_id": rng.randint(1, w.quizzes),
+            "answers": [{"selectedAnswer": rng.randint(0, 3)} for _ in range(5)]}),
+    },
+}
+
+
+# ----------------------------
+# ASGI client
+# ----------------------------
+async def call(app, method: str, path: str, query: str = "", body: Optional[Dict[str, Any]] = None) -> Tuple[int, int]:
+    """Send one HTTP request straight to an ASGI app; returns (status, response body bytes)"""
+    payload = json.dumps(body).encode() if body is not None else b""
+    headers = [(b"host", b"bench")]
+    if body is not None:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": headers, "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    request_sent = False
+    response_complete = asyncio.Event()
+    status = 0
+    size = 0
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+    return status, size
+
+
+# ----------------------------
+# Apps under test
+# ----------------------------
+@asynccontextmanager
+async def memory_app(data) -> AsyncIterator[Any]:
+    from app import db, synthetic
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        synthetic.populate_memory(data)
+        yield app
+    db.reset_database()
+
+
+@asynccontextmanager
+async def sqlite_app(data) -> AsyncIterator[Any]:
+    from app import synthetic
+    from app.database import engine, read_engine
+    from app.main_sqlite import app
+
+    engine.sync_engine.echo = read_engine.sync_engine.echo = False
+    synthetic.populate_sqlite(data, "sqlite:///learning_platform.db")
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+APPS = {"memory": memory_app, "sqlite": sqlite_app}
+
+
+# ----------------------------
+# Load generation
+# ----------------------------
+def _percentile(values: List[float], p: float) -> float:
+    return values[min(len(values) - 1, int(p * len(values)))] if values else 0.0
+
+
+def summarize(latencies: List[float], errors: int, seconds: float, sizes: int) -> Dict[str, Any]:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / seconds, 1) if seconds else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1e3, 3) if values else 0.0,
+        "p50_ms": round(_percentile(values, 0.50) * 1e3, 3),
+        "p95_ms": round(_percentile(values, 0.95) * 1e3, 3),
+        "p99_ms": round(_percentile(values, 0.99) * 1e3, 3),
+        "max_ms": round(values[-1] * 1e3, 3) if values else 0.0,
+        "mean_response_bytes": round(sizes / len(values)) if values else 0,
+    }
+
+
+async def run_load(app, routes: Dict[str, RouteBuilder], weights: Dict[str, float], workload: Workload,
+                   requests: int, concurrency: int, seed: int) -> Dict[str, Any]:
+    """Send `requests` requests from `concurrency` concurrent clients; returns per-route and overall stats"""
+    names = [name for name in weights if name in routes]
+    rng = random.Random(seed)
+    plan = [(name, routes[name](rng, workload)) for name in rng.choices(names, [weights[n] for n in names], k=requests)]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors = dict.fromkeys(names, 0)
+    sizes = dict.fromkeys(names, 0)
+    status_codes: Dict[str, int] = {}
+    position = 0
+
+    async def client():
+        nonlocal position
+        while position < len(plan):
+            name, (method, path, query, body) = plan[position]
+            position += 1
+            started = time.perf_counter()
+            try:
+                status, size = await call(app, method, path, query, body)
+            except Exception as e:
+                status, size = type(e).__name__, 0
+            latencies[name].append(time.perf_counter() - started)
+            sizes[name] += size
+            status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+            if not isinstance(status, int) or status >= 400:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+    return {
+        "seconds": round(seconds, 3),
+        "overall": summarize([v for values in latencies.values() for v in values], sum(errors.values()), seconds,
+                             sum(sizes.values())),
+        "status_codes": status_codes,
+        "routes": {name: summarize(latencies[name], errors[name], seconds, sizes[name])
+                   for name in names if latencies[name]},
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    from app import sql_profiler, synthetic
+    from app.llm_client import FakeProvider, configure_llm_client
+
+    weights = parse_mix(args.mix)
+    results = []
+    for students in args.students:
+        data = synthetic.generate(students, seed=args.seed)
+        courses = len(data.courses["subject"])
+        workload = Workload(students, courses, courses * len(synthetic.QUIZ_DIFFICULTIES), synthetic.PASSWORD)
+        for app_name in args.apps:
+            async with APPS[app_name](data) as app:
+                # The fake provider replaces the real one for the whole run
+                configure_llm_client(FakeProvider(latency=args.llm_latency), max_concurrency=args.llm_concurrency)
+                for concurrency in args.concurrency:
+                    await run_load(app, ROUTES[app_name], weights, workload, args.warmup, concurrency,
+                                   args.seed + 1)
+                    sql_profiler.reset()
+                    result = await run_load(app, ROUTES[app_name], weights, workload, args.requests, concurrency,
+                                            args.seed)
+                    if app_name == "sqlite":
+                        # Statements per request and N+1 flags by route
+                        result["sql"] = sql_profiler.stats()
+                    results.append({"app": app_name, "students": students, "concurrency": concurrency, **result})
+                    print(f"{app_name:<7} {students:>8,} students  c={concurrency:<4} "
+                          f"{result['overall']['throughput_rps']:>9,.1f} req/s  "
+                          f"p50 {result['overall']['p50_ms']:>8.2f} ms  p99 {result['overall']['p99_ms']:>9.2f} ms  "
+                          f"errors {result['overall']['errors']}", file=sys.stderr)
+    return {
+        "meta": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "mix": weights,
+            "llm_latency_seconds": args.llm_latency,
+            "requests": args.requests,
+            "db_profile": os.environ.get("DATABASE_PROFILE", "prod"),
+        },
+        "runs": results,
+    }
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    unknown = set(weights) - {name for routes in ROUTES.values() for name in routes}
+    if unknown:
+        raise SystemExit(f"unknown route(s) in --mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+# ----------------------------
+# Comparing runs
+# ----------------------------
+def compare(before_path: str, after_path: str):
+    """Print throughput and p95/p99 changes for every (app, scale, concurrency, route) in both files"""
+    with open(before_path) as f:
+        before = {(r["app"], r["students"], r["concurrency"]): r for r in json.load(f)["runs"]}
+    with open(after_path) as f:
+        after = {(r["app"], r["students"], r["concurrency"]): r for r in json.load(f)["runs"]}
+
+    def change(old: float, new: float) -> str:
+        return f"{(new - old) / old:+.0%}" if old else "n/a"
+
+    print(f"{'app':<7} {'students':>9} {'c':>4} {'route':<13} {'req/s':>19} {'p95 ms':>23} {'p99 ms':>23}")
+    for key in sorted(before.keys() & after.keys()):
+        old_run, new_run = before[key], after[key]
+        rows = [("overall", old_run["overall"], new_run["overall"])]
+        rows += [(name, old_run["routes"][name], new_run["routes"][name])
+                 for name in sorted(old_run["routes"].keys() & new_run["routes"].keys())]
+        for name, old, new in rows:
+            print(f"{key[0]:<7} {key[1]:>9,} {key[2]:>4} {name:<13} "
+                  f"{old['throughput_rps']:>8.1f} {change(old['throughput_rps'], new['throughput_rps']):>6} "
+                  f"{new['throughput_rps']:>8.1f}  "
+                  f"{old['p95_ms']:>8.2f} {change(old['p95_ms'], new['p95_ms']):>5} {new['p95_ms']:>8.2f}  "
+                  f"{old['p99_ms']:>8.2f} {change(old['p99_ms'], new['p99_ms']):>5} {new['p99_ms']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", nargs="+", choices=sorted(APPS), default=sorted(APPS))
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 10000], help="synthetic data scales")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per run")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests before each run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"route=weight,... (default {DEFAULT_MIX})")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="fake LLM latency in seconds")
+    parser.add_argument("--llm-concurrency", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--db-profile", choices=["dev", "prod", "bench"],
+                        help="SQLite engine profile (sets DATABASE_PROFILE)")
+    parser.add_argument("--workdir", help="directory for the SQLite database and logs (default: a temp dir)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two JSON reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.db_profile:
+        os.environ["DATABASE_PROFILE"] = args.db_profile
+    output = os.path.abspath(args.output) if args.output else None
+    with tempfile.TemporaryDirectory(prefix="bench_api_") as tmp:
+        # The SQLite app and the session log use paths relative to the working directory
+        os.chdir(args.workdir or tmp)
+        report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: ColumnarTable memory footprint and aggregate latency.
+
+Fills a study-activity ColumnarTable with synthetic rows and times the
+vectorized aggregates the dashboard relies on, plus a grouped aggregate
+over all students.
+
+The table's own bytes/row leave out everything else app.db keeps per row
+(per-student row id and date indexes, running aggregates). The "app.db
+retained" line loads the same rows through db.bulk_insert() with the columnar
+engine on and reports what the whole module holds afterwards (tracemalloc).
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_columnar
+    python -m benchmarks.bench_columnar --rows 1000000 10000000 --students 1200
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+
+from app import db
+from app.columnar import ColumnarTable
+
+
+def build_table(rows: int, students: int, seed: int = 42) -> ColumnarTable:
+    """Create a study-activity table with `rows` random rows over the last year"""
+    rng = np.random.default_rng(seed)
+    today = date.today().toordinal()
+    table = ColumnarTable(db.COLUMNAR_SCHEMAS['study_activities'])
+    chunk = 1_000_000
+    for offset in range(0, rows, chunk):
+        n = min(chunk, rows - offset)
+        table.extend(
+            student_id=rng.integers(1, students + 1, n),
+            course_id=rng.integers(1, 11, n),
+            date=today - rng.integers(0, 365, n),
+            minutes=rng.integers(10, 180, n)
+        )
+    return table
+
+
+def module_bytes(rows: int, students: int, seed: int = 42) -> int:
+    """Bytes app.db retains after bulk-inserting `rows` study activities into columnar storage"""
+    rng = np.random.default_rng(seed)
+    today = date.today().toordinal()
+    db.reset_database()
+    db.columnar_tables.clear()
+    tracemalloc.start()
+    try:
+        db.enable_columnar_storage()
+        chunk = 1_000_000
+        for offset in range(0, rows, chunk):
+            n = min(chunk, rows - offset)
+            db.bulk_insert('study_activities', [{
+                'student_id': student_id,
+                'date': date.fromordinal(ordinal),
+                'minutes_studied': minutes,
+                'course_id': course_id
+            } for student_id, ordinal, minutes, course_id in zip(
+                rng.integers(1, students + 1, n).tolist(), (today - rng.integers(0, 365, n)).tolist(),
+                rng.integers(10, 180, n).tolist(), rng.integers(1, 11, n).tolist())])
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+        db.reset_database()
+        db.columnar_tables.clear()
+
+
+def time_ms(fn, repeat: int = 20) -> float:
+    """Median wall time of fn() in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1e3)
+    return statistics.median(timings)
+
+
+def run(rows: int, students: int, with_module: bool = True):
+    start = time.perf_counter()
+    table = build_table(rows, students)
+    build_s = time.perf_counter() - start
+
+    cutoff = date.today() - timedelta(days=30)
+    student_id = students // 2
+    positions = table.select(student_id=student_id)
+
+    results = {
+        "sum (student, 30d, scan)": time_ms(lambda: table.sum('minutes', student_id=student_id, start=cutoff)),
+        "mean (student, scan)": time_ms(lambda: table.mean('minutes', student_id=student_id)),
+        "count (30d, all students)": time_ms(lambda: table.count(start=cutoff)),
+        "sum (student, 30d, indexed)": time_ms(lambda: table.sum('minutes', start=cutoff, positions=positions)),
+        "sum_by student (30d)": time_ms(lambda: table.sum_by('minutes', start=cutoff), repeat=5),
+    }
+
+    print(f"\n{rows:,} rows | {table.nbytes / 2**20:,.1f} MiB "
+          f"({table.nbytes / rows:.0f} bytes/row) | built in {build_s:.2f}s")
+    for name, ms in results.items():
+        print(f"  {name:<30} {ms:>9.2f} ms")
+    if with_module:
+        retained = module_bytes(rows, students)
+        print(f"  {'app.db retained':<30} {retained / 2**20:>9,.1f} MiB ({retained / rows:.0f} bytes/row)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--students", type=int, default=1200)
+    parser.add_argument("--skip-module", action="store_true",
+                        help="skip measuring app.db's retained memory (slow at 10M rows)")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        run(rows, args.students, with_module=not args.skip_module)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark: GET /api/dashboard/{user_id}/stats, ORM hydration vs. SQL aggregates.
+
+Builds a SQLite database per scale with one heavy user holding N quiz
+attempts (plus other users' rows around it) and times the dashboard stats for
+that user two ways:
+- orm: the previous handler, loading every Enrollment and QuizAttempt object
+  and counting, summing and averaging in Python
+- sql: dashboard_sqlite.get_dashboard_stats, one aggregate statement
+
+Both must return identical stats, for the heavy user and for a sample of
+users with assorted streaks.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_dashboard_stats
+    python -m benchmarks.bench_dashboard_stats --attempts 10 1000 100000 --repeat 20 --path /tmp/stats.db
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import bulk_load, schemas
+from app import models_sqlite as models
+from app.routers.dashboard_sqlite import get_dashboard_stats
+
+HEAVY_USER = 1
+OTHER_USERS = 200
+
+
+async def orm_dashboard_stats(user_id: int, db: AsyncSession) -> schemas.DashboardStats:
+    """The handler before the aggregate push-down"""
+    result = await db.execute(select(models.Enrollment).where(models.Enrollment.user_id == user_id))
+    enrollments = result.scalars().all()
+    total_enrolled = len(enrollments)
+    total_completed = sum(1 for e in enrollments if e.status == "completed")
+
+    result = await db.execute(select(models.QuizAttempt).where(models.QuizAttempt.user_id == user_id))
+    quiz_attempts = result.scalars().all()
+    avg_quiz_score = sum(a.score for a in quiz_attempts) / len(quiz_attempts) if quiz_attempts else 0.0
+
+    result = await db.execute(
+        select(func.count(models.AITutorSession.id)).where(models.AITutorSession.user_id == user_id)
+    )
+    ai_interactions = result.scalar() or 0
+
+    recent_activity = sorted((e.last_accessed for e in enrollments if e.last_accessed), reverse=True)
+    current_streak = 0
+    current_date = datetime.utcnow().date()
+    for i, activity_date in enumerate(recent_activity):
+        if activity_date.date() == current_date - timedelta(days=i):
+            current_streak += 1
+        else:
+            break
+
+    return schemas.DashboardStats(
+        total_courses_enrolled=total_enrolled,
+        total_courses_completed=total_completed,
+        total_time_spent_hours=round(sum(e.progress / 100 * 40 for e in enrollments), 1),
+        current_streak_days=current_streak,
+        avg_quiz_score=round(avg_quiz_score, 1),
+        total_ai_tutor_interactions=ai_interactions
+    )
+
+
+def build(path: str, attempts: int, enrollments: int, seed: int = 42):
+    """Fresh database: the heavy user plus OTHER_USERS light users with a few rows each"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    users = OTHER_USERS + 1
+
+    def enrollment_rows():
+        for user_id in range(1, users + 1):
+            count = enrollments if user_id == HEAVY_USER else rng.randint(0, 6)
+            # Streaks of 0-5 days, then older accesses (some on the same day)
+            streak = rng.randint(0, min(5, count))
+            for i, course_id in enumerate(rng.sample(range(1, max(50, enrollments) + 1), count)):
+                days_ago = i if i < streak else rng.randint(streak, 60)
+                yield {"user_id": user_id, "course_id": course_id, "progress": rng.uniform(0, 100),
+                       "status": "completed" if rng.random() < 0.2 else "active",
+                       "last_accessed": (now - timedelta(days=days_ago, minutes=rng.randint(0, 600))).isoformat()}
+
+    def attempt_rows():
+        for user_id in range(1, users + 1):
+            for _ in range(attempts if user_id == HEAVY_USER else rng.randint(0, 20)):
+                yield {"user_id": user_id, "quiz_id": rng.randint(1, 150), "score": rng.uniform(0, 100),
+                       "answers": "[]"}
+
+    def session_rows():
+        for user_id in range(1, users + 1):
+            for course_id in range(1, rng.randint(1, 4)):
+                yield {"user_id": user_id, "course_id": course_id, "conversation": "[]"}
+
+    if os.path.exists(path):
+        os.remove(path)
+    bulk_load.load_records([("enrollments", enrollment_rows()), ("quiz_attempts", attempt_rows()),
+                            ("ai_tutor_sessions", session_rows())], url=f"sqlite:///{path}")
+
+
+async def time_call(Session, handler, user_id: int, repeat: int) -> float:
+    """Median seconds per call, each in a fresh session like a request"""
+    timings = []
+    for _ in range(repeat):
+        async with Session() as db:
+            started = time.perf_counter()
+            await handler(user_id, db=db)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+async def run(path: str, attempts: int, enrollments: int, repeat: int):
+    build(path, attempts, enrollments)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        async with Session() as db:
+            for user_id in range(1, OTHER_USERS + 2):
+                orm, sql = await orm_dashboard_stats(user_id, db), await get_dashboard_stats(user_id, db=db)
+                assert orm == sql, (user_id, orm, sql)
+        orm_seconds = await time_call(Session, orm_dashboard_stats, HEAVY_USER, repeat)
+        sql_seconds = await time_call(Session, get_dashboard_stats, HEAVY_USER, repeat)
+    finally:
+        await engine.dispose()
+    print(f"{attempts:>9,} attempts | orm {orm_seconds * 1e3:>9.2f} ms | sql {sql_seconds * 1e3:>7.2f} ms | "
+          f"{orm_seconds / sql_seconds:>6.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, nargs="+", default=[10, 1_000, 100_000],
+                        help="quiz attempts of the heavy user")
+    parser.add_argument("--enrollments", type=int, default=25, help="enrollments of the heavy user")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--path", default="bench_dashboard_stats.db")
+    args = parser.parse_args()
+
+    try:
+        for attempts in args.attempts:
+            asyncio.run(run(args.path, attempts, args.enrollments, args.repeat))
+    finally:
+        if os.path.exists(args.path):
+            os.remove(args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: per-student lookups in the in-memory store, full scan vs. index.
+
+Fills app.db with synthetic quiz results and compares the old full-table
+scan against the per-student secondary index used by
+db.get_student_quiz_results(). Also compares a 7-day study activity window
+computed by scanning against the date-ordered range index behind
+db.get_study_activities_range().
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_db_indexes
+    python -m benchmarks.bench_db_indexes --rows 10000 1000000 --students 1200
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from app import db
+
+
+def populate(rows: int, students: int, seed: int = 42):
+    """Reset the store and insert `rows` quiz results spread over `students`"""
+    rng = random.Random(seed)
+    db.reset_database()
+    now = datetime.now()
+    for _ in range(rows):
+        db.add_quiz_result(
+            student_id=rng.randint(1, students),
+            course_id=rng.randint(1, 10),
+            score_percent=rng.uniform(40, 100),
+            taken_at=now - timedelta(days=rng.randint(0, 365)),
+            difficulty_level='Medium'
+        )
+
+
+def populate_activities(rows: int, students: int, seed: int = 42):
+    """Reset the store and insert `rows` study activities over the last year"""
+    rng = random.Random(seed)
+    db.reset_database()
+    today = date.today()
+    for _ in range(rows):
+        db.add_study_activity(
+            student_id=rng.randint(1, students),
+            study_date=today - timedelta(days=rng.randint(0, 365)),
+            minutes_studied=rng.randint(10, 180)
+        )
+
+
+def scan_window(student_id: int, days: int = 7):
+    """The pre-index implementation: scan every activity and compare dates"""
+    cutoff_date = date.today() - timedelta(days=days)
+    return [
+        a for a in db.study_activities.values()
+        if a['student_id'] == student_id and a['date'] >= cutoff_date
+    ]
+
+
+def range_window(student_id: int, days: int = 7):
+    return db.get_study_activities_range(student_id, start=date.today() - timedelta(days=days))
+
+
+def scan_lookup(student_id: int):
+    """The pre-index implementation: scan every row"""
+    return [q for q in db.quiz_results.values() if q['student_id'] == student_id]
+
+
+def time_lookups(fn, student_ids):
+    """Return per-call timings in microseconds"""
+    timings = []
+    for student_id in student_ids:
+        start = time.perf_counter()
+        fn(student_id)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def report(label: str, rows: int, scan, indexed):
+    scan_median = statistics.median(scan)
+    index_median = statistics.median(indexed)
+    print(f"{label:<14} {rows:>10,} rows | scan {scan_median:>12,.1f} us | "
+          f"index {index_median:>8,.1f} us | speedup {scan_median / index_median:>9,.0f}x")
+
+
+def run(rows: int, students: int, lookups: int):
+    populate(rows, students)
+    rng = random.Random(7)
+    student_ids = [rng.randint(1, students) for _ in range(lookups)]
+
+    # Sanity check: both paths return the same rows
+    for student_id in student_ids[:10]:
+        assert scan_lookup(student_id) == db.get_student_quiz_results(student_id)
+
+    # Full scans are slow at large sizes; a handful of calls is enough
+    scan = time_lookups(scan_lookup, student_ids[:max(5, lookups // 50)])
+    indexed = time_lookups(db.get_student_quiz_results, student_ids)
+
+    report("quiz results", rows, scan, indexed)
+
+    populate_activities(rows, students)
+    for student_id in student_ids[:10]:
+        assert sorted(a['id'] for a in scan_window(student_id)) == sorted(a['id'] for a in range_window(student_id))
+    scan = time_lookups(scan_window, student_ids[:max(5, lookups // 50)])
+    indexed = time_lookups(range_window, student_ids)
+    report("7-day window", rows, scan, indexed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--students", type=int, default=1200)
+    parser.add_argument("--lookups", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"Per-student lookups ({args.students} students, median per call)")
+    for rows in args.rows:
+        run(rows, args.students, args.lookups)
+    db.reset_database()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: SQLite write throughput and read latency per engine profile.
+
+For each profile of app.database (plus "baseline": the engine before profiles,
+i.e. rollback journal and SQLite's default pragmas) it rebuilds the
+bench_dashboard_stats database and measures:
+- writes: N concurrent writers, each committing single-row quiz attempt
+  inserts in their own transaction (commits per second)
+- reads: concurrent readers calling dashboard_sqlite.get_dashboard_stats, a
+  fresh session per call, while one writer keeps committing (p50/p95/p99)
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_db_profiles
+    python -m benchmarks.bench_db_profiles --profiles baseline prod bench --writers 1 8 --readers 8 \\
+        --commits 2000 --reads 2000 --path /tmp/profiles.db
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from typing import Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models_sqlite as models
+from app.database import PROFILES, DatabaseSettings, create_database_engine
+from app.routers.dashboard_sqlite import get_dashboard_stats
+from benchmarks.bench_dashboard_stats import HEAVY_USER, OTHER_USERS, build
+
+BASELINE = "baseline"
+
+
+def engine_for(profile: str, path: str) -> AsyncEngine:
+    url = f"sqlite+aiosqlite:///{path}"
+    if profile == BASELINE:
+        return create_async_engine(url, future=True)
+    return create_database_engine(DatabaseSettings(url=url, profile=profile, echo=False))
+
+
+def remove_database(path: str):
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+async def insert_attempt(Session, rng: random.Random):
+    async with Session() as db:
+        db.add(models.QuizAttempt(user_id=rng.randint(1, OTHER_USERS + 1), quiz_id=rng.randint(1, 150),
+                                  score=rng.uniform(0, 100), answers=[]))
+        await db.commit()
+
+
+async def measure_writes(Session, writers: int, commits: int) -> float:
+    """Commits per second with `writers` concurrent writers"""
+    async def writer(seed: int):
+        rng = random.Random(seed)
+        for _ in range(commits // writers):
+            await insert_attempt(Session, rng)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(i) for i in range(writers)))
+    return commits // writers * writers / (time.perf_counter() - started)
+
+
+async def measure_reads(Session, readers: int, reads: int) -> Dict[str, float]:
+    """Read latency percentiles (ms) with one writer committing in the background"""
+    stop = asyncio.Event()
+    written = 0
+
+    async def writer():
+        nonlocal written
+        rng = random.Random(0)
+        while not stop.is_set():
+            await insert_attempt(Session, rng)
+            written += 1
+
+    async def reader(seed: int) -> List[float]:
+        rng = random.Random(seed)
+        timings = []
+        for _ in range(reads // readers):
+            user_id = HEAVY_USER if rng.random() < 0.1 else rng.randint(1, OTHER_USERS + 1)
+            started = time.perf_counter()
+            async with Session() as db:
+                await get_dashboard_stats(user_id, db=db)
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    background = asyncio.create_task(writer())
+    try:
+        timings = sorted(t for batch in await asyncio.gather(*(reader(i) for i in range(readers))) for t in batch)
+    finally:
+        stop.set()
+        await background
+
+    def percentile(p: float) -> float:
+        return timings[min(len(timings) - 1, int(p * len(timings)))] * 1e3
+
+    return {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99), "writes": written}
+
+
+async def run(profile: str, args):
+    remove_database(args.path)
+    build(args.path, args.attempts, enrollments=25)
+    engine = engine_for(profile, args.path)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        writes = {writers: await measure_writes(Session, writers, args.commits) for writers in args.writers}
+        reads = await measure_reads(Session, args.readers, args.reads)
+    finally:
+        await engine.dispose()
+        remove_database(args.path)
+
+    columns = "  ".join(f"w={writers} {rate:>8,.0f}/s" for writers, rate in writes.items())
+    print(f"{profile:<9} | {columns} | reads r={args.readers} p50 {reads['p50']:>7.2f} ms  "
+          f"p95 {reads['p95']:>7.2f} ms  p99 {reads['p99']:>7.2f} ms  ({reads['writes']:,} concurrent commits)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", choices=[BASELINE, *PROFILES],
+                        default=[BASELINE, "dev", "prod", "bench"])
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 8], help="concurrent writers")
+    parser.add_argument("--commits", type=int, default=1000, help="commits per write measurement")
+    parser.add_argument("--readers", type=int, default=8, help="concurrent readers")
+    parser.add_argument("--reads", type=int, default=1000, help="dashboard stats calls per read measurement")
+    parser.add_argument("--attempts", type=int, default=10_000, help="quiz attempts of the heavy user")
+    parser.add_argument("--path", default="bench_db_profiles.db")
+    args = parser.parse_args()
+
+    for profile in args.profiles:
+        asyncio.run(run(profile, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: per-request overhead of app.metrics.MetricsMiddleware.
+
+Calls GET /health on two otherwise identical FastAPI apps, one with
+metrics.instrument() applied, in-process through ASGI (see bench_api.call),
+and reports the mean time per request of each and the difference. /health does
+almost no work, so the difference is close to the middleware's own cost.
+Also times one /metrics render with every route populated.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_metrics
+    python -m benchmarks.bench_metrics --requests 50000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from app import metrics
+from benchmarks.bench_api import call
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    if instrumented:
+        app.add_middleware(metrics.MetricsMiddleware)
+    return app
+
+
+async def time_requests(app: FastAPI, requests: int) -> float:
+    """Mean seconds per sequential GET /health"""
+    started = time.perf_counter()
+    for _ in range(requests):
+        status, _ = await call(app, "GET", "/health")
+        assert status == 200
+    return (time.perf_counter() - started) / requests
+
+
+async def run(requests: int, rounds: int):
+    plain, instrumented = build_app(False), build_app(True)
+    await time_requests(plain, 1000)
+    await time_requests(instrumented, 1000)
+    # Alternate the apps and keep each one's best round to damp noise on shared CPUs
+    plain_best = instrumented_best = float("inf")
+    for _ in range(rounds):
+        plain_best = min(plain_best, await time_requests(plain, requests))
+        instrumented_best = min(instrumented_best, await time_requests(instrumented, requests))
+    print(f"without middleware {plain_best * 1e6:>8.1f} µs/request")
+    print(f"with middleware    {instrumented_best * 1e6:>8.1f} µs/request")
+    print(f"overhead           {(instrumented_best - plain_best) * 1e6:>8.1f} µs/request "
+          f"({(instrumented_best - plain_best) / plain_best:+.1%})")
+
+    for i in range(200):
+        metrics.registry.observe_request("GET", f"/route/{i}", 200, 0.01, 1000)
+    started = time.perf_counter()
+    body = metrics.registry.render()
+    print(f"/metrics render    {(time.perf_counter() - started) * 1e3:>8.1f} ms for {len(body) / 1e3:.0f} kB "
+          f"({len(metrics.registry.latency)} routes)")
+    metrics.registry.reset()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000, help="requests per round and app")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
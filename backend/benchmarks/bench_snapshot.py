@@ -0,0 +1,92 @@
+"""
+Benchmark: snapshot save/restore of the in-memory store.
+
+Fills app.db with synthetic quiz results and study activities (half each) in
+both storage engines, writes a snapshot, wipes the store and restores it,
+reporting file size and save/restore time. The dict-engine snapshot is also
+restored into the columnar engine (the conversion done at startup under
+LEARNING_DB_ENGINE=columnar). Restored state is checked against the original
+ID counters and per-student aggregates.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_snapshot
+    python -m benchmarks.bench_snapshot --rows 100000 1000000 --path /tmp/bench.snapshot
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from app import db, snapshot
+
+
+def populate(rows: int, students: int, seed: int = 42):
+    """Reset the store and insert `rows` events spread over `students`"""
+    rng = random.Random(seed)
+    db.reset_database()
+    now = datetime.now()
+    today = date.today()
+    for _ in range(rows // 2):
+        db.add_quiz_result(
+            student_id=rng.randint(1, students),
+            course_id=rng.randint(1, 10),
+            score_percent=round(rng.uniform(40, 100), 2),
+            taken_at=now - timedelta(days=rng.randint(0, 365)),
+            difficulty_level=rng.choice(['Easy', 'Medium', 'Hard'])
+        )
+        db.add_study_activity(
+            student_id=rng.randint(1, students),
+            study_date=today - timedelta(days=rng.randint(0, 365)),
+            minutes_studied=rng.randint(10, 180),
+            course_id=rng.choice([None, rng.randint(1, 10)])
+        )
+
+
+def run(engine: str, rows: int, students: int, path: str):
+    db.columnar_tables.clear()
+    if engine == "columnar":
+        db.enable_columnar_storage()
+    populate(rows, students)
+    expected_ids = dict(db.next_id)
+    sample = [db.get_student_stats(student_id) for student_id in range(1, 11)]
+
+    started = time.perf_counter()
+    size = snapshot.save(path)
+    save_seconds = time.perf_counter() - started
+
+    restores = [engine] + (["columnar"] if engine == "dict" else [])
+    timings = []
+    for restore_engine in restores:
+        db.reset_database()
+        started = time.perf_counter()
+        snapshot.restore(path, restore_engine)
+        timings.append(time.perf_counter() - started)
+        assert db.next_id == expected_ids
+        assert [db.get_student_stats(student_id) for student_id in range(1, 11)] == sample
+    converted = f" | as columnar {timings[1] * 1e3:>5,.0f} ms" if len(timings) > 1 else ""
+    print(f"{engine:<9} {rows:>10,} rows | {size / 1e6:>7.1f} MB | save {save_seconds * 1e3:>8,.0f} ms | "
+          f"restore {timings[0] * 1e3:>7,.0f} ms{converted}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--students", type=int, default=1200)
+    parser.add_argument("--path", default="bench.snapshot")
+    args = parser.parse_args()
+
+    try:
+        for engine in ("dict", "columnar"):
+            for rows in args.rows:
+                run(engine, rows, args.students, args.path)
+    finally:
+        if os.path.exists(args.path):
+            os.remove(args.path)
+        db.columnar_tables.clear()
+        db.reset_database()
+
+
+if __name__ == "__main__":
+    main()
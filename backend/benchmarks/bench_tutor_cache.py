@@ -0,0 +1,82 @@
+"""
+Benchmark: semantic tutor cache hit rate and latency saved.
+
+Replays a workload of paraphrased tutor questions through
+ai_service.generate_ai_tutor_response() with a fake LLM provider: each
+student asks several questions in one course, rephrasing a few topics. The
+cache is scoped per course, so a rephrasing hits whichever student asked the
+topic first in that course. Reports the cache hit rate, the provider latency saved and the
+mean per-question latency.
+
+Usage (from the backend/ directory):
+    python -m benchmarks.bench_tutor_cache
+    python -m benchmarks.bench_tutor_cache --students 300 --questions 8 --latency 1.5
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from app import ai_service
+from app.llm_client import FakeProvider, configure_llm_client
+from app.semantic_cache import tutor_cache
+
+TOPICS = [
+    "gradient descent", "backpropagation", "overfitting", "recursion", "binary search",
+    "SQL joins", "normalization in databases", "React hooks", "the CAP theorem", "public key encryption",
+]
+
+PHRASINGS = [
+    "What is {}?",
+    "Can you explain {}?",
+    "explain {} please",
+    "I don't understand {}",
+    "Could you describe {} with an example?",
+    "what's {}",
+]
+
+
+def workload(students: int, courses: int, questions: int, seed: int = 42):
+    """`questions` per student in one course, each a random phrasing of one of the student's 2 topics"""
+    rng = random.Random(seed)
+    asked = []
+    for student_id in range(1, students + 1):
+        course_id, topics = rng.randint(1, courses), rng.sample(TOPICS, 2)
+        asked.extend((student_id, course_id, rng.choice(PHRASINGS).format(rng.choice(topics)))
+                     for _ in range(questions))
+    rng.shuffle(asked)
+    return asked
+
+
+async def run(students: int, courses: int, questions: int, latency: float):
+    provider = FakeProvider(latency=latency)
+    configure_llm_client(provider, max_concurrency=64)
+    tutor_cache.clear()
+
+    started = time.perf_counter()
+    asked = workload(students, courses, questions)
+    for student_id, course_id, question in asked:
+        await ai_service.generate_ai_tutor_response(student_id, question, course_id)
+    elapsed = time.perf_counter() - started
+
+    stats = tutor_cache.stats()
+    print(f"questions:          {len(asked)}")
+    print(f"provider calls:     {provider.calls}")
+    print(f"cache hit rate:     {stats['hit_rate']:.1%}")
+    print(f"latency saved:      {stats['latency_saved_seconds']:.1f}s")
+    print(f"mean latency:       {elapsed / len(asked) * 1e3:.1f} ms (uncached: {latency * 1e3:.0f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--courses", type=int, default=3)
+    parser.add_argument("--questions", type=int, default=5, help="questions per student")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake provider latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.students, args.courses, args.questions, args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# The app reads its configuration at import time: point it at a scratch
+# database and keep the tutor session log off before any test imports it
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("AI_SESSION_LOG_PATH", "")
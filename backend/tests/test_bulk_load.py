@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import bulk_load, migrations
+from app.database import Base
+
+
+def index_names(engine, table):
+    with engine.connect() as conn:
+        return {row[1] for row in conn.exec_driver_sql(f'PRAGMA index_list("{table}")')}
+
+
+@pytest.fixture
+def migrated_db(tmp_path):
+    """Fresh database at the latest migration version, like the app creates it"""
+    path = tmp_path / "bulk.db"
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        migrations.upgrade(conn)
+    yield path, engine
+    engine.dispose()
+
+
+def write_ndjson(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return str(path)
+
+
+def test_duplicate_enrollments_are_rejected_and_indexes_kept(migrated_db, tmp_path):
+    path, engine = migrated_db
+    indexes = index_names(engine, "enrollments")
+    assert "ux_enrollments_user_course" in indexes
+    source = write_ndjson(tmp_path / "enrollments.ndjson", [{"user_id": 1, "course_id": 1}] * 2)
+
+    with pytest.raises(bulk_load.BulkLoadError, match="UNIQUE"):
+        bulk_load.load_files([source], url=f"sqlite:///{path}")
+
+    assert index_names(engine, "enrollments") == indexes
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM enrollments").scalar() == 0
+
+
+def test_cli_reports_load_errors(migrated_db, tmp_path):
+    path, _ = migrated_db
+    source = write_ndjson(tmp_path / "enrollments.ndjson", [{"user_id": 1, "course_id": 1}] * 2)
+
+    with pytest.raises(SystemExit, match="bulk_load: enrollments: UNIQUE constraint failed"):
+        bulk_load.main([source, "--db", str(path)])
+
+
+def test_non_unique_indexes_are_rebuilt(migrated_db, tmp_path):
+    path, engine = migrated_db
+    indexes = index_names(engine, "quiz_attempts")
+    source = write_ndjson(tmp_path / "quiz_attempts.ndjson",
+                          [{"user_id": i % 7, "quiz_id": i, "score": i / 10} for i in range(100)])
+
+    assert bulk_load.load_files([source], url=f"sqlite:///{path}")[0]["rows"] == 100
+    assert index_names(engine, "quiz_attempts") == indexes
+
+
+def test_missing_keys_get_defaults_per_record(migrated_db, tmp_path):
+    path, engine = migrated_db
+    source = write_ndjson(tmp_path / "enrollments.ndjson", [
+        {"user_id": 1, "course_id": 1, "progress": 40.0, "status": "completed"},
+        {"user_id": 2, "course_id": 1},
+        {"user_id": 3, "course_id": 1, "status": "paused"},
+    ])
+
+    assert bulk_load.load_files([source], url=f"sqlite:///{path}")[0]["rows"] == 3
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            "SELECT user_id, progress, status, enrolled_at IS NOT NULL FROM enrollments ORDER BY user_id"
+        ).all()
+    assert rows == [(1, 40.0, "completed", 1), (2, 0.0, "active", 1), (3, 0.0, "paused", 1)]
+
+
+def test_unknown_key_in_a_later_record_is_rejected(migrated_db, tmp_path):
+    path, engine = migrated_db
+    source = write_ndjson(tmp_path / "quiz_attempts.ndjson",
+                          [{"user_id": 1, "quiz_id": 1}, {"user_id": 1, "quiz_id": 2, "grade": "A"}])
+
+    with pytest.raises(bulk_load.BulkLoadError, match="quiz_attempts has no column"):
+        bulk_load.load_files([source], url=f"sqlite:///{path}")
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM quiz_attempts").scalar() == 0
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import create_engine
+
+from app import migrations
+from app.database import Base
+
+
+@pytest.fixture
+def version_1_db(tmp_path):
+    """Database as version 1 left it: no unique enrollment index yet"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        conn.exec_driver_sql("DROP INDEX ux_enrollments_user_course")
+        conn.exec_driver_sql("PRAGMA user_version = 1")
+    yield engine
+    engine.dispose()
+
+
+def insert_enrollments(engine, rows):
+    with engine.begin() as conn:
+        for user_id, course_id, progress in rows:
+            conn.exec_driver_sql(
+                "INSERT INTO enrollments (user_id, course_id, progress) VALUES (?, ?, ?)", (user_id, course_id, progress)
+            )
+
+
+def test_duplicate_enrollments_stop_the_migration_untouched(version_1_db):
+    insert_enrollments(version_1_db, [(1, 1, 10.0), (1, 1, 80.0), (2, 3, 5.0), (2, 3, 0.0), (2, 4, 50.0)])
+
+    with pytest.raises(migrations.MigrationError) as raised:
+        with version_1_db.begin() as conn:
+            migrations.upgrade(conn)
+
+    message = str(raised.value)
+    assert "2 (user_id, course_id) pair(s)" in message
+    assert "(user_id=1, course_id=1) x2" in message and "(user_id=2, course_id=3) x2" in message
+    with version_1_db.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM enrollments").scalar() == 5
+        assert migrations.current_version(conn) == 1
+
+
+def test_migration_applies_once_duplicates_are_resolved(version_1_db):
+    insert_enrollments(version_1_db, [(1, 1, 10.0), (1, 2, 80.0)])
+
+    with version_1_db.begin() as conn:
+        assert migrations.upgrade(conn) == [2]
+
+    with version_1_db.connect() as conn:
+        indexes = {row[1] for row in conn.exec_driver_sql('PRAGMA index_list("enrollments")')}
+        assert "ux_enrollments_user_course" in indexes
+        assert migrations.current_version(conn) == migrations.LATEST_VERSION
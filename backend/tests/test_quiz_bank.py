@@ -0,0 +1,114 @@
+import asyncio
+import json
+import re
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+
+from app import ai_service, llm_client, quiz_bank
+from app import models_sqlite as models
+from app.database import AsyncSessionLocal, engine, init_db
+from app.quiz_bank import QuizBank, bank_key
+
+
+def quiz_responder(messages):
+    """JSON quiz reply whose questions name the requested variant"""
+    prompt = messages[-1]["content"]
+    count = int(re.search(r"Create (\d+)", prompt).group(1))
+    variant = re.search(r"alternative version (\d+)", prompt)
+    tag = variant.group(1) if variant else "0"
+    return json.dumps([{
+        "question": f"Variant {tag} question {i}?",
+        "options": ["a", "b", "c", "d"],
+        "correct_answer": "a",
+        "explanation": "because",
+    } for i in range(count)])
+
+
+async def with_app(scenario, provider):
+    await init_db()
+    llm_client.configure_llm_client(provider)
+    try:
+        async with AsyncSessionLocal() as db:
+            course = models.Course(title="Quiz bank course")
+            db.add(course)
+            await db.commit()
+            return await scenario(db, course.id)
+    finally:
+        await llm_client.shutdown_llm_client()
+        await engine.dispose()
+
+
+async def banked_quizzes(db, course_id):
+    result = await db.execute(
+        select(models.Quiz).where(models.Quiz.course_id == course_id).where(models.Quiz.topic.is_not(None))
+    )
+    return result.scalars().all()
+
+
+def test_fallback_replies_are_never_banked_or_cached():
+    provider = llm_client.FakeProvider(latency=0, responder=lambda _: "Sorry, I can't help with that.")
+
+    async def scenario(db, course_id):
+        bank = QuizBank(size=3, cold_wait=5)
+        quiz = await bank.generate(db, course_id, "Fallback topic", "easy", 2)
+        quiz_again = await bank.generate(db, course_id, "Fallback topic", "easy", 2)
+        # The quiz service itself doesn't cache the unusable reply either
+        await ai_service.generate_quiz_questions("Uncached fallback topic", "easy", 2)
+        await ai_service.generate_quiz_questions("Uncached fallback topic", "easy", 2)
+        return quiz, quiz_again, await banked_quizzes(db, course_id), bank.stats()
+
+    quiz, quiz_again, banked, stats = asyncio.run(with_app(scenario, provider))
+    assert banked == []
+    assert quiz.topic is None and quiz_again.topic is None
+    assert "Auto-generated fallback" not in json.dumps(quiz.questions)
+    assert stats["generated"] == 0 and stats["failed"] == 1 and stats["templates"] == 2
+    # One refill attempt (the second request is in the retry backoff) plus two uncached calls
+    assert provider.calls == 3
+
+
+def test_concurrent_cold_misses_bank_distinct_variants():
+    provider = llm_client.FakeProvider(latency=0.02, responder=quiz_responder)
+
+    async def scenario(db, course_id):
+        bank = QuizBank(size=3, cold_wait=5)
+
+        async def request():
+            async with AsyncSessionLocal() as session:
+                return await bank.generate(session, course_id, "Cold topic", "medium", 2)
+
+        served = await asyncio.gather(*(request() for _ in range(5)))
+        await asyncio.gather(*bank._refills.values())
+        return served, await banked_quizzes(db, course_id)
+
+    served, banked = asyncio.run(with_app(scenario, provider))
+    assert all(quiz.topic == "cold topic" for quiz in served)
+    assert len(banked) == 3
+    first_questions = [quiz.questions[0]["question"] for quiz in banked]
+    assert len(set(first_questions)) == 3
+    assert provider.calls == 3
+
+
+def test_refill_stops_at_size_when_the_state_reloads_mid_refill(monkeypatch):
+    clock = SimpleNamespace(offset=0.0)
+    monkeypatch.setattr(quiz_bank, "time", SimpleNamespace(monotonic=lambda: time.monotonic() + clock.offset))
+
+    def responder(messages):
+        # Every generation takes longer than reload_seconds; give up after twice the bank size
+        clock.offset += 120
+        if provider.calls > 6:
+            return "Sorry, I can't help with that."
+        return quiz_responder(messages)
+
+    provider = llm_client.FakeProvider(latency=0, responder=responder)
+
+    async def scenario(db, course_id):
+        bank = QuizBank(size=3, reload_seconds=60, cold_wait=5)
+        await bank.schedule_refill(bank_key(course_id, "Reload topic", "hard", 2), "Reload topic")
+        return await banked_quizzes(db, course_id), bank.stats()
+
+    banked, stats = asyncio.run(with_app(scenario, provider))
+    assert len(banked) == 3
+    assert stats["generated"] == 3 and stats["failed"] == 0
+    assert provider.calls == 3
@@ -0,0 +1,35 @@
+import asyncio
+import threading
+
+from app.ai_cache import ResponseCache, _DiskTier
+
+
+def test_disk_tier_runs_off_the_event_loop(tmp_path, monkeypatch):
+    disk_threads = []
+    for name in ("get", "set"):
+        method = getattr(_DiskTier, name)
+
+        def record(self, *args, _method=method):
+            disk_threads.append(threading.current_thread())
+            return _method(self, *args)
+
+        monkeypatch.setattr(_DiskTier, name, record)
+    path = str(tmp_path / "ai_cache.sqlite")
+
+    async def scenario():
+        cache = ResponseCache(disk_path=path)
+        await cache.set("quiz", "k", "reply")
+        # A memory hit doesn't touch the disk tier
+        assert await cache.get("quiz", "k") == "reply"
+        assert len(disk_threads) == 1
+        cache.close()
+        # A fresh cache (e.g. after a restart) reads the entry back from disk
+        restarted = ResponseCache(disk_path=path)
+        value = await restarted.get("quiz", "k"), await restarted.get("quiz", "missing")
+        restarted.close()
+        return value, threading.current_thread(), restarted.stats()["namespaces"]["quiz"]
+
+    value, loop_thread, counters = asyncio.run(scenario())
+    assert value == ("reply", None)
+    assert len(disk_threads) == 3 and loop_thread not in disk_threads
+    assert counters["disk_hits"] == 1 and counters["misses"] == 1
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app import ai_service, llm_client
+from app.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(threshold=0.9, max_entries=16)
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("How do I convert Celsius to Fahrenheit?", "How do I convert Fahrenheit to Celsius?"),
+    ("Why is recursion slower than iteration?", "Why is iteration slower than recursion?"),
+    ("What is supervised learning?", "What is unsupervised learning?"),
+])
+def test_questions_with_a_different_meaning_miss(cache, cached, asked):
+    cache.add(1, cached, "answer")
+    assert cache.lookup(1, asked) is None
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("What is gradient descent?", "Can you explain gradient descent?"),
+    ("explain SQL joins please", "Could you describe SQL joins with an example?"),
+    ("I don't understand the CAP theorem", "what's the CAP theorem"),
+])
+def test_rephrased_questions_hit(cache, cached, asked):
+    cache.add(1, cached, "answer")
+    hit = cache.lookup(1, asked)
+    assert hit is not None and hit.answer == "answer"
+
+
+def test_answers_are_shared_within_a_course_only(cache):
+    cache.add(1, "What is overfitting?", "answer")
+    assert cache.lookup(1, "Can you explain overfitting?").answer == "answer"
+    assert cache.lookup(2, "What is overfitting?") is None
+
+
+def test_tutor_answers_are_shared_between_students_in_a_course():
+    provider = llm_client.FakeProvider(latency=0, responder=lambda _: "Regularization answer")
+
+    async def scenario():
+        llm_client.configure_llm_client(provider)
+        try:
+            first = await ai_service.generate_ai_tutor_response(7, "What is L2 regularization?", 41)
+            # A paraphrase from a different student in the same course
+            paraphrase = await ai_service.generate_ai_tutor_response(8, "Can you explain L2 regularization?", 41)
+            other_course = await ai_service.generate_ai_tutor_response(8, "What is L2 regularization?", 42)
+            return first, paraphrase, other_course
+        finally:
+            await llm_client.shutdown_llm_client()
+
+    first, paraphrase, other_course = asyncio.run(scenario())
+    assert first["notes"] == "Generated by AI tutor"
+    assert paraphrase["answer"] == "Regularization answer"
+    assert paraphrase["notes"].startswith("Served from AI tutor cache")
+    assert other_course["notes"] == "Generated by AI tutor"
+    assert provider.calls == 2
+
+
+def test_order_check_falls_back_to_the_next_candidate(cache):
+    cache.add(1, "convert Fahrenheit to Celsius", "f2c")
+    cache.add(1, "How do I convert Celsius to Fahrenheit?", "c2f")
+    assert cache.lookup(1, "convert Celsius to Fahrenheit").answer == "c2f"
@@ -0,0 +1,71 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+from app.session_log import SessionLogger, session_record
+
+
+class SlowSink:
+    """Sink whose writes take a while, recording what was written and when it was closed"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.records = []
+        self.writing = threading.Event()
+        self.closed_while_writing = False
+        self.closed = False
+
+    def write(self, records):
+        self.writing.set()
+        time.sleep(self.delay)
+        self.records.extend(records)
+        self.writing.clear()
+
+    def close(self):
+        self.closed_while_writing = self.writing.is_set()
+        self.closed = True
+
+
+def records(count):
+    return [session_record(i, "tutor", f"question {i}", "answer") for i in range(count)]
+
+
+def test_stop_waits_for_the_write_in_progress():
+    async def scenario():
+        logger = SessionLogger(path=None, batch_size=10, flush_interval=0.01)
+        logger._sink = sink = SlowSink(delay=0.2)
+        logger.start()
+        for record in records(25):
+            logger.enqueue(record)
+        # Stop while the flusher is inside a sink write
+        while not sink.writing.is_set():
+            await asyncio.sleep(0.005)
+        await asyncio.wait_for(logger.stop(), 5)
+        return logger, sink
+
+    logger, sink = asyncio.run(scenario())
+    assert len(sink.records) == 25
+    assert logger.stats()["written"] == 25
+    assert logger.stats()["buffered"] == 0
+    assert sink.closed and not sink.closed_while_writing
+
+
+def test_records_enqueued_during_shutdown_are_flushed(tmp_path):
+    path = tmp_path / "logs.db"
+
+    async def scenario():
+        logger = SessionLogger(path=str(path), batch_size=50, flush_interval=10)
+        logger.start()
+        for record in records(120):
+            logger.enqueue(record)
+        stopping = asyncio.ensure_future(logger.stop())
+        for record in records(5):
+            logger.enqueue(record)
+        await asyncio.wait_for(stopping, 5)
+        return logger
+
+    logger = asyncio.run(scenario())
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT count(*) FROM ai_session_logs").fetchone()[0] == 125
+    assert logger.stats()["written"] == 125
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from app.ai_cache import SingleFlight
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class SlowCall:
+    """fn() for SingleFlight.do that records starts and cancellations"""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return "reply"
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        group, call = SingleFlight(), SlowCall(0.01)
+        results = await asyncio.gather(*(group.do("k", call) for _ in range(5)))
+        return group, call, results
+
+    group, call, results = run(scenario())
+    assert results == ["reply"] * 5
+    assert call.started == 1
+    assert group.stats() == {"in_flight": 0, "calls": 1, "coalesced": 4, "cancelled": 0}
+
+
+def test_cancelling_the_only_waiter_cancels_the_call():
+    async def scenario():
+        group, call = SingleFlight(), SlowCall()
+        waiter = asyncio.ensure_future(group.do("k", call))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return group, call
+
+    group, call = run(scenario())
+    # Cancelled upstream before the waiter's cancellation completed
+    assert call.cancelled == 1
+    assert group.stats()["in_flight"] == 0
+    assert group.stats()["cancelled"] == 1
+
+
+def test_call_keeps_running_while_other_waiters_remain():
+    async def scenario():
+        group, call = SingleFlight(), SlowCall(0.05)
+        first = asyncio.ensure_future(group.do("k", call))
+        second = asyncio.ensure_future(group.do("k", call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return call, await second, first.cancelled()
+
+    call, result, first_cancelled = run(scenario())
+    assert first_cancelled
+    assert result == "reply"
+    assert call.started == 1 and call.cancelled == 0
+
+
+def test_caller_after_last_cancel_starts_a_fresh_call():
+    async def scenario():
+        group, call = SingleFlight(), SlowCall(0.05)
+        waiter = asyncio.ensure_future(group.do("k", call))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return call, await group.do("k", call)
+
+    call, result = run(scenario())
+    assert result == "reply"
+    assert call.started == 2
+
+
+class DisconnectedRequest:
+    async def is_disconnected(self):
+        return True
+
+
+def test_client_disconnect_cancels_the_upstream_completion():
+    from fastapi import HTTPException
+
+    from app import ai_service, llm_client
+
+    async def scenario():
+        client = llm_client.configure_llm_client(llm_client.FakeProvider(latency=5))
+        try:
+            with pytest.raises(HTTPException) as raised:
+                await llm_client.cancel_on_disconnect(
+                    DisconnectedRequest(), ai_service._call_openai_system("disconnect test"), poll_interval=0.01
+                )
+            return raised.value.status_code, client.in_flight, ai_service.inflight_calls.stats()["in_flight"]
+        finally:
+            await llm_client.shutdown_llm_client()
+
+    assert run(scenario()) == (499, 0, 0)
@@ -0,0 +1,86 @@
+import copy
+
+import pytest
+
+from app import db, snapshot
+
+
+@pytest.fixture
+def seeded_db():
+    db.reset_database()
+    db.columnar_tables.clear()
+    db.initialize_database()
+    yield
+    db.reset_database()
+    db.columnar_tables.clear()
+
+
+def test_dict_engine_round_trip_restores_every_row(seeded_db):
+    expected = copy.deepcopy(db.tables)
+    expected_index = {name: {s: list(ids) for s, ids in index.items()} for name, index in db.student_index.items()}
+
+    snapshot.loads(snapshot.dumps())
+
+    assert db.tables == expected
+    assert all(list(rows) == list(expected[name]) for name, rows in db.tables.items())
+    assert {name: {s: list(ids) for s, ids in index.items()}
+            for name, index in db.student_index.items()} == expected_index
+    assert db.verify_student_stats() == {}
+
+
+def test_rows_keep_their_column_order():
+    rows = snapshot._build_rows(["id", "name", "score"], [[1, 2], ["a", None], [0.5, 1.5]])
+
+    assert rows == [{"id": 1, "name": "a", "score": 0.5}, {"id": 2, "name": None, "score": 1.5}]
+    assert [list(row) for row in rows] == [["id", "name", "score"]] * 2
+    assert rows[0] is not rows[1]
+
+
+def test_corrupt_snapshot_is_rejected(seeded_db):
+    data = bytearray(snapshot.dumps())
+    data[-1] ^= 0xFF
+
+    with pytest.raises(snapshot.SnapshotError, match="checksum"):
+        snapshot.loads(bytes(data))
+
+
+def event_rows():
+    row_ids = {name: range(1, db.next_id[name]) for name in db.COLUMNAR_SCHEMAS}
+    return {name: db._decode_rows(name, ids) if name in db.columnar_tables else [db.tables[name][i] for i in ids]
+            for name, ids in row_ids.items()}
+
+
+def test_dict_snapshot_is_restored_into_the_columnar_engine(seeded_db):
+    data = snapshot.dumps()
+    snapshot.loads(data)
+    db.enable_columnar_storage()
+    expected = event_rows()
+
+    meta = snapshot.loads(data, engine="columnar")
+
+    assert meta["storage_engine"] == "dict"
+    assert set(db.columnar_tables) == set(db.COLUMNAR_SCHEMAS)
+    assert all(not db.tables[name] for name in db.COLUMNAR_SCHEMAS)
+    assert event_rows() == expected
+    assert db.verify_student_stats() == {}
+
+
+def test_columnar_snapshot_is_restored_into_the_dict_engine(seeded_db):
+    db.enable_columnar_storage()
+    expected = event_rows()
+
+    snapshot.loads(snapshot.dumps(), engine="dict")
+
+    assert db.columnar_tables == {}
+    assert event_rows() == expected
+    assert db.verify_student_stats() == {}
+
+
+def test_rows_that_cannot_be_columnar_stay_rows(seeded_db, caplog):
+    del db.tables['study_activities'][1]
+
+    snapshot.loads(snapshot.dumps(), engine="columnar")
+
+    assert set(db.columnar_tables) == {'quiz_results'}
+    assert 1 not in db.tables['study_activities'] and 2 in db.tables['study_activities']
+    assert "row ids are not 1..n" in caplog.text
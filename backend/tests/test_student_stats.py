@@ -0,0 +1,36 @@
+import pytest
+
+from app import db
+
+
+@pytest.fixture
+def seeded_db():
+    db.reset_database()
+    db.columnar_tables.clear()
+    db.initialize_database()
+    yield
+    db.reset_database()
+
+
+def test_completing_an_enrollment_updates_the_maintained_stats(seeded_db):
+    before = db.get_student_stats(1)["courses_completed"]
+
+    db.update_enrollment(2, progress_percent=100, completion_status="Completed")
+
+    assert db.get_student_stats(1)["courses_completed"] == before + 1
+    assert db.verify_student_stats() == {}
+
+
+def test_reopening_a_completed_enrollment_updates_the_maintained_stats(seeded_db):
+    before = db.get_student_stats(1)["courses_completed"]
+
+    db.update_enrollment(1, progress_percent=60, completion_status="In progress")
+
+    assert db.enrollments[1]["completion_status"] == "In progress"
+    assert db.get_student_stats(1)["courses_completed"] == before - 1
+    assert db.verify_student_stats() == {}
+
+
+def test_updating_a_missing_enrollment_changes_nothing(seeded_db):
+    assert db.update_enrollment(999, progress_percent=50) is None
+    assert db.verify_student_stats() == {}
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+from app import llm_client
+from app.models import AiTutorRequest
+from app.routers import ai, ai_sqlite
+from app.schemas import AITutorRequest
+
+
+class FailingProvider(llm_client.FakeProvider):
+    """Streams a couple of words, then the connection drops"""
+
+    async def stream(self, messages, max_tokens, temperature):
+        self.calls += 1
+        yield "Gradient descent "
+        yield "moves "
+        raise ConnectionError("upstream connection reset")
+
+
+def stream_events(make_response):
+    async def scenario():
+        llm_client.configure_llm_client(FailingProvider(latency=0))
+        try:
+            response = await make_response()
+            return [chunk async for chunk in response.body_iterator]
+        finally:
+            await llm_client.shutdown_llm_client()
+
+    events = []
+    for message in asyncio.run(scenario()):
+        lines = message.strip().split("\n")
+        name = lines[0][len("event: "):] if lines[0].startswith("event: ") else "message"
+        events.append((name, json.loads(lines[-1][len("data: "):])))
+    return events
+
+
+def test_failed_stream_is_not_saved_as_the_tutor_answer(monkeypatch):
+    saved = []
+
+    async def course_title(loaders, course_id):
+        return "Machine learning"
+
+    async def save_tutor_exchange(*args):
+        saved.append(args)
+
+    monkeypatch.setattr(ai_sqlite, "get_course_title", course_title)
+    monkeypatch.setattr(ai_sqlite, "save_tutor_exchange", save_tutor_exchange)
+    request = AITutorRequest(question="How does gradient descent fail mid-stream?", course_id=3)
+
+    events = stream_events(lambda: ai_sqlite.ai_tutor_stream(request, user_id=1, loaders=None))
+
+    assert [name for name, _ in events] == ["message", "message", "error"]
+    assert "upstream connection reset" in events[-1][1]["error"]
+    assert saved == []
+
+
+def test_failed_stream_is_not_logged_as_a_tutor_session(monkeypatch):
+    logged = []
+    monkeypatch.setattr(ai.db, "add_ai_session", lambda **record: logged.append(record))
+    request = AiTutorRequest(student_id=1, message="Why does gradient descent drop the stream?", course_id=3)
+
+    events = stream_events(lambda: ai.ai_tutor_stream(request))
+
+    assert events[-1][0] == "error"
+    assert "upstream connection reset" in events[-1][1]["error"]
+    assert logged == []